@@ -1,23 +1,77 @@
 import sqlite3
-from flask import Flask, render_template, request, jsonify, redirect, url_for, flash, send_file, render_template_string
+import queue
+import threading
+import time
+import functools
+import hashlib
+import hmac
+import math
+from collections import OrderedDict, deque
+import click
+from flask import Flask, render_template, request, jsonify, redirect, url_for, flash, send_from_directory, g, Response, stream_with_context, has_request_context
+from flask.signals import before_render_template, template_rendered
+from markupsafe import Markup
 from flask_login import LoginManager, UserMixin, login_user, logout_user, login_required, current_user
-from werkzeug.security import generate_password_hash, check_password_hash
+from werkzeug.security import generate_password_hash, check_password_hash, safe_join
 from datetime import datetime, timedelta
 from flask_apscheduler import APScheduler 
 import csv
+import io
+import json
+from contextlib import contextmanager
 from io import StringIO
 import os
-from werkzeug.utils import secure_filename
+import re
+import logging
+import gzip
+import zlib
+import mimetypes
+import atexit
+import socket
+import uuid
+import tempfile
+import shutil
+from werkzeug.exceptions import RequestEntityTooLarge
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image, ImageOps
+
+try:
+    import brotli  # Opsional: varian .br (`flask compress-static`) & kompresi response brotli
+except ImportError:
+    brotli = None
 
 # --- KONFIGURASI APLIKASI ---
 app = Flask(__name__)
 DATABASE = 'database.db'
 app.config['SECRET_KEY'] = 'KUNCI_RAHASIA_ANDA_YANG_SANGAT_PANJANG_DAN_AMAN_123456789' 
 
+# --- KONFIGURASI DATABASE (POOL & PRAGMA SQLITE) ---
+app.config['DATABASE'] = DATABASE
+app.config['SQLITE_POOL_SIZE'] = 8            # Jumlah maksimum koneksi idle yang disimpan
+app.config['SQLITE_BUSY_TIMEOUT_MS'] = 5000   # Tunggu lock writer, bukan langsung "database is locked"
+app.config['SQLITE_TUNING'] = True            # WAL, synchronous=NORMAL, mmap & cache size
+app.config['SQLITE_MMAP_SIZE'] = 64 * 1024 * 1024
+app.config['SQLITE_CACHE_SIZE_KB'] = 16 * 1024
+app.config['AUTO_MIGRATE'] = True             # False = skema hanya disiapkan lewat `flask init-db`
+
 # --- KONFIGURASI UPLOAD FOTO ---
 UPLOAD_FOLDER = 'static/uploads'
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
+app.config['AVATAR_FOLDER'] = os.path.join(app.root_path, UPLOAD_FOLDER, 'avatars')  # Thumbnail hasil proses, bernama hash isi
+app.config['AVATAR_SIZES'] = (64, 128, 256)
+app.config['MAX_PROFILE_PIC_BYTES'] = 5 * 1024 * 1024
+app.config['MAX_PROFILE_PIC_PIXELS'] = 40_000_000   # Tolak "decompression bomb" sebelum di-decode
+app.config['IMAGE_WORKERS'] = 2
+app.config['UPLOAD_CLEANUP_GRACE'] = 60 * 60        # Detik; file lebih muda dari ini tidak dihapus cleanup
+
+# --- KONFIGURASI PAGINASI ---
+app.config['PAGE_SIZE'] = 50
+MAX_PAGE_SIZE = 200
+
+# --- KONFIGURASI EXPORT ---
+app.config['EXPORT_CHUNK_SIZE'] = 1000  # Jumlah baris per fetchmany saat streaming export
+app.config['IMPORT_BATCH_SIZE'] = 500   # Jumlah baris per executemany/commit saat import
 
 # Inisialisasi Flask-Login
 login_manager = LoginManager()
@@ -26,16 +80,71 @@ login_manager.login_view = 'login'
 login_manager.login_message = 'Anda harus login untuk mengakses halaman ini.'
 login_manager.login_message_category = 'warning'
 
+# --- KONFIGURASI CACHE PENGGUNA ---
+app.config['USER_CACHE_TTL'] = 300     # Detik; batas basi data user antar proses
+app.config['USER_CACHE_SIZE'] = 1024
+
 # --- KONFIGURASI GLOBAL BOT ---
-DAILY_REPORT = {} 
+app.config['BOT_REPORT_CACHE_TTL'] = 60   # Detik; seberapa lama worker memakai laporan bot dari memori
+app.config['SCHEDULER_LEASE_TTL'] = 60    # Detik; lease scheduler kedaluwarsa jika pemegangnya mati
+app.config['CLOCK'] = datetime.now        # Sumber waktu aplikasi (current_time); bisa diganti di pengujian tanpa patch global
 scheduler = APScheduler()
 
 # --- FUNGSI HELPER ---
 
+def current_time():
+    return app.config['CLOCK']()
+
 def allowed_file(filename):
     return '.' in filename and \
            filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+class TTLCache:
+    """Cache in-process yang thread-safe, dibatasi ukuran (LRU) dan masa berlaku per entri.
+
+    Nilai None tidak disimpan; get() mengembalikan None untuk miss maupun entri kedaluwarsa.
+    """
+
+    def __init__(self, maxsize, ttl, timer=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.timer = timer
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] > self.timer():
+                self._data.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._data[key]
+            self.misses += 1
+            return None
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (self.timer() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self._data), 'maxsize': self.maxsize, 'ttl': self.ttl}
+
 # --- MODEL PENGGUNA UNTUK FLASK-LOGIN ---
 
 class User(UserMixin):
@@ -47,13 +156,24 @@ class User(UserMixin):
 
     @staticmethod
     def get(user_id):
-        conn = get_db_connection()
-        # AMBIL KOLOM profile_pic dari database
-        user_data = conn.execute("SELECT id, username, password_hash, profile_pic FROM users WHERE id = ?", (user_id,)).fetchone() 
-        conn.close()
-        if user_data:
-            return User(user_data['id'], user_data['username'], user_data['password_hash'], user_data['profile_pic']) 
-        return None
+        # Dipanggil load_user di setiap request: layani dari cache, baru ke SQLite jika miss
+        user_data = user_cache.get(str(user_id))
+        if user_data is None:
+            conn = get_db_connection()
+            # AMBIL KOLOM profile_pic dari database
+            row = conn.execute("SELECT id, username, password_hash, profile_pic FROM users WHERE id = ?", (user_id,)).fetchone()
+            if row is None:
+                return None
+            user_data = (row['id'], row['username'], row['password_hash'], row['profile_pic'])
+            user_cache.set(str(user_id), user_data)
+        return User(*user_data)
+
+    @staticmethod
+    def invalidate(user_id):
+        """Wajib dipanggil setelah baris users diubah agar request berikutnya membaca data baru."""
+        user_cache.pop(str(user_id))
+
+user_cache = TTLCache(app.config['USER_CACHE_SIZE'], app.config['USER_CACHE_TTL'])
 
 @login_manager.user_loader
 def load_user(user_id):
@@ -62,14 +182,765 @@ def load_user(user_id):
 
 # --- FUNGSI DATABASE & SETUP ---
 
+class ConnectionPool:
+    """Pool koneksi SQLite kecil yang thread-safe.
+
+    Koneksi idle disimpan di antrean dan dipakai ulang; jika antrean kosong,
+    koneksi baru dibuat, dan koneksi yang dikembalikan saat antrean penuh ditutup.
+    """
+
+    def __init__(self, database, size, busy_timeout_ms, tuning, mmap_size, cache_size_kb):
+        self.database = database
+        self.busy_timeout_ms = busy_timeout_ms
+        self.tuning = tuning
+        self.mmap_size = mmap_size
+        self.cache_size_kb = cache_size_kb
+        self._idle = queue.LifoQueue(maxsize=size)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.database, timeout=self.busy_timeout_ms / 1000, check_same_thread=False,
+                               factory=InstrumentedConnection)
+        conn.row_factory = sqlite3.Row
+        conn.execute(f'PRAGMA busy_timeout = {int(self.busy_timeout_ms)}')
+        if self.tuning:
+            # WAL: pembaca tidak lagi menunggu writer (dan sebaliknya)
+            conn.execute('PRAGMA journal_mode = WAL')
+            conn.execute('PRAGMA synchronous = NORMAL')
+            conn.execute(f'PRAGMA mmap_size = {int(self.mmap_size)}')
+            conn.execute(f'PRAGMA cache_size = -{int(self.cache_size_kb)}')
+            conn.execute('PRAGMA temp_store = MEMORY')
+        return conn
+
+    def acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return self._connect()
+
+    def release(self, conn):
+        if conn.in_transaction:
+            conn.rollback()
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def close_all(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+_pool_lock = threading.Lock()
+
+def get_db_pool():
+    """Mengembalikan pool untuk app.config['DATABASE'], dibuat ulang jika path database berubah."""
+    pool = app.extensions.get('sqlite_pool')
+    if pool is not None and pool.database == app.config['DATABASE']:
+        return pool
+    with _pool_lock:
+        pool = app.extensions.get('sqlite_pool')
+        if pool is None or pool.database != app.config['DATABASE']:
+            if pool is not None:
+                pool.close_all()
+            pool = ConnectionPool(
+                app.config['DATABASE'],
+                app.config['SQLITE_POOL_SIZE'],
+                app.config['SQLITE_BUSY_TIMEOUT_MS'],
+                app.config['SQLITE_TUNING'],
+                app.config['SQLITE_MMAP_SIZE'],
+                app.config['SQLITE_CACHE_SIZE_KB'],
+            )
+            app.extensions['sqlite_pool'] = pool
+            if app.config['AUTO_MIGRATE']:
+                conn = pool.acquire()
+                try:
+                    init_db(conn)
+                finally:
+                    pool.release(conn)
+        return pool
+
 def get_db_connection():
-    conn = sqlite3.connect(DATABASE)
-    conn.row_factory = sqlite3.Row
-    return conn
+    """Koneksi database untuk app context aktif; dipinjam dari pool sekali dan dikembalikan saat teardown."""
+    if 'db' not in g:
+        g.db = get_db_pool().acquire()
+        g.db.stats = g.get('query_stats')
+    return g.db
+
+@app.teardown_appcontext
+def close_db_connection(exception=None):
+    conn = g.pop('db', None)
+    if conn is not None:
+        conn.stats = None
+        get_db_pool().release(conn)
+
+# --- INSTRUMENTASI (SQL, TEMPLATE, SERVER-TIMING, /metrics) ---
+# Setiap koneksi dari pool adalah InstrumentedConnection: waktu execute + fetch setiap
+# statement dijumlahkan ke QueryStats milik request yang sedang berjalan (g.query_stats),
+# dan statement yang melewati SLOW_QUERY_MS ditulis ke logger slow query.
+app.config['SLOW_QUERY_MS'] = 100        # None = slow-query log dimatikan
+app.config['SERVER_TIMING'] = True       # Header Server-Timing (db, tpl, app) di setiap response non-streaming
+app.config['METRICS_TOKEN'] = None       # Jika diisi, /metrics butuh "Authorization: Bearer <token>"; jika tidak, harus login
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+slow_query_logger = logging.getLogger('project_manager.slow_query')
+
+class QueryStats:
+    """Jumlah, total waktu, dan statement paling lambat dari query dalam satu request."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.slowest_sql = None
+        self.slowest_time = 0.0
+
+class InstrumentedCursor(sqlite3.Cursor):
+    _sql = None
+    _elapsed = 0.0
+    _logged = False
+
+    def _timed(self, sql, call, *args):
+        started = time.perf_counter()
+        try:
+            return call(*args)
+        finally:
+            self.connection.record_query(self, sql, time.perf_counter() - started)
+
+    def execute(self, sql, parameters=()):
+        self._sql, self._elapsed, self._logged = sql, 0.0, False
+        return self._timed(sql, super().execute, sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        self._sql, self._elapsed, self._logged = sql, 0.0, False
+        return self._timed(sql, super().executemany, sql, seq_of_parameters)
+
+    def fetchone(self):
+        return self._timed(None, super().fetchone)
+
+    def fetchmany(self, size=None):
+        return self._timed(None, super().fetchmany, size or self.arraysize)
+
+    def fetchall(self):
+        return self._timed(None, super().fetchall)
+
+    def __next__(self):
+        return self._timed(None, super().__next__)
+
+class InstrumentedConnection(sqlite3.Connection):
+    stats = None  # QueryStats request aktif; None di luar request (job, CLI)
+
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def record_query(self, cursor, sql, elapsed):
+        cursor._elapsed += elapsed
+        stats = self.stats
+        if stats is not None:
+            stats.count += sql is not None
+            stats.total += elapsed
+            if cursor._elapsed > stats.slowest_time:
+                stats.slowest_time, stats.slowest_sql = cursor._elapsed, cursor._sql
+        threshold = app.config['SLOW_QUERY_MS']
+        if threshold is not None and not cursor._logged and cursor._elapsed * 1000 >= threshold:
+            cursor._logged = True
+            slow_query_logger.warning('Slow query (%.1f ms) [%s]: %s', cursor._elapsed * 1000,
+                                      request.path if has_request_context() else '-', ' '.join(cursor._sql.split()))
+
+class LatencyHistogram:
+    """Histogram latensi per (route, method, status) dalam format Prometheus; per proses."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels, seconds):
+        with self._lock:
+            series = self._series.setdefault(labels, [[0] * len(self.buckets), 0.0, 0])
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    series[0][i] += 1
+            series[1] += seconds
+            series[2] += 1
+
+    def render(self, name, label_names):
+        lines = [f'# TYPE {name} histogram']
+        with self._lock:
+            series = sorted(self._series.items())
+        for labels, (bucket_counts, total, count) in series:
+            base = ','.join(f'{key}="{prometheus_escape(value)}"' for key, value in zip(label_names, labels))
+            for bound, bucket_count in zip(self.buckets, bucket_counts):
+                lines.append(f'{name}_bucket{{{base},le="{bound}"}} {bucket_count}')
+            lines.append(f'{name}_bucket{{{base},le="+Inf"}} {count}')
+            lines.append(f'{name}_sum{{{base}}} {total}')
+            lines.append(f'{name}_count{{{base}}} {count}')
+        return lines
+
+def prometheus_escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+request_latency = LatencyHistogram(LATENCY_BUCKETS)
+db_time_histogram = LatencyHistogram(LATENCY_BUCKETS)
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+    g.query_stats = QueryStats()
+    g.template_time = 0.0
+
+@before_render_template.connect_via(app)
+def start_template_timer(sender, template, context, **extra):
+    g.template_started = time.perf_counter()
+
+@template_rendered.connect_via(app)
+def stop_template_timer(sender, template, context, **extra):
+    started = g.pop('template_started', None)
+    if started is not None:
+        g.template_time = g.get('template_time', 0.0) + time.perf_counter() - started
+
+@app.after_request
+def record_request_timing(response):
+    started = g.get('request_started')
+    if started is None:
+        return response
+    stats = g.query_stats
+    route = request.url_rule.rule if request.url_rule else '<unmatched>'
+    labels = (route, request.method, str(response.status_code))
+
+    def observe(elapsed):
+        request_latency.observe(labels, elapsed)
+        db_time_histogram.observe(labels, stats.total)
+
+    if response.is_streamed:
+        # Body streaming (mis. /export_data) baru berjalan setelah fungsi ini: histogram dicatat
+        # saat stream ditutup, dan Server-Timing tidak dikirim karena angkanya belum ada.
+        response.call_on_close(lambda: observe(time.perf_counter() - started))
+        return response
+    elapsed = time.perf_counter() - started
+    observe(elapsed)
+
+    if app.config['SERVER_TIMING']:
+        timings = [
+            f'db;dur={stats.total * 1000:.2f};desc="{stats.count} queries"',
+            f'tpl;dur={g.template_time * 1000:.2f}',
+            f'app;dur={elapsed * 1000:.2f}',
+        ]
+        if stats.slowest_sql:
+            timings.insert(1, f'db-slowest;dur={stats.slowest_time * 1000:.2f}')
+        response.headers.add('Server-Timing', ', '.join(timings))
+    return response
+
+@app.route('/metrics')
+def metrics():
+    """Metrik Prometheus untuk proses ini (setiap worker gunicorn punya angkanya sendiri)."""
+    token = app.config['METRICS_TOKEN']
+    if token:
+        if not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+            return Response('Unauthorized\n', status=401, mimetype='text/plain')
+    elif not current_user.is_authenticated:
+        # Teks slow query & statistik route tidak boleh terbuka untuk umum
+        return login_manager.unauthorized()
+    label_names = ('route', 'method', 'status')
+    lines = request_latency.render('http_request_duration_seconds', label_names)
+    lines += db_time_histogram.render('http_request_db_seconds', label_names)
+    pool = get_db_pool()
+    lines += ['# TYPE sqlite_pool_idle_connections gauge', f'sqlite_pool_idle_connections {pool._idle.qsize()}']
+    for name, cache in (('user', user_cache), ('api', api_cache), ('fragment', fragment_cache)):
+        stats = cache.stats()
+        lines += [f'cache_hits_total{{cache="{name}"}} {stats["hits"]}', f'cache_misses_total{{cache="{name}"}} {stats["misses"]}']
+    return Response('\n'.join(lines) + '\n', mimetype='text/plain; version=0.0.4')
+
+# Total berjalan per status tugas dan untuk seluruh pengeluaran. Trigger menjaga
+# angka ini di dalam transaksi yang sama dengan setiap INSERT/UPDATE/DELETE,
+# sehingga endpoint finansial cukup membaca beberapa baris, bukan SUM seluruh tabel.
+FINANCIAL_SUMMARY_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS task_totals (
+        status TEXT PRIMARY KEY,
+        task_count INTEGER NOT NULL DEFAULT 0,
+        revenue REAL NOT NULL DEFAULT 0,
+        paid REAL NOT NULL DEFAULT 0
+    );
+
+    CREATE TABLE IF NOT EXISTS expense_totals (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        expense_count INTEGER NOT NULL DEFAULT 0,
+        amount REAL NOT NULL DEFAULT 0
+    );
+
+    CREATE TRIGGER IF NOT EXISTS task_totals_after_insert AFTER INSERT ON tasks BEGIN
+        INSERT INTO task_totals (status, task_count, revenue, paid) VALUES (new.status, 1, new.price, new.paid)
+        ON CONFLICT(status) DO UPDATE SET
+            task_count = task_count + 1,
+            revenue = revenue + excluded.revenue,
+            paid = paid + excluded.paid;
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS task_totals_after_delete AFTER DELETE ON tasks BEGIN
+        UPDATE task_totals
+        SET task_count = task_count - 1, revenue = revenue - old.price, paid = paid - old.paid
+        WHERE status = old.status;
+        DELETE FROM task_totals WHERE status = old.status AND task_count <= 0;
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS task_totals_after_update AFTER UPDATE OF status, price, paid ON tasks BEGIN
+        UPDATE task_totals
+        SET task_count = task_count - 1, revenue = revenue - old.price, paid = paid - old.paid
+        WHERE status = old.status;
+        DELETE FROM task_totals WHERE status = old.status AND task_count <= 0;
+        INSERT INTO task_totals (status, task_count, revenue, paid) VALUES (new.status, 1, new.price, new.paid)
+        ON CONFLICT(status) DO UPDATE SET
+            task_count = task_count + 1,
+            revenue = revenue + excluded.revenue,
+            paid = paid + excluded.paid;
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS expense_totals_after_insert AFTER INSERT ON expenses BEGIN
+        INSERT INTO expense_totals (id, expense_count, amount) VALUES (1, 1, new.amount)
+        ON CONFLICT(id) DO UPDATE SET
+            expense_count = expense_count + 1,
+            amount = amount + excluded.amount;
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS expense_totals_after_delete AFTER DELETE ON expenses BEGIN
+        UPDATE expense_totals
+        SET expense_count = expense_count - 1,
+            amount = CASE WHEN expense_count <= 1 THEN 0 ELSE amount - old.amount END
+        WHERE id = 1;
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS expense_totals_after_update AFTER UPDATE OF amount ON expenses BEGIN
+        UPDATE expense_totals SET amount = amount - old.amount + new.amount WHERE id = 1;
+    END;
+'''
+
+def compute_financial_summary(conn):
+    """Menghitung ulang total finansial langsung dari tabel sumber (full scan)."""
+    task_rows = conn.execute('''
+        SELECT status, COUNT(*) AS task_count, SUM(price) AS revenue, SUM(paid) AS paid
+        FROM all_tasks GROUP BY status
+    ''').fetchall()
+    expense_row = conn.execute('SELECT COUNT(*) AS expense_count, COALESCE(SUM(amount), 0) AS amount FROM expenses').fetchone()
+    return {
+        'tasks': {row['status']: (row['task_count'], row['revenue'], row['paid']) for row in task_rows},
+        'expenses': (expense_row['expense_count'], expense_row['amount']),
+    }
 
-def create_table():
+def read_stored_financial_summary(conn):
+    """Membaca total finansial yang tersimpan di tabel ringkasan."""
+    task_rows = conn.execute('SELECT status, task_count, revenue, paid FROM task_totals').fetchall()
+    expense_row = conn.execute('SELECT expense_count, amount FROM expense_totals WHERE id = 1').fetchone()
+    return {
+        'tasks': {row['status']: (row['task_count'], row['revenue'], row['paid']) for row in task_rows},
+        'expenses': (expense_row['expense_count'], expense_row['amount']) if expense_row else (0, 0),
+    }
+
+def rebuild_financial_summary(conn, tasks_source='tasks'):
+    """Mengisi ulang tabel ringkasan finansial dari nol (commit diserahkan ke pemanggil).
+
+    Default hanya tabel tasks, seperti saat migrasi 002 berjalan; sejak migrasi 010 pemanggil
+    memakai tasks_source='all_tasks' agar tugas arsip ikut terhitung.
+    """
+    conn.execute('DELETE FROM task_totals')
+    conn.execute(f'''
+        INSERT INTO task_totals (status, task_count, revenue, paid)
+        SELECT status, COUNT(*), SUM(price), SUM(paid) FROM {tasks_source} GROUP BY status
+    ''')
+    conn.execute('DELETE FROM expense_totals')
+    conn.execute('''
+        INSERT INTO expense_totals (id, expense_count, amount)
+        SELECT 1, COUNT(*), COALESCE(SUM(amount), 0) FROM expenses
+    ''')
+
+def financial_summary_drift(conn, tolerance=0.005):
+    """Membandingkan ringkasan tersimpan dengan hasil hitung ulang; mengembalikan daftar selisih."""
+    expected = compute_financial_summary(conn)
+    stored = read_stored_financial_summary(conn)
+    problems = []
+    for status in sorted(set(expected['tasks']) | set(stored['tasks'])):
+        want = expected['tasks'].get(status, (0, 0, 0))
+        got = stored['tasks'].get(status, (0, 0, 0))
+        if want[0] != got[0] or abs(want[1] - got[1]) > tolerance or abs(want[2] - got[2]) > tolerance:
+            problems.append(f"tasks[{status}]: tersimpan {got}, seharusnya {want}")
+    want, got = expected['expenses'], stored['expenses']
+    if want[0] != got[0] or abs(want[1] - got[1]) > tolerance:
+        problems.append(f"expenses: tersimpan {got}, seharusnya {want}")
+    return problems
+
+def load_financial_totals(conn):
+    """Total pendapatan, pembayaran, pipeline dan pengeluaran dari tabel ringkasan (O(1))."""
+    row = conn.execute('''
+        SELECT COALESCE(SUM(revenue), 0) AS total_revenue,
+               COALESCE(SUM(paid), 0) AS total_paid,
+               COALESCE(SUM(CASE WHEN status IN ('To Do', 'In Progress', 'Review') THEN revenue END), 0) AS projected_revenue
+        FROM task_totals
+    ''').fetchone()
+    expense_row = conn.execute('SELECT amount FROM expense_totals WHERE id = 1').fetchone()
+    return {
+        'total_revenue': row['total_revenue'],
+        'total_paid': row['total_paid'],
+        'projected_revenue': row['projected_revenue'],
+        'total_expenses': expense_row['amount'] if expense_row else 0,
+    }
+
+@app.cli.command('rebuild-summary')
+@click.option('--check', is_flag=True, help='Hanya periksa konsistensi, jangan tulis ulang.')
+def rebuild_summary_command(check):
+    """Memeriksa atau membangun ulang tabel ringkasan finansial dari data mentah."""
     conn = get_db_connection()
-    
+    problems = financial_summary_drift(conn)
+    for problem in problems:
+        click.echo(problem)
+    if check:
+        if problems:
+            raise SystemExit(1)
+        click.echo('Ringkasan finansial konsisten.')
+        return
+    rebuild_financial_summary(conn, tasks_source='all_tasks')
+    # Cache API & fragmen di semua worker memakai versi data; tanpa ini angka lama tetap tersaji
+    bump_data_version(conn)
+    conn.commit()
+    click.echo('Ringkasan finansial dibangun ulang.')
+
+# --- MIGRASI SKEMA (PRAGMA user_version) ---
+# Setiap migrasi dijalankan sekali, berurutan, di dalam transaksinya sendiri.
+# Nomor versi = posisi migrasi di MIGRATIONS (dimulai dari 1). Jangan ubah
+# migrasi yang sudah dirilis; tambahkan migrasi baru di akhir daftar.
+
+# --- SET RISIKO BOT (DIJAGA TRIGGER) ---
+# risk_watch berisi tugas High-Priority yang belum dikerjakan selesai dan punya deadline
+# valid. Trigger menjaganya tetap sinkron dengan tasks; job pergantian hari membuang
+# tugas yang deadline-nya sudah lewat, sehingga banner bot cukup membaca range kecil ini.
+RISK_WATCH_CONDITION = '''
+    new.priority = 'High' AND new.status IN ('To Do', 'In Progress')
+    AND new.completion_date IS NOT NULL AND date(new.completion_date) = new.completion_date
+'''
+
+RISK_WATCH_SCHEMA = f'''
+    CREATE TABLE IF NOT EXISTS risk_watch (
+        task_id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        completion_date TEXT NOT NULL
+    );
+
+    CREATE INDEX IF NOT EXISTS idx_risk_watch_deadline ON risk_watch (completion_date);
+
+    CREATE TRIGGER IF NOT EXISTS risk_watch_after_insert AFTER INSERT ON tasks
+    WHEN {RISK_WATCH_CONDITION} BEGIN
+        INSERT OR REPLACE INTO risk_watch (task_id, name, completion_date) VALUES (new.id, new.name, new.completion_date);
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS risk_watch_after_delete AFTER DELETE ON tasks BEGIN
+        DELETE FROM risk_watch WHERE task_id = old.id;
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS risk_watch_after_update AFTER UPDATE OF name, status, priority, completion_date ON tasks BEGIN
+        DELETE FROM risk_watch WHERE task_id = old.id;
+        INSERT INTO risk_watch (task_id, name, completion_date)
+        SELECT new.id, new.name, new.completion_date WHERE {RISK_WATCH_CONDITION};
+    END;
+'''
+
+# --- INDEX PENCARIAN (FTS5) ---
+# Satu tabel FTS5 untuk tugas, klien, dan pengeluaran. rowid = ref_id * 3 + kode jenis,
+# sehingga trigger bisa menghapus/mengganti entri tanpa lookup. title diberi bobot lebih
+# tinggi dari body saat ranking; prefix index 2-3 huruf mempercepat pencarian awalan.
+SEARCH_KINDS = {'task': 0, 'client': 1, 'expense': 2}
+
+SEARCH_INDEX_SCHEMA = '''
+    CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(
+        kind UNINDEXED, ref_id UNINDEXED, title, body,
+        tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'
+    );
+
+    CREATE TRIGGER IF NOT EXISTS search_tasks_after_insert AFTER INSERT ON tasks BEGIN
+        INSERT INTO search_index (rowid, kind, ref_id, title, body) VALUES (new.id * 3, 'task', new.id, new.name, '');
+    END;
+    CREATE TRIGGER IF NOT EXISTS search_tasks_after_update AFTER UPDATE OF name ON tasks BEGIN
+        DELETE FROM search_index WHERE rowid = old.id * 3;
+        INSERT INTO search_index (rowid, kind, ref_id, title, body) VALUES (new.id * 3, 'task', new.id, new.name, '');
+    END;
+    CREATE TRIGGER IF NOT EXISTS search_tasks_after_delete AFTER DELETE ON tasks BEGIN
+        DELETE FROM search_index WHERE rowid = old.id * 3;
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS search_clients_after_insert AFTER INSERT ON clients BEGIN
+        INSERT INTO search_index (rowid, kind, ref_id, title, body)
+        VALUES (new.id * 3 + 1, 'client', new.id, new.name, COALESCE(new.contact, '') || ' ' || COALESCE(new.email, ''));
+    END;
+    CREATE TRIGGER IF NOT EXISTS search_clients_after_update AFTER UPDATE OF name, contact, email ON clients BEGIN
+        DELETE FROM search_index WHERE rowid = old.id * 3 + 1;
+        INSERT INTO search_index (rowid, kind, ref_id, title, body)
+        VALUES (new.id * 3 + 1, 'client', new.id, new.name, COALESCE(new.contact, '') || ' ' || COALESCE(new.email, ''));
+    END;
+    CREATE TRIGGER IF NOT EXISTS search_clients_after_delete AFTER DELETE ON clients BEGIN
+        DELETE FROM search_index WHERE rowid = old.id * 3 + 1;
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS search_expenses_after_insert AFTER INSERT ON expenses BEGIN
+        INSERT INTO search_index (rowid, kind, ref_id, title, body) VALUES (new.id * 3 + 2, 'expense', new.id, new.description, '');
+    END;
+    CREATE TRIGGER IF NOT EXISTS search_expenses_after_update AFTER UPDATE OF description ON expenses BEGIN
+        DELETE FROM search_index WHERE rowid = old.id * 3 + 2;
+        INSERT INTO search_index (rowid, kind, ref_id, title, body) VALUES (new.id * 3 + 2, 'expense', new.id, new.description, '');
+    END;
+    CREATE TRIGGER IF NOT EXISTS search_expenses_after_delete AFTER DELETE ON expenses BEGIN
+        DELETE FROM search_index WHERE rowid = old.id * 3 + 2;
+    END;
+'''
+
+def rebuild_search_index(conn):
+    """Mengisi ulang search_index dari tabel sumber (commit diserahkan ke pemanggil)."""
+    conn.execute('DELETE FROM search_index')
+    conn.execute("INSERT INTO search_index (rowid, kind, ref_id, title, body) SELECT id * 3, 'task', id, name, '' FROM tasks")
+    conn.execute('''
+        INSERT INTO search_index (rowid, kind, ref_id, title, body)
+        SELECT id * 3 + 1, 'client', id, name, COALESCE(contact, '') || ' ' || COALESCE(email, '') FROM clients
+    ''')
+    conn.execute("INSERT INTO search_index (rowid, kind, ref_id, title, body) SELECT id * 3 + 2, 'expense', id, description, '' FROM expenses")
+    conn.execute("INSERT INTO search_index (search_index) VALUES ('optimize')")
+
+# --- ROLLUP TREN (HARIAN / MINGGUAN / BULANAN) ---
+# rollups menyimpan total per (granularitas, metrik, bucket): bucket harian = tanggal,
+# mingguan = tanggal Senin awal minggu, bulanan = 'YYYY-MM'. Trigger menambah/mengurangi
+# ketiga bucket di transaksi yang sama dengan setiap penulisan, sehingga grafik tren
+# bertahun-tahun cukup membaca beberapa puluh baris. Tugas dihitung pada completion_date
+# (paid, revenue, tasks:<status>), pengeluaran pada date (expenses, expense_count);
+# baris dengan tanggal kosong/tidak valid tidak masuk rollup. Tugas yang diarsipkan tetap
+# terhitung lewat trigger yang sama pada tasks_archive (ARCHIVE_ROLLUP_SOURCES, migrasi 010).
+ROLLUP_BUCKETS = {
+    'day': '{d}',
+    'week': "date({d}, 'weekday 0', '-6 days')",
+    'month': 'substr({d}, 1, 7)',
+}
+# tabel -> (kolom tanggal, kolom yang memicu trigger update, [(ekspresi metrik, ekspresi nilai)])
+ROLLUP_SOURCES = {
+    'tasks': ('completion_date', 'status, price, paid, completion_date',
+              [("'paid'", '{r}.paid'), ("'revenue'", '{r}.price'), ("'tasks:' || {r}.status", '1')]),
+    'expenses': ('date', 'amount, date', [("'expenses'", '{r}.amount'), ("'expense_count'", '1')]),
+}
+ARCHIVE_ROLLUP_SOURCES = {'tasks_archive': ROLLUP_SOURCES['tasks']}
+ALL_ROLLUP_SOURCES = {**ROLLUP_SOURCES, **ARCHIVE_ROLLUP_SOURCES}
+
+def rollup_trigger_statement(table, row, sign):
+    """INSERT ... ON CONFLICT yang menambahkan (sign=+1) atau mengurangi (-1) baris `row` ke ketiga bucket."""
+    date_column, _, metrics = ALL_ROLLUP_SOURCES[table]
+    day = f'{row}.{date_column}'
+    buckets = ' UNION ALL '.join(f"SELECT '{name}' AS granularity, {expr.format(d=day)} AS bucket" for name, expr in ROLLUP_BUCKETS.items())
+    values = ' UNION ALL '.join(
+        f"SELECT {metric.format(r=row)} AS metric, {'-' if sign < 0 else ''}{value.format(r=row)} AS value"
+        for metric, value in metrics
+    )
+    return f'''
+        INSERT INTO rollups (granularity, metric, bucket, value)
+        SELECT b.granularity, v.metric, b.bucket, v.value FROM ({buckets}) AS b, ({values}) AS v
+        WHERE {day} IS NOT NULL AND date({day}) = {day}
+        ON CONFLICT (granularity, metric, bucket) DO UPDATE SET value = value + excluded.value;
+    '''
+
+def build_rollup_schema(sources=None):
+    statements = ['''
+        CREATE TABLE IF NOT EXISTS rollups (
+            granularity TEXT NOT NULL,
+            metric TEXT NOT NULL,
+            bucket TEXT NOT NULL,
+            value REAL NOT NULL DEFAULT 0,
+            PRIMARY KEY (granularity, metric, bucket)
+        ) WITHOUT ROWID;
+    ''']
+    for table, (_, columns, _) in (ROLLUP_SOURCES if sources is None else sources).items():
+        statements.append(f'''
+            CREATE TRIGGER IF NOT EXISTS rollups_{table}_after_insert AFTER INSERT ON {table} BEGIN
+                {rollup_trigger_statement(table, 'new', +1)}
+            END;
+            CREATE TRIGGER IF NOT EXISTS rollups_{table}_after_delete AFTER DELETE ON {table} BEGIN
+                {rollup_trigger_statement(table, 'old', -1)}
+            END;
+            CREATE TRIGGER IF NOT EXISTS rollups_{table}_after_update AFTER UPDATE OF {columns} ON {table} BEGIN
+                {rollup_trigger_statement(table, 'old', -1)}
+                {rollup_trigger_statement(table, 'new', +1)}
+            END;
+        ''')
+    return '\n'.join(statements)
+
+ROLLUP_SCHEMA = build_rollup_schema()
+
+def rollup_source_query(sources=None):
+    """SELECT (granularity, metric, bucket, value) yang menghitung rollup langsung dari tabel sumber."""
+    parts = []
+    for table, (date_column, _, metrics) in (ROLLUP_SOURCES if sources is None else sources).items():
+        for granularity, expr in ROLLUP_BUCKETS.items():
+            bucket = expr.format(d=date_column)
+            for metric, value in metrics:
+                parts.append(f'''
+                    SELECT '{granularity}' AS granularity, {metric.format(r=table)} AS metric, {bucket} AS bucket,
+                           SUM({value.format(r=table)}) AS value
+                    FROM {table} WHERE {date_column} IS NOT NULL AND date({date_column}) = {date_column}
+                    GROUP BY 2, 3
+                ''')
+    # Tabel tasks & tasks_archive bisa mengisi bucket yang sama
+    return f"SELECT granularity, metric, bucket, SUM(value) FROM ({' UNION ALL '.join(parts)}) GROUP BY 1, 2, 3"
+
+def rebuild_rollups(conn, sources=None):
+    """Mengisi ulang tabel rollups dari tabel sumber (commit diserahkan ke pemanggil).
+
+    Default ROLLUP_SOURCES (tasks & expenses), seperti saat migrasi 008 berjalan; sejak
+    migrasi 010 pemanggil memakai ALL_ROLLUP_SOURCES agar tugas arsip ikut terhitung.
+    """
+    conn.execute('DELETE FROM rollups')
+    conn.execute(f'INSERT INTO rollups (granularity, metric, bucket, value) {rollup_source_query(sources)}')
+
+def rollup_drift(conn, tolerance=0.005):
+    """Membandingkan rollups tersimpan dengan hasil hitung ulang; mengembalikan daftar selisih."""
+    expected = {tuple(row[:3]): row[3] for row in conn.execute(rollup_source_query(ALL_ROLLUP_SOURCES))}
+    stored = {tuple(row[:3]): row[3] for row in conn.execute('SELECT granularity, metric, bucket, value FROM rollups')}
+    problems = []
+    for key in sorted(set(expected) | set(stored)):
+        want, got = expected.get(key, 0), stored.get(key, 0)
+        if abs(want - got) > tolerance:
+            problems.append(f"rollups{list(key)}: tersimpan {got}, seharusnya {want}")
+    return problems
+
+def rollup_bucket(day, granularity):
+    """Bucket tempat tanggal `day` (date) berada, dalam format yang sama dengan kolom rollups.bucket."""
+    if granularity == 'week':
+        day = day - timedelta(days=day.weekday())
+    return day.strftime('%Y-%m') if granularity == 'month' else day.strftime('%Y-%m-%d')
+
+def load_rollup_series(conn, granularity, metrics, start=None, end=None):
+    """(labels, {metrik: [nilai]}) terurut bucket; bucket yang tidak punya nilai untuk suatu metrik diisi 0."""
+    placeholders = ', '.join('?' for _ in metrics)
+    sql = f'SELECT metric, bucket, value FROM rollups WHERE granularity = ? AND metric IN ({placeholders})'
+    params = [granularity, *metrics]
+    if start is not None:
+        sql += ' AND bucket >= ?'
+        params.append(rollup_bucket(start, granularity))
+    if end is not None:
+        sql += ' AND bucket <= ?'
+        params.append(rollup_bucket(end, granularity))
+    values = {}
+    for row in conn.execute(sql + ' ORDER BY bucket', params):
+        values.setdefault(row['bucket'], {})[row['metric']] = round(row['value'], 2)
+    labels = sorted(values)
+    return labels, {metric: [values[label].get(metric, 0) for label in labels] for metric in metrics}
+
+@app.cli.command('rebuild-rollups')
+@click.option('--check', is_flag=True, help='Hanya periksa konsistensi, jangan tulis ulang.')
+def rebuild_rollups_command(check):
+    """Memeriksa atau membangun ulang tabel rollup tren dari data mentah."""
+    conn = get_db_connection()
+    problems = rollup_drift(conn)
+    for problem in problems[:50]:
+        click.echo(problem)
+    if check:
+        if problems:
+            raise SystemExit(1)
+        click.echo('Rollup tren konsisten.')
+        return
+    rebuild_rollups(conn, ALL_ROLLUP_SOURCES)
+    bump_data_version(conn)
+    conn.commit()
+    click.echo('Rollup tren dibangun ulang.')
+
+# --- ARSIP TUGAS (HOT / COLD) ---
+# Tugas Done yang sudah lunas dan completion_date-nya lebih tua dari ARCHIVE_AFTER_DAYS
+# dipindahkan ke tasks_archive (lihat archive_tasks), sehingga query rutin dashboard,
+# bot dan analitik tugas terbuka hanya menyentuh tabel tasks yang kecil. Arsip berada di
+# file database yang sama: trigger tidak bisa menjangkau database ATTACH, dan snapshot
+# serta transaksi pemindahan tetap atomik. Trigger arsip menambah/mengurangi task_totals
+# dan rollups persis seperti tasks, jadi total finansial & tren tidak berubah saat tugas
+# dipindahkan. View all_tasks (tasks + arsip) dipakai export dan agregat klien.
+# Tugas arsip tidak ikut index pencarian dan tidak bisa diubah/dihapus lewat API tugas.
+TASK_COLUMNS = 'id, name, status, priority, price, paid, completion_date, client_id, progress'
+
+TASK_ARCHIVE_SCHEMA = f'''
+    CREATE TABLE IF NOT EXISTS tasks_archive (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        status TEXT NOT NULL,
+        priority TEXT,
+        price REAL NOT NULL,
+        paid REAL NOT NULL,
+        completion_date TEXT,
+        client_id INTEGER,
+        progress INTEGER,
+        archived_at TEXT NOT NULL
+    );
+
+    CREATE INDEX IF NOT EXISTS idx_tasks_archive_client ON tasks_archive (client_id);
+
+    CREATE VIEW IF NOT EXISTS all_tasks AS
+        SELECT {TASK_COLUMNS} FROM tasks
+        UNION ALL
+        SELECT {TASK_COLUMNS} FROM tasks_archive;
+
+    CREATE TRIGGER IF NOT EXISTS task_totals_archive_after_insert AFTER INSERT ON tasks_archive BEGIN
+        INSERT INTO task_totals (status, task_count, revenue, paid) VALUES (new.status, 1, new.price, new.paid)
+        ON CONFLICT(status) DO UPDATE SET
+            task_count = task_count + 1,
+            revenue = revenue + excluded.revenue,
+            paid = paid + excluded.paid;
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS task_totals_archive_after_delete AFTER DELETE ON tasks_archive BEGIN
+        UPDATE task_totals
+        SET task_count = task_count - 1, revenue = revenue - old.price, paid = paid - old.paid
+        WHERE status = old.status;
+        DELETE FROM task_totals WHERE status = old.status AND task_count <= 0;
+    END;
+'''
+
+# Migrasi 011: upsert import bisa mengubah baris arsip yang sudah ada
+TASK_ARCHIVE_UPDATE_SCHEMA = '''
+    CREATE TRIGGER IF NOT EXISTS task_totals_archive_after_update AFTER UPDATE OF status, price, paid ON tasks_archive BEGIN
+        UPDATE task_totals
+        SET task_count = task_count - 1, revenue = revenue - old.price, paid = paid - old.paid
+        WHERE status = old.status;
+        DELETE FROM task_totals WHERE status = old.status AND task_count <= 0;
+        INSERT INTO task_totals (status, task_count, revenue, paid) VALUES (new.status, 1, new.price, new.paid)
+        ON CONFLICT(status) DO UPDATE SET
+            task_count = task_count + 1,
+            revenue = revenue + excluded.revenue,
+            paid = paid + excluded.paid;
+    END;
+'''
+
+def sync_task_sequence(conn):
+    """Menaikkan AUTOINCREMENT tasks melewati id tertinggi di all_tasks (commit diserahkan ke pemanggil).
+
+    id yang hanya ada di tasks_archive (mis. hasil import) tidak menaikkan sqlite_sequence,
+    sehingga tanpa ini tugas baru bisa mendapat id arsip dan job arsip gagal UNIQUE.
+    """
+    top = conn.execute('SELECT MAX(id) FROM all_tasks').fetchone()[0]
+    if top is None:
+        return
+    if conn.execute("UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name = 'tasks'", (top,)).rowcount == 0:
+        conn.execute("INSERT INTO sqlite_sequence (name, seq) VALUES ('tasks', ?)", (top,))
+
+def execute_statements(conn, script):
+    """Menjalankan skrip SQL per statement tanpa COMMIT implisit seperti executescript()."""
+    statement = ''
+    for line in script.splitlines(keepends=True):
+        statement += line
+        if sqlite3.complete_statement(statement):
+            conn.execute(statement)
+            statement = ''
+    if statement.strip():
+        conn.execute(statement)
+
+def add_column_if_missing(conn, table, column, definition):
+    columns = {row['name'] for row in conn.execute(f'PRAGMA table_info({table})')}
+    if column not in columns:
+        conn.execute(f'ALTER TABLE {table} ADD COLUMN {column} {definition}')
+
+def migration_001_base_schema(conn):
     # Tabel Tugas (Tasks)
     conn.execute('''
         CREATE TABLE IF NOT EXISTS tasks (
@@ -85,11 +956,9 @@ def create_table():
         )
     ''')
     
-    # MIGRATION SAFEGUARD: client_id dan progress
-    try: conn.execute("ALTER TABLE tasks ADD COLUMN client_id INTEGER")
-    except sqlite3.OperationalError: pass 
-    try: conn.execute("ALTER TABLE tasks ADD COLUMN progress INTEGER DEFAULT 0")
-    except sqlite3.OperationalError: pass 
+    # Database lama: client_id dan progress belum ada
+    add_column_if_missing(conn, 'tasks', 'client_id', 'INTEGER')
+    add_column_if_missing(conn, 'tasks', 'progress', 'INTEGER DEFAULT 0')
     
     # Tabel Pengeluaran (Expenses)
     conn.execute('''
@@ -121,59 +990,870 @@ def create_table():
         )
     ''')
     
-    # MIGRATION SAFEGUARD: profile_pic
-    try: conn.execute("ALTER TABLE users ADD COLUMN profile_pic TEXT DEFAULT 'default.png'")
-    except sqlite3.OperationalError: pass 
-    
-    # --- BUAT PENGGUNA ADMIN DEFAULT ---
+    # Database lama: profile_pic belum ada
+    add_column_if_missing(conn, 'users', 'profile_pic', "TEXT DEFAULT 'default.png'")
+
+def migration_002_financial_summary(conn):
+    # Ringkasan Finansial (total berjalan, dijaga trigger) + isi awal dari data yang ada
+    execute_statements(conn, FINANCIAL_SUMMARY_SCHEMA)
+    rebuild_financial_summary(conn)
+
+def migration_003_hot_query_indexes(conn):
+    execute_statements(conn, '''
+        -- Riwayat tugas per klien (WHERE client_id = ? ORDER BY id DESC) dan agregat klien
+        CREATE INDEX IF NOT EXISTS idx_tasks_client ON tasks (client_id);
+
+        -- Tugas terbuka/selesai berdasarkan deadline: deadline_risk dan aging_analysis
+        CREATE INDEX IF NOT EXISTS idx_tasks_status_deadline ON tasks (status, completion_date, price, paid);
+
+        -- Laporan bot (priority = 'High' AND status IN (...) AND deadline BETWEEN) dan priority_data
+        CREATE INDEX IF NOT EXISTS idx_tasks_priority_status_deadline ON tasks (priority, status, completion_date);
+
+        -- Cash flow bulanan (completion_date IS NOT NULL AND paid > 0), covering
+        CREATE INDEX IF NOT EXISTS idx_tasks_deadline_paid ON tasks (completion_date, paid);
+
+        -- Daftar pengeluaran (ORDER BY date DESC, id DESC) dengan keyset cursor
+        CREATE INDEX IF NOT EXISTS idx_expenses_date ON expenses (date, id);
+    ''')
+
+def migration_004_data_version(conn):
+    # Penghitung versi data: dinaikkan setiap route yang menulis, dipakai untuk cache/ETag API
+    conn.execute('CREATE TABLE IF NOT EXISTS app_meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)')
+    conn.execute("INSERT OR IGNORE INTO app_meta (key, value) VALUES ('data_version', 0)")
+
+def migration_005_bot_reports_and_leases(conn):
+    execute_statements(conn, '''
+        -- Laporan bot bersama untuk semua worker (satu baris per jenis laporan)
+        CREATE TABLE IF NOT EXISTS bot_reports (
+            key TEXT PRIMARY KEY,
+            message TEXT NOT NULL,
+            category TEXT NOT NULL,
+            generated_at TEXT NOT NULL
+        );
+        -- Lease antar proses: hanya satu pemilik per nama sampai expires_at (epoch detik)
+        CREATE TABLE IF NOT EXISTS leases (
+            name TEXT PRIMARY KEY,
+            owner TEXT NOT NULL,
+            expires_at REAL NOT NULL
+        );
+    ''')
+
+def migration_006_risk_watch(conn):
+    # Set tugas berisiko untuk banner bot, dijaga trigger; isi awal dari tugas yang ada
+    execute_statements(conn, RISK_WATCH_SCHEMA)
+    conn.execute(f'''
+        INSERT OR REPLACE INTO risk_watch (task_id, name, completion_date)
+        SELECT id, name, completion_date FROM tasks AS new WHERE {RISK_WATCH_CONDITION}
+    ''')
+
+def migration_007_search_index(conn):
+    execute_statements(conn, SEARCH_INDEX_SCHEMA)
+    rebuild_search_index(conn)
+
+def migration_008_rollups(conn):
+    execute_statements(conn, ROLLUP_SCHEMA)
+    rebuild_rollups(conn)
+
+def migration_009_events(conn):
+    # Antrean event untuk /api/stream lintas worker (EVENT_BROKER = 'sqlite'); dipangkas saat publish
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            event TEXT NOT NULL,
+            data TEXT NOT NULL,
+            created_at REAL NOT NULL
+        )
+    ''')
+
+def migration_010_task_archive(conn):
+    # Arsip tugas lama + view all_tasks; total finansial & rollup ikut dijaga trigger arsip
+    execute_statements(conn, TASK_ARCHIVE_SCHEMA)
+    execute_statements(conn, build_rollup_schema(ARCHIVE_ROLLUP_SOURCES))
+
+def migration_011_task_archive_update(conn):
+    # Trigger UPDATE arsip untuk task_totals + perbaiki total & AUTOINCREMENT yang sudah melenceng
+    execute_statements(conn, TASK_ARCHIVE_UPDATE_SCHEMA)
+    rebuild_financial_summary(conn, 'all_tasks')
+    sync_task_sequence(conn)
+
+MIGRATIONS = [
+    migration_001_base_schema,
+    migration_002_financial_summary,
+    migration_003_hot_query_indexes,
+    migration_004_data_version,
+    migration_005_bot_reports_and_leases,
+    migration_006_risk_watch,
+    migration_007_search_index,
+    migration_008_rollups,
+    migration_009_events,
+    migration_010_task_archive,
+    migration_011_task_archive_update,
+]
+
+def schema_version(conn):
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+def migrate_db(conn):
+    """Menerapkan migrasi yang belum dijalankan; mengembalikan daftar nomor versi yang diterapkan."""
+    applied = []
+    current = schema_version(conn)
+    if current > len(MIGRATIONS):
+        raise RuntimeError(f'Versi skema database ({current}) lebih baru dari aplikasi ({len(MIGRATIONS)}).')
+    for version, migration in enumerate(MIGRATIONS[current:], start=current + 1):
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            # Proses lain mungkin sudah menjalankan migrasi ini saat kita menunggu lock
+            if schema_version(conn) >= version:
+                conn.rollback()
+                continue
+            migration(conn)
+            conn.execute(f'PRAGMA user_version = {version}')
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        applied.append(version)
+    return applied
+
+def read_data_version(conn):
+    row = conn.execute("SELECT value FROM app_meta WHERE key = 'data_version'").fetchone()
+    return row['value'] if row else 0
+
+def bump_data_version(conn):
+    """Menaikkan versi data; panggil di transaksi yang sama dengan penulisan, sebelum commit."""
+    conn.execute("UPDATE app_meta SET value = value + 1 WHERE key = 'data_version'")
+
+# --- BOOTSTRAP DATABASE (flask init-db / otomatis saat pool pertama dibuat) ---
+# Import modul tidak menyentuh database. Skema & admin bawaan disiapkan oleh `flask init-db`
+# atau, jika AUTO_MIGRATE aktif, sekali per proses saat pool koneksi pertama dibuat.
+# Pada database yang sudah terbaru, pemeriksaannya hanya PRAGMA user_version.
+
+def seed_default_admin(conn):
+    """Membuat admin bawaan hanya jika belum ada pengguna sama sekali (hash pbkdf2 sengaja mahal)."""
+    if conn.execute('SELECT 1 FROM users LIMIT 1').fetchone() is not None:
+        return False
     hashed_password = generate_password_hash('admin123', method='pbkdf2:sha256')
     try:
         conn.execute('INSERT INTO users (username, password_hash) VALUES (?, ?)', 
                      ('admin', hashed_password))
         conn.commit()
     except sqlite3.IntegrityError:
-        pass 
+        # Proses lain lebih dulu membuatnya
+        conn.rollback()
+        return False
+    return True
+
+def init_db(conn):
+    """Menerapkan migrasi yang belum jalan lalu membuat admin bawaan; no-op jika skema sudah terbaru."""
+    if schema_version(conn) == len(MIGRATIONS):
+        return []
+    applied = migrate_db(conn)
+    seed_default_admin(conn)
+    return applied
+
+# --- LOADER DATA (PAGINASI KEYSET) ---
+
+def page_limit(limit=None):
+    """Menormalkan ukuran halaman dari parameter request ke rentang 1..MAX_PAGE_SIZE."""
+    if limit is None:
+        return app.config['PAGE_SIZE']
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+def split_page(rows, limit, cursor_of):
+    """Memotong hasil query LIMIT n+1 menjadi (baris, cursor berikutnya atau None)."""
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, cursor_of(rows[-1])
+    return rows, None
+
+def load_tasks_page(conn, cursor=None, limit=None):
+    """Memuat satu halaman tugas (terbaru dulu); cursor adalah id tugas terakhir yang sudah tampil."""
+    limit = page_limit(limit)
+    if cursor is None:
+        rows = conn.execute('SELECT * FROM tasks ORDER BY id DESC LIMIT ?', (limit + 1,)).fetchall()
+    else:
+        rows = conn.execute('SELECT * FROM tasks WHERE id < ? ORDER BY id DESC LIMIT ?', (cursor, limit + 1)).fetchall()
+    return split_page(rows, limit, lambda row: row['id'])
+
+def encode_expense_cursor(row):
+    return f"{row['date']}|{row['id']}"
+
+def decode_expense_cursor(cursor):
+    """Mengurai cursor pengeluaran 'tanggal|id'; melempar ValueError jika formatnya salah."""
+    date, sep, expense_id = cursor.rpartition('|')
+    if not sep or not date:
+        raise ValueError('cursor tidak valid')
+    return date, int(expense_id)
+
+def load_expenses_page(conn, cursor=None, limit=None):
+    """Memuat satu halaman pengeluaran urut (date DESC, id DESC); cursor berformat 'tanggal|id'."""
+    limit = page_limit(limit)
+    if cursor is None:
+        rows = conn.execute('SELECT * FROM expenses ORDER BY date DESC, id DESC LIMIT ?', (limit + 1,)).fetchall()
+    else:
+        date, expense_id = decode_expense_cursor(cursor)
+        rows = conn.execute(
+            'SELECT * FROM expenses WHERE (date, id) < (?, ?) ORDER BY date DESC, id DESC LIMIT ?',
+            (date, expense_id, limit + 1)
+        ).fetchall()
+    return split_page(rows, limit, encode_expense_cursor)
+
+def load_client_jobs_page(conn, client_id, cursor=None, limit=None):
+    """Memuat satu halaman riwayat tugas milik satu klien; cursor adalah id tugas terakhir."""
+    limit = page_limit(limit)
+    if cursor is None:
+        rows = conn.execute(
+            'SELECT id, name, status, price, paid FROM all_tasks WHERE client_id = ? ORDER BY id DESC LIMIT ?',
+            (client_id, limit + 1)
+        ).fetchall()
+    else:
+        rows = conn.execute(
+            'SELECT id, name, status, price, paid FROM all_tasks WHERE client_id = ? AND id < ? ORDER BY id DESC LIMIT ?',
+            (client_id, cursor, limit + 1)
+        ).fetchall()
+    return split_page(rows, limit, lambda row: row['id'])
+
+def load_clients_summary(conn, jobs_limit=None):
+    """Memuat semua klien beserta riwayat tugas (termasuk arsip) dan agregatnya dalam dua query berbasis set (tanpa N+1).
+
+    Jika jobs_limit diisi, hanya jobs_limit tugas terbaru per klien yang dimuat; sisanya
+    bisa diambil lewat jobs_cursor dan endpoint /api/clients/<id>/jobs.
+    """
+    clients = conn.execute('''
+        SELECT c.*,
+               COALESCE(t.total_revenue, 0) AS total_revenue,
+               COALESCE(t.jobs_done, 0) AS jobs_done,
+               COALESCE(t.job_count, 0) AS job_count
+        FROM clients c
+        LEFT JOIN (
+            SELECT client_id, SUM(price) AS total_revenue, SUM(status = 'Done') AS jobs_done, COUNT(*) AS job_count
+            FROM all_tasks
+            WHERE client_id IS NOT NULL
+            GROUP BY client_id
+        ) t ON t.client_id = c.id
+        ORDER BY c.name
+    ''').fetchall()
+
+    if jobs_limit is None:
+        jobs = conn.execute('''
+            SELECT client_id, id, name, status, price, paid
+            FROM all_tasks
+            WHERE client_id IS NOT NULL
+            ORDER BY client_id, id DESC
+        ''')
+    else:
+        jobs = conn.execute('''
+            SELECT client_id, id, name, status, price, paid
+            FROM (
+                SELECT client_id, id, name, status, price, paid,
+                       ROW_NUMBER() OVER (PARTITION BY client_id ORDER BY id DESC) AS rn
+                FROM all_tasks
+                WHERE client_id IS NOT NULL
+            )
+            WHERE rn <= ?
+            ORDER BY client_id, id DESC
+        ''', (jobs_limit,))
+
+    jobs_by_client = {}
+    for job in jobs:
+        jobs_by_client.setdefault(job['client_id'], []).append(
+            {'id': job['id'], 'name': job['name'], 'status': job['status'], 'price': job['price'], 'paid': job['paid']}
+        )
 
-    conn.close()
+    clients_data = []
+    for client in clients:
+        client_dict = dict(client)
+        client_dict['jobs'] = jobs_by_client.get(client['id'], [])
+        has_more = client_dict['job_count'] > len(client_dict['jobs'])
+        client_dict['jobs_cursor'] = client_dict['jobs'][-1]['id'] if has_more else None
+        clients_data.append(client_dict)
+    return clients_data
 
-create_table()
 
 # --- FUNGSI BOT ASISTEN (JOB YANG DIJADWALKAN) ---
+# Laporan bot disimpan di tabel bot_reports agar semua worker (gunicorn) melihat laporan yang sama.
+# Banner dihitung ulang dari risk_watch setiap kali tugas ditulis, bukan dengan memindai tasks.
+# Hanya proses pemegang lease 'bot_scheduler' yang menjadwalkan & menjalankan job pergantian hari;
+# proses lain hanya memperpanjang/mencoba merebut lease lewat job heartbeat.
+
+DAILY_REPORT_KEY = 'daily_risk'
+SCHEDULER_LEASE = 'bot_scheduler'
+SCHEDULER_OWNER = f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}'
+report_cache = TTLCache(maxsize=4, ttl=app.config['BOT_REPORT_CACHE_TTL'])
+
+def fetch_high_priority_risks(conn, today=None):
+    """Tugas High-Priority yang belum selesai dengan deadline dalam 7 hari ke depan (dari set risk_watch)."""
+    today = today or current_time().date()
+    return conn.execute('''
+        SELECT name, completion_date
+        FROM risk_watch
+        WHERE completion_date BETWEEN ? AND ?
+    ''', (today.strftime('%Y-%m-%d'), (today + timedelta(days=7)).strftime('%Y-%m-%d'))).fetchall()
+
+def save_daily_report(conn, message, category, generated_at):
+    conn.execute('''
+        INSERT INTO bot_reports (key, message, category, generated_at) VALUES (?, ?, ?, ?)
+        ON CONFLICT(key) DO UPDATE SET message = excluded.message, category = excluded.category,
+                                       generated_at = excluded.generated_at
+    ''', (DAILY_REPORT_KEY, message, category, generated_at.isoformat(timespec='seconds')))
+
+def get_daily_report(conn=None):
+    """Laporan bot terakhir ({} jika belum ada), di-cache per proses selama BOT_REPORT_CACHE_TTL detik."""
+    report = report_cache.get(DAILY_REPORT_KEY)
+    if report is None:
+        row = (conn or get_db_connection()).execute(
+            'SELECT message, category, generated_at FROM bot_reports WHERE key = ?', (DAILY_REPORT_KEY,)
+        ).fetchone()
+        report = {}
+        if row:
+            generated_at = datetime.fromisoformat(row['generated_at'])
+            report = {
+                'message': row['message'],
+                'category': row['category'],
+                'timestamp': generated_at.strftime('%d %B %Y, %H:%M'),
+                'generated_at': row['generated_at'],
+            }
+        report_cache.set(DAILY_REPORT_KEY, report)
+    return report
+
+def generate_daily_report(conn, now=None):
+    """Menghitung ulang banner risiko dari risk_watch dan menyimpannya; murah, dipanggil setelah setiap penulisan tugas."""
+    now = now or current_time()
+    # Hitung & simpan dalam satu transaksi tulis agar penulis yang bersamaan tidak menimpa dengan hasil basi
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        risky_count = len(fetch_high_priority_risks(conn, now.date()))
 
-def bot_job_generate_daily_report():
-    """Fungsi Bot yang memeriksa tugas prioritas tinggi yang berdekatan dengan deadline."""
-    global DAILY_REPORT
-    print(f"--- Bot Job: Generating Daily Risk Report at {datetime.now()} ---")
-    
-    conn = get_db_connection()
-    seven_days_from_now = (datetime.now() + timedelta(days=7)).strftime('%Y-%m-%d')
-
-    risky_tasks = conn.execute(f'''
-        SELECT name, completion_date, priority
-        FROM tasks 
-        WHERE status IN ('To Do', 'In Progress') 
-          AND priority = 'High'
-          AND completion_date BETWEEN date('now') AND ?
-    ''', (seven_days_from_now,)).fetchall()
-    
-    conn.close()
-    
-    risky_count = len(risky_tasks)
-    
-    if risky_count > 0:
-        message = f"🚨 PERINGATAN RISIKO BOT: Ada {risky_count} Tugas Prioritas Tinggi yang Deadline-nya dalam 7 hari ke depan. Harap segera dialokasikan waktu!"
-        category = 'danger'
-    else:
-        message = "✅ LAPORAN BOT: Tidak ada risiko deadline High-Priority dalam minggu ini. Semua terkendali."
-        category = 'success'
-        
-    DAILY_REPORT = {
-        'message': message, 
-        'category': category, 
-        'timestamp': datetime.now().strftime('%d %B %Y, %H:%M')
-    }
+        if risky_count > 0:
+            message = f"🚨 PERINGATAN RISIKO BOT: Ada {risky_count} Tugas Prioritas Tinggi yang Deadline-nya dalam 7 hari ke depan. Harap segera dialokasikan waktu!"
+            category = 'danger'
+        else:
+            message = "✅ LAPORAN BOT: Tidak ada risiko deadline High-Priority dalam minggu ini. Semua terkendali."
+            category = 'success'
+
+        save_daily_report(conn, message, category, now)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    report_cache.pop(DAILY_REPORT_KEY)
+    return message
+
+def roll_over_risk_watch(conn, today):
+    """Membuang tugas yang deadline-nya sudah lewat dari set risk_watch; mengembalikan jumlah baris yang dibuang."""
+    removed = conn.execute('DELETE FROM risk_watch WHERE completion_date < ?', (today.strftime('%Y-%m-%d'),)).rowcount
+    conn.commit()
+    return removed
+
+def bot_job_roll_over_risk_report():
+    """Job pergantian hari: menuakan set risk_watch lalu memperbarui banner untuk tanggal baru."""
+    # Job scheduler berjalan di thread sendiri tanpa app context
+    with app.app_context():
+        conn = get_db_connection()
+        # Lease bisa hilang sejak job dijadwalkan (mis. proses sempat macet); jangan jalan ganda
+        if not acquire_lease(conn, SCHEDULER_LEASE, SCHEDULER_OWNER, app.config['SCHEDULER_LEASE_TTL']):
+            print("Report skipped: scheduler lease dipegang proses lain.")
+            return
+        now = current_time()
+        removed = roll_over_risk_watch(conn, now.date())
+        message = generate_daily_report(conn, now)
+        publish_report(get_daily_report(conn))
+    print(f"--- Bot Job: Risk Report rolled over at {now} ({removed} tugas lewat deadline dibuang) ---")
     print(f"Report Generated: {message}")
 
+def acquire_lease(conn, name, owner, ttl, now=None):
+    """Mengambil/memperpanjang lease bernama; True jika `owner` memegangnya sampai now + ttl detik.
+
+    Lease milik proses lain hanya bisa direbut setelah kedaluwarsa, jadi proses yang mati
+    digantikan paling lambat setelah `ttl` detik.
+    """
+    now = time.time() if now is None else now
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        conn.execute('''
+            INSERT INTO leases (name, owner, expires_at) VALUES (:name, :owner, :expires_at)
+            ON CONFLICT(name) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at
+            WHERE leases.owner = excluded.owner OR leases.expires_at < :now
+        ''', {'name': name, 'owner': owner, 'expires_at': now + ttl, 'now': now})
+        holder = conn.execute('SELECT owner FROM leases WHERE name = ?', (name,)).fetchone()['owner']
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return holder == owner
+
+def release_lease(conn, name, owner):
+    conn.execute('DELETE FROM leases WHERE name = ? AND owner = ?', (name, owner))
+    conn.commit()
+
+# Job yang hanya boleh berjalan di satu proses: id -> argumen scheduler.add_job
+LEADER_JOBS = {}
+
+def register_leader_job(job_id, func, **trigger_args):
+    LEADER_JOBS[job_id] = dict(func=func, **trigger_args)
+
+# Job pergantian hari untuk Bot (setiap hari pukul 00:00); sisanya diperbarui saat tugas ditulis
+register_leader_job('RiskReportRollover', bot_job_roll_over_risk_report, trigger='cron', hour=0, minute=0)
+
+def scheduler_heartbeat():
+    """Dijalankan berkala di setiap proses: hanya pemegang lease yang punya job di LEADER_JOBS."""
+    with app.app_context():
+        conn = get_db_connection()
+        is_leader = acquire_lease(conn, SCHEDULER_LEASE, SCHEDULER_OWNER, app.config['SCHEDULER_LEASE_TTL'])
+        report = get_daily_report(conn) if is_leader else {}
+    became_leader = False
+
+    for job_id, job_args in LEADER_JOBS.items():
+        has_job = scheduler.get_job(job_id) is not None
+        if is_leader and not has_job:
+            scheduler.add_job(id=job_id, **job_args)
+            became_leader = True
+        elif not is_leader and has_job:
+            scheduler.remove_job(job_id)
+
+    # Jalankan segera jika belum ada laporan hari ini (startup pertama / pengganti leader yang mati)
+    if became_leader and (not report or datetime.fromisoformat(report['generated_at']).date() < current_time().date()):
+        bot_job_roll_over_risk_report()
+
+def stop_scheduler():
+    if scheduler.running:
+        scheduler.shutdown(wait=False)
+    with app.app_context():
+        release_lease(get_db_connection(), SCHEDULER_LEASE, SCHEDULER_OWNER)
+
+def start_scheduler():
+    """Menjalankan APScheduler di proses ini; aman dipanggil di setiap worker (lihat scheduled_app)."""
+    if scheduler.running:
+        return
+    scheduler.init_app(app)
+    interval = max(1, app.config['SCHEDULER_LEASE_TTL'] // 3)
+    scheduler.add_job(id='SchedulerHeartbeat', func=scheduler_heartbeat, trigger='interval', seconds=interval)
+    scheduler.start()
+    scheduler_heartbeat()
+    atexit.register(stop_scheduler)
+
+def scheduled_app():
+    """Entry point WSGI dengan scheduler, mis. `gunicorn -w 4 'app:scheduled_app()'`."""
+    start_scheduler()
+    return app
+
+
+# --- PEMERIKSAAN QUERY PLAN ---
+# Query panas yang wajib memakai index tertentu. Query diambil dengan menjalankan
+# fungsi aslinya di bawah trace callback, jadi pemeriksaan selalu sinkron dengan kode.
+QUERY_PLAN_EXPECTATIONS = [
+    ('laporan bot', fetch_high_priority_risks, 'risk_watch', 'idx_risk_watch_deadline'),
+    ('riwayat tugas klien', lambda conn: load_client_jobs_page(conn, 1, cursor=1000), 'all_tasks', 'idx_tasks_client'),
+    ('daftar pengeluaran', lambda conn: load_expenses_page(conn, '2024-01-01|1'), 'expenses', 'idx_expenses_date'),
+    ('aging_analysis', lambda conn: build_aging_analysis(conn), 'tasks', 'idx_tasks_status_deadline'),
+    ('deadline_risk', lambda conn: build_deadline_risk(conn), 'tasks', 'idx_tasks_status_deadline'),
+    ('monthly_cashflow', lambda conn: build_monthly_cashflow(conn), 'rollups', 'PRIMARY KEY'),
+    ('tren', lambda conn: load_rollup_series(conn, 'week', ['paid', 'expenses'], datetime(2024, 1, 1).date()), 'rollups', 'PRIMARY KEY'),
+    ('priority_data', lambda conn: build_priority_data(conn), 'tasks', 'idx_tasks_priority_status_deadline'),
+]
+
+def explain_query_plan(conn, sql):
+    return [row['detail'] for row in conn.execute('EXPLAIN QUERY PLAN ' + sql)]
+
+def query_plan_failures(conn, run, table, index_name):
+    """Menjalankan `run` di bawah trace callback; mengembalikan (sql, plan) yang tidak memakai index_name."""
+    statements = []
+    conn.set_trace_callback(statements.append)
+    try:
+        run(conn)
+    finally:
+        conn.set_trace_callback(None)
+    # Hanya query yang membaca tabel yang diperiksa (lewati ringkasan & kontrol transaksi)
+    checked = [sql for sql in statements if sql.lstrip().upper().startswith(('SELECT', 'WITH')) and f'FROM {table}' in sql]
+    if not checked:
+        return [('(tidak ada query yang tertangkap)', [])]
+    failures = []
+    for sql in checked:
+        plan = explain_query_plan(conn, sql)
+        if not any(index_name in detail for detail in plan):
+            failures.append((sql, plan))
+    return failures
+
+def check_query_plans(conn):
+    """Mengembalikan daftar (label, sql, plan) untuk query yang tidak memakai index yang diharapkan."""
+    failures = []
+    for label, run, table, index_name in QUERY_PLAN_EXPECTATIONS:
+        failures += [(label, sql, plan) for sql, plan in query_plan_failures(conn, run, table, index_name)]
+    return failures
+
+@app.cli.command('check-query-plans')
+def check_query_plans_command():
+    """Memastikan query panas memakai index yang dibuat migrasi (gagal jika terjadi regresi plan)."""
+    failures = check_query_plans(get_db_connection())
+    for label, sql, plan in failures:
+        click.echo(f'[GAGAL] {label}: index tidak dipakai')
+        click.echo('  ' + ' '.join(sql.split()))
+        for detail in plan:
+            click.echo('    ' + detail)
+    if failures:
+        raise SystemExit(1)
+    click.echo(f'Semua {len(QUERY_PLAN_EXPECTATIONS)} query panas memakai index yang diharapkan.')
+
+@app.cli.command('migrate')
+def migrate_command():
+    """Menerapkan migrasi skema yang belum dijalankan."""
+    conn = get_db_connection()
+    applied = migrate_db(conn)
+    click.echo(f'Versi skema: {schema_version(conn)} (diterapkan: {applied or "tidak ada"})')
+
+@app.cli.command('init-db')
+def init_db_command():
+    """Menyiapkan database baru/lama: migrasi skema lalu admin bawaan jika belum ada pengguna."""
+    conn = get_db_connection()
+    applied = migrate_db(conn)
+    seeded = seed_default_admin(conn)
+    click.echo(f'Versi skema: {schema_version(conn)} (diterapkan: {applied or "tidak ada"})')
+    if seeded:
+        click.echo("Pengguna admin bawaan dibuat (username 'admin'); segera ganti sandinya.")
+
+
+# --- SNAPSHOT DATABASE (SQLITE BACKUP API) ---
+# Snapshot disalin dengan backup API SQLite per SNAPSHOT_PAGES_PER_STEP halaman dari koneksi
+# terpisah yang memegang satu transaksi baca. Di mode WAL writer tetap berjalan selama
+# penyalinan dan salinannya konsisten pada satu titik waktu (tanpa transaksi baca, setiap
+# penulisan dari koneksi lain membuat backup mengulang dari awal). Salinan dicek
+# integritasnya, dikompres gzip, dan hanya SNAPSHOT_KEEP snapshot terbaru yang disimpan.
+app.config['SNAPSHOT_FOLDER'] = os.path.join(app.root_path, 'snapshots')
+app.config['SNAPSHOT_PAGES_PER_STEP'] = 1024   # 4 MiB per langkah dengan page_size 4096
+app.config['SNAPSHOT_STEP_PAUSE'] = 0.01       # Detik; jeda antar langkah agar I/O request tidak tersendat
+app.config['SNAPSHOT_KEEP'] = 7
+app.config['SNAPSHOT_INTERVAL_HOURS'] = 24
+SNAPSHOT_PREFIX = 'snapshot-'
+SNAPSHOT_SUFFIX = '.db.gz'
+
+def snapshot_path(name):
+    """Path snapshot bernama `name` di SNAPSHOT_FOLDER, atau None jika namanya tidak valid."""
+    if not (name.startswith(SNAPSHOT_PREFIX) and name.endswith(SNAPSHOT_SUFFIX)):
+        return None
+    return safe_join(app.config['SNAPSHOT_FOLDER'], name)
+
+def list_snapshots():
+    """Snapshot yang tersimpan, terbaru dulu: [{'name', 'path', 'size', 'created_at'}]."""
+    folder = app.config['SNAPSHOT_FOLDER']
+    if not os.path.isdir(folder):
+        return []
+    snapshots = []
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            if entry.is_file() and snapshot_path(entry.name):
+                stat = entry.stat()
+                snapshots.append({'name': entry.name, 'path': entry.path, 'size': stat.st_size,
+                                  'created_at': datetime.fromtimestamp(stat.st_mtime)})
+    # Nama berisi timestamp, jadi urutan nama = urutan waktu
+    return sorted(snapshots, key=lambda snapshot: snapshot['name'], reverse=True)
+
+def copy_database(source, target, pages_per_step=-1, pause=0):
+    """Menyalin database `source` ke `target` dengan backup API; mengembalikan jumlah langkah."""
+    steps = [0]
+
+    def progress(status, remaining, total):
+        steps[0] += 1
+        # Parameter `sleep` milik backup() hanya berlaku saat database sibuk, jadi jeda diberikan di sini
+        if remaining and pause:
+            time.sleep(pause)
+
+    source.backup(target, pages=pages_per_step, progress=progress)
+    return steps[0]
+
+def integrity_problems(conn):
+    """Hasil PRAGMA integrity_check selain 'ok' (kosong berarti database utuh)."""
+    return [row[0] for row in conn.execute('PRAGMA integrity_check') if row[0] != 'ok']
+
+def create_snapshot(label=None, now=None):
+    """Menyalin DATABASE ke SNAPSHOT_FOLDER secara online lalu mengompresnya; mengembalikan info snapshot."""
+    now = now or current_time()
+    folder = app.config['SNAPSHOT_FOLDER']
+    os.makedirs(folder, exist_ok=True)
+    name = f"{SNAPSHOT_PREFIX}{now.strftime('%Y%m%d-%H%M%S')}{'-' + label if label else ''}{SNAPSHOT_SUFFIX}"
+    fd, raw_path = tempfile.mkstemp(dir=folder, prefix='incoming-', suffix='.db')
+    os.close(fd)
+    compressed_path = raw_path + '.gz'
+    try:
+        source = sqlite3.connect(app.config['DATABASE'], timeout=app.config['SQLITE_BUSY_TIMEOUT_MS'] / 1000,
+                                 isolation_level=None)
+        target = sqlite3.connect(raw_path, isolation_level=None)
+        try:
+            # Transaksi baca menetapkan titik snapshot; penulisan setelahnya tidak ikut dan tidak memblokir
+            source.execute('BEGIN')
+            source.execute('SELECT COUNT(*) FROM sqlite_master').fetchone()
+            steps = copy_database(source, target, app.config['SNAPSHOT_PAGES_PER_STEP'], app.config['SNAPSHOT_STEP_PAUSE'])
+            source.execute('COMMIT')
+            # Salinan harus berdiri sendiri tanpa file -wal
+            target.execute('PRAGMA journal_mode = DELETE')
+            problems = integrity_problems(target)
+        finally:
+            source.close()
+            target.close()
+        if problems:
+            raise RuntimeError(f'Salinan database rusak: {"; ".join(problems[:5])}')
+
+        with open(raw_path, 'rb') as raw, gzip.open(compressed_path, 'wb', compresslevel=6) as out:
+            shutil.copyfileobj(raw, out, 1024 * 1024)
+        path = os.path.join(folder, name)
+        os.replace(compressed_path, path)
+    finally:
+        for leftover in (raw_path, compressed_path):
+            if os.path.exists(leftover):
+                os.remove(leftover)
+    return {'name': name, 'path': path, 'size': os.path.getsize(path), 'steps': steps}
+
+def prune_snapshots(keep=None):
+    """Menghapus snapshot di luar `keep` (default SNAPSHOT_KEEP) yang terbaru; mengembalikan nama yang dihapus."""
+    keep = app.config['SNAPSHOT_KEEP'] if keep is None else keep
+    removed = []
+    for snapshot in list_snapshots()[keep:]:
+        try:
+            os.remove(snapshot['path'])
+            removed.append(snapshot['name'])
+        except FileNotFoundError:
+            pass
+    return removed
+
+@contextmanager
+def extracted_snapshot(path):
+    """Mendekompres snapshot ke file sementara di SNAPSHOT_FOLDER; file dihapus saat keluar."""
+    with tempfile.TemporaryDirectory(dir=app.config['SNAPSHOT_FOLDER'], prefix='extract-') as tmp:
+        raw_path = os.path.join(tmp, 'snapshot.db')
+        with gzip.open(path, 'rb') as compressed, open(raw_path, 'wb') as raw:
+            shutil.copyfileobj(compressed, raw, 1024 * 1024)
+        yield raw_path
+
+# Tabel data yang dihitung saat verifikasi -> versi skema yang membuatnya (snapshot lama belum punya arsip)
+SNAPSHOT_TABLES = {'tasks': 1, 'tasks_archive': 10, 'clients': 1, 'expenses': 1}
+
+def snapshot_counts(conn, version):
+    """Jumlah baris per tabel data; mengembalikan (counts, problems) untuk tabel yang seharusnya ada."""
+    existing = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    counts, problems = {}, []
+    for table, since in SNAPSHOT_TABLES.items():
+        if table in existing:
+            counts[table] = conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+        elif version >= since:
+            problems.append(f'Tabel {table} tidak ada di snapshot versi skema {version}.')
+    return counts, problems
+
+def verify_snapshot(path):
+    """Mengecek snapshot bisa didekompres dan utuh; mengembalikan {'problems', 'schema_version', 'counts'}."""
+    try:
+        with extracted_snapshot(path) as raw_path:
+            conn = sqlite3.connect(raw_path)
+            try:
+                problems = integrity_problems(conn)
+                version = schema_version(conn)
+                counts = {}
+                if not problems:
+                    counts, problems = snapshot_counts(conn, version)
+            finally:
+                conn.close()
+    except (OSError, EOFError, sqlite3.DatabaseError) as e:
+        return {'problems': [f'{type(e).__name__}: {e}'], 'schema_version': None, 'counts': {}}
+    if version > len(MIGRATIONS):
+        problems.append(f'Versi skema snapshot ({version}) lebih baru dari aplikasi ({len(MIGRATIONS)}).')
+    return {'problems': problems, 'schema_version': version, 'counts': counts}
+
+def restore_snapshot(path):
+    """Mengganti isi DATABASE dengan snapshot (satu langkah backup, atomik bagi pembaca lain).
+
+    Snapshot diverifikasi dulu; skema lama dimigrasi, dan versi data dinaikkan melewati nilai
+    sebelum restore agar cache per versi data di semua proses tidak menyajikan data lama.
+    """
+    report = verify_snapshot(path)
+    if report['problems']:
+        raise ValueError('; '.join(report['problems'][:5]))
+    conn = get_db_connection()
+    previous_version = read_data_version(conn)
+    conn.commit()
+    with extracted_snapshot(path) as raw_path:
+        source = sqlite3.connect(raw_path)
+        target = sqlite3.connect(app.config['DATABASE'], timeout=app.config['SQLITE_BUSY_TIMEOUT_MS'] / 1000,
+                                 isolation_level=None)
+        try:
+            copy_database(source, target)
+        finally:
+            source.close()
+            target.close()
+
+    migrate_db(conn)
+    conn.execute("UPDATE app_meta SET value = MAX(value, ?) + 1 WHERE key = 'data_version'", (previous_version,))
+    conn.commit()
+    clear_caches()
+    generate_daily_report(conn)
+    publish_change(conn, 'restore', report=get_daily_report(conn), snapshot=os.path.basename(path))
+    return report
+
+def bot_job_snapshot():
+    with app.app_context():
+        snapshot = create_snapshot()
+        removed = prune_snapshots()
+    print(f"--- Bot Job: Snapshot {snapshot['name']} ({snapshot['size']} byte) at {current_time()} "
+          f"({len(removed)} snapshot lama dihapus) ---")
+
+register_leader_job('DatabaseSnapshot', bot_job_snapshot, trigger='interval', hours=app.config['SNAPSHOT_INTERVAL_HOURS'])
+
+@app.cli.group('snapshot')
+def snapshot_group():
+    """Snapshot database online (backup API SQLite, gzip, retensi)."""
+
+@snapshot_group.command('create')
+@click.option('--keep', type=int, default=None, help='Jumlah snapshot terbaru yang disimpan (default SNAPSHOT_KEEP).')
+def snapshot_create_command(keep):
+    """Membuat snapshot baru lalu menerapkan retensi."""
+    snapshot = create_snapshot()
+    removed = prune_snapshots(keep)
+    click.echo(f"{snapshot['name']}: {snapshot['size']} byte ({snapshot['steps']} langkah backup)")
+    if removed:
+        click.echo(f"Dihapus oleh retensi: {', '.join(removed)}")
+
+@snapshot_group.command('list')
+def snapshot_list_command():
+    """Menampilkan snapshot yang tersimpan, terbaru dulu."""
+    snapshots = list_snapshots()
+    if not snapshots:
+        click.echo(f"Belum ada snapshot di {app.config['SNAPSHOT_FOLDER']}.")
+    for snapshot in snapshots:
+        click.echo(f"{snapshot['name']:50} {snapshot['size']:>14,} byte  {snapshot['created_at']:%Y-%m-%d %H:%M:%S}")
+
+def resolve_snapshot(name):
+    """Path snapshot dari nama (atau 'latest'); click.BadParameter jika tidak ada."""
+    if name == 'latest':
+        snapshots = list_snapshots()
+        if not snapshots:
+            raise click.BadParameter('belum ada snapshot.', param_hint='NAME')
+        return snapshots[0]['path']
+    path = snapshot_path(name)
+    if path is None or not os.path.isfile(path):
+        raise click.BadParameter(f'snapshot {name} tidak ditemukan.', param_hint='NAME')
+    return path
+
+@snapshot_group.command('verify')
+@click.argument('name', default='latest')
+def snapshot_verify_command(name):
+    """Mendekompres snapshot dan menjalankan PRAGMA integrity_check."""
+    report = verify_snapshot(resolve_snapshot(name))
+    if report['problems']:
+        for problem in report['problems']:
+            click.echo(f'  {problem}', err=True)
+        raise SystemExit(1)
+    counts = ', '.join(f'{table} {count}' for table, count in report['counts'].items())
+    click.echo(f"OK: versi skema {report['schema_version']}, {counts}")
+
+@snapshot_group.command('restore')
+@click.argument('name')
+@click.option('--no-backup', is_flag=True, help='Jangan buat snapshot isi database saat ini sebelum restore.')
+@click.confirmation_option(prompt='Isi database saat ini akan diganti. Lanjutkan?')
+def snapshot_restore_command(name, no_backup):
+    """Mengganti isi database dengan snapshot NAME (atau 'latest')."""
+    path = resolve_snapshot(name)
+    if not no_backup:
+        click.echo(f"Snapshot sebelum restore: {create_snapshot(label='pre-restore')['name']}")
+    try:
+        report = restore_snapshot(path)
+    except ValueError as e:
+        raise click.ClickException(f'Snapshot tidak valid: {e}')
+    counts = ', '.join(f'{table} {count}' for table, count in report['counts'].items())
+    click.echo(f'Database dipulihkan dari {os.path.basename(path)}: {counts}')
+
+
+# --- JOB ARSIP TUGAS ---
+# Memindahkan tugas lama ke tasks_archive per ARCHIVE_BATCH_SIZE baris; setiap batch
+# satu transaksi singkat sehingga writer lain tidak tertahan lama.
+app.config['ARCHIVE_AFTER_DAYS'] = 365      # Umur minimal (dari completion_date) tugas yang diarsipkan
+app.config['ARCHIVE_BATCH_SIZE'] = 500      # <= 999 agar muat sebagai parameter IN (...) di SQLite lama
+
+ARCHIVE_CONDITION = '''
+    status = 'Done' AND paid >= price
+    AND completion_date < :cutoff AND date(completion_date) = completion_date
+'''
+
+def archive_cutoff(days=None, today=None):
+    days = app.config['ARCHIVE_AFTER_DAYS'] if days is None else days
+    return ((today or current_time().date()) - timedelta(days=days)).strftime('%Y-%m-%d')
+
+# id yang sudah dipakai baris arsip (mis. hasil import lama) dilewati, bukan menggagalkan batch
+ARCHIVE_ID_FREE = 'NOT EXISTS (SELECT 1 FROM tasks_archive AS a WHERE a.id = tasks.id)'
+
+def count_archivable_tasks(conn, cutoff):
+    return conn.execute(f'SELECT COUNT(*) FROM tasks WHERE {ARCHIVE_CONDITION} AND {ARCHIVE_ID_FREE}',
+                        {'cutoff': cutoff}).fetchone()[0]
+
+def archive_id_collisions(conn, cutoff):
+    """id tugas yang siap diarsipkan tetapi sudah ada di tasks_archive (tidak akan dipindahkan)."""
+    return [row[0] for row in conn.execute(
+        f'SELECT id FROM tasks WHERE {ARCHIVE_CONDITION} AND NOT {ARCHIVE_ID_FREE} ORDER BY id', {'cutoff': cutoff}
+    )]
+
+def archive_tasks(conn, cutoff, batch_size=None):
+    """Memindahkan tugas Done yang lunas dengan completion_date < cutoff ke tasks_archive; mengembalikan jumlahnya."""
+    batch_size = batch_size or app.config['ARCHIVE_BATCH_SIZE']
+    archived_at = current_time().isoformat(timespec='seconds')
+    collisions = archive_id_collisions(conn, cutoff)
+    if collisions:
+        app.logger.warning('Arsip tugas: id %s sudah ada di tasks_archive, tugas dilewati', ', '.join(map(str, collisions[:20])))
+    moved = 0
+    while True:
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            ids = [row[0] for row in conn.execute(
+                f'SELECT id FROM tasks WHERE {ARCHIVE_CONDITION} AND {ARCHIVE_ID_FREE} ORDER BY id LIMIT :limit',
+                {'cutoff': cutoff, 'limit': batch_size}
+            )]
+            if not ids:
+                conn.rollback()
+                return moved
+            placeholders = ', '.join('?' * len(ids))
+            # Salin dulu, baru hapus: trigger arsip menambah total yang dikurangi trigger tasks
+            conn.execute(f'INSERT INTO tasks_archive ({TASK_COLUMNS}, archived_at) '
+                         f'SELECT {TASK_COLUMNS}, ? FROM tasks WHERE id IN ({placeholders})', (archived_at, *ids))
+            conn.execute(f'DELETE FROM tasks WHERE id IN ({placeholders})', ids)
+            bump_data_version(conn)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        moved += len(ids)
+        if len(ids) < batch_size:
+            return moved
+
+def bot_job_archive_tasks():
+    with app.app_context():
+        conn = get_db_connection()
+        before = load_dashboard_summary(conn)
+        cutoff = archive_cutoff()
+        moved = archive_tasks(conn, cutoff)
+        if moved:
+            publish_change(conn, 'archive', before, archived=moved)
+    print(f"--- Bot Job: Task archive at {current_time()} ({moved} tugas sebelum {cutoff} diarsipkan) ---")
+
+register_leader_job('TaskArchive', bot_job_archive_tasks, trigger='cron', hour=1, minute=30)
+
+@app.cli.command('archive-tasks')
+@click.option('--days', type=int, default=None, help='Umur minimal tugas dalam hari (default ARCHIVE_AFTER_DAYS).')
+@click.option('--dry-run', is_flag=True, help='Hanya hitung tugas yang akan diarsipkan.')
+def archive_tasks_command(days, dry_run):
+    """Memindahkan tugas Done yang lunas dan sudah lama ke tasks_archive."""
+    conn = get_db_connection()
+    cutoff = archive_cutoff(days)
+    if dry_run:
+        click.echo(f'{count_archivable_tasks(conn, cutoff)} tugas dengan completion_date < {cutoff} siap diarsipkan.')
+        collisions = archive_id_collisions(conn, cutoff)
+        if collisions:
+            click.echo(f"{len(collisions)} tugas akan dilewati karena id-nya sudah ada di arsip: {', '.join(map(str, collisions[:20]))}")
+        return
+    before = load_dashboard_summary(conn)
+    moved = archive_tasks(conn, cutoff)
+    if moved:
+        publish_change(conn, 'archive', before, archived=moved)
+    active, archived = (conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0] for table in ('tasks', 'tasks_archive'))
+    click.echo(f'{moved} tugas diarsipkan (completion_date < {cutoff}); aktif {active}, arsip {archived}.')
+    collisions = archive_id_collisions(conn, cutoff)
+    if collisions:
+        click.echo(f"{len(collisions)} tugas dilewati karena id-nya sudah ada di arsip: {', '.join(map(str, collisions[:20]))}")
+
 
 # --- ROUTES OTENTIKASI ---
 
@@ -188,7 +1868,6 @@ def login():
         
         conn = get_db_connection()
         user_data = conn.execute("SELECT id, username, password_hash, profile_pic FROM users WHERE username = ?", (username,)).fetchone()
-        conn.close()
 
         if user_data:
             user = User(user_data['id'], user_data['username'], user_data['password_hash'], user_data['profile_pic'])
@@ -212,50 +1891,465 @@ def logout():
     return redirect(url_for('login'))
 
 
+# --- ASET STATIS (FINGERPRINT & PRECOMPRESSED) ---
+# url_for('static', ...) otomatis menambahkan ?v=<hash isi>. Request dengan hash yang
+# cocok disajikan dengan Cache-Control immutable 1 tahun, jadi browser tidak perlu
+# bertanya lagi sampai isi file (dan URL-nya) berubah. Varian .br/.gz hasil
+# `flask compress-static` dipilih sesuai Accept-Encoding jika masih lebih baru dari aslinya.
+STATIC_MAX_AGE = 365 * 24 * 60 * 60
+COMPRESSIBLE_EXTENSIONS = {'.css', '.js', '.mjs', '.svg', '.html', '.json', '.txt', '.map', '.xml'}
+PRECOMPRESSED_VARIANTS = (('br', '.br'), ('gzip', '.gz'))
+
+@functools.lru_cache(maxsize=1024)
+def file_fingerprint(path, mtime_ns, size):
+    """Hash isi file; mtime & ukuran ikut jadi kunci cache sehingga file yang berubah di-hash ulang."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(64 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()[:12]
+
+def static_fingerprint(filename):
+    path = safe_join(app.static_folder, filename)
+    if path is None:
+        return None
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return file_fingerprint(path, stat.st_mtime_ns, stat.st_size)
+
+@app.url_defaults
+def add_static_fingerprint(endpoint, values):
+    if endpoint == 'static' and 'v' not in values:
+        fingerprint = static_fingerprint(values.get('filename', ''))
+        if fingerprint:
+            values['v'] = fingerprint
+
+def precompressed_variant(filename):
+    """(encoding, nama file) varian terkompresi yang diterima browser dan tidak basi, atau None."""
+    original = safe_join(app.static_folder, filename)
+    if original is None or not os.path.isfile(original):
+        return None
+    for encoding, suffix in PRECOMPRESSED_VARIANTS:
+        variant = original + suffix
+        if request.accept_encodings[encoding] and os.path.isfile(variant) \
+                and os.stat(variant).st_mtime_ns >= os.stat(original).st_mtime_ns:
+            return encoding, filename + suffix
+    return None
+
+def serve_static(filename):
+    variant = precompressed_variant(filename)
+    if variant:
+        encoding, variant_name = variant
+        mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        response = send_from_directory(app.static_folder, variant_name, mimetype=mimetype)
+        response.content_encoding = encoding
+    else:
+        response = app.send_static_file(filename)
+    response.vary.add('Accept-Encoding')
+
+    version = request.args.get('v')
+    if version and version == static_fingerprint(filename):
+        response.cache_control.public = True
+        response.cache_control.max_age = STATIC_MAX_AGE
+        response.cache_control.immutable = True
+        response.cache_control.no_cache = None
+    return response
+
+app.view_functions['static'] = serve_static
+
+@app.cli.command('compress-static')
+@click.option('--min-size', default=1024, show_default=True, help='File lebih kecil dari ini tidak dikompres.')
+def compress_static_command(min_size):
+    """Membuat varian .gz (dan .br jika modul brotli terpasang) untuk aset teks di static/."""
+    written = 0
+    for root, _, files in os.walk(app.static_folder):
+        for name in files:
+            path = os.path.join(root, name)
+            if os.path.splitext(name)[1].lower() not in COMPRESSIBLE_EXTENSIONS or os.path.getsize(path) < min_size:
+                continue
+            with open(path, 'rb') as f:
+                data = f.read()
+            variants = [('.gz', gzip.compress(data, compresslevel=9, mtime=0))]
+            if brotli is not None:
+                variants.append(('.br', brotli.compress(data, quality=11)))
+            for suffix, compressed in variants:
+                # Varian yang tidak lebih kecil tidak ada gunanya disajikan
+                if len(compressed) < len(data):
+                    with open(path + suffix, 'wb') as out:
+                        out.write(compressed)
+                    written += 1
+    click.echo(f'{written} varian terkompresi ditulis{"" if brotli else " (brotli tidak terpasang, hanya .gz)"}.')
+
+
+# --- KOMPRESI RESPONSE (GZIP / BROTLI) ---
+# Opt-in lewat COMPRESS_RESPONSES. Response biasa dikompres utuh jika melewati
+# COMPRESS_MIN_SIZE; response streaming (export) dikompres per potongan dengan flush
+# setiap potongan sehingga tetap mengalir ke klien. Brotli dipakai jika modulnya terpasang
+# dan diterima klien. ETag kuat dijadikan lemah karena byte yang dikirim berbeda.
+app.config['COMPRESS_RESPONSES'] = False
+app.config['COMPRESS_MIN_SIZE'] = 1024
+app.config['COMPRESS_LEVEL'] = 6          # gzip 1-9
+app.config['COMPRESS_BROTLI_QUALITY'] = 5  # brotli 0-11; >9 terlalu lambat untuk response dinamis
+COMPRESS_MIMETYPES = {'text/html', 'application/json', 'text/csv', 'application/x-ndjson', 'text/plain'}
+
+def response_compressor(encoding):
+    """(compress(chunk), flush(), finish()) untuk encoding yang dipilih."""
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=app.config['COMPRESS_BROTLI_QUALITY'])
+        return compressor.process, compressor.flush, compressor.finish
+    compressor = zlib.compressobj(app.config['COMPRESS_LEVEL'], zlib.DEFLATED, 31)  # wbits 31 = format gzip
+    return compressor.compress, lambda: compressor.flush(zlib.Z_SYNC_FLUSH), compressor.flush
+
+def compress_chunks(chunks, encoding):
+    compress, flush, finish = response_compressor(encoding)
+    try:
+        for chunk in chunks:
+            data = compress(chunk) + flush()
+            if data:
+                yield data
+        yield finish()
+    finally:
+        # Tutup generator asal agar stream_with_context melepas koneksi database
+        if hasattr(chunks, 'close'):
+            chunks.close()
+
+def choose_encoding():
+    accepted = request.accept_encodings
+    if brotli is not None and accepted['br']:
+        return 'br'
+    if accepted['gzip']:
+        return 'gzip'
+    return None
+
+@app.after_request
+def compress_response(response):
+    if not app.config['COMPRESS_RESPONSES'] or response.status_code != 200 or response.direct_passthrough \
+            or 'Content-Encoding' in response.headers or response.mimetype not in COMPRESS_MIMETYPES:
+        return response
+    response.vary.add('Accept-Encoding')
+    if not response.is_streamed and response.content_length is not None \
+            and response.content_length < app.config['COMPRESS_MIN_SIZE']:
+        return response
+    encoding = choose_encoding()
+    if encoding is None:
+        return response
+
+    if response.is_streamed:
+        response.response = compress_chunks(response.iter_encoded(), encoding)
+        response.headers.pop('Content-Length', None)
+    else:
+        response.set_data(b''.join(compress_chunks([response.get_data()], encoding)))
+    response.content_encoding = encoding
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+
+# --- FRAGMENT TEMPLATE (CACHE PER VERSI DATA) ---
+# Daftar panjang di index.html (baris tugas, baris pengeluaran, kartu klien) dirender dari
+# templates/partials/ dan disimpan per versi data; selama tidak ada penulisan, halaman
+# berikutnya tidak perlu query maupun render ulang bagian tersebut. Fragment yang sangat
+# besar tidak disimpan agar cache tidak menahan puluhan MB per proses.
+app.jinja_env.trim_blocks = True
+app.jinja_env.lstrip_blocks = True
+app.config['FRAGMENT_CACHE_SIZE'] = 32
+app.config['FRAGMENT_CACHE_MAX_BYTES'] = 4 * 1024 * 1024
+fragment_cache = TTLCache(app.config['FRAGMENT_CACHE_SIZE'], ttl=24 * 60 * 60)
+
+def render_fragment(name, version, load):
+    """(html, cursor) untuk partials/<name>.html; load() mengembalikan (konteks template, cursor)."""
+    key = (name, version)
+    cached = fragment_cache.get(key)
+    if cached is None:
+        context, cursor = load()
+        html = render_template(f'partials/{name}.html', **context)
+        cached = (Markup(html), cursor)
+        if len(html) <= app.config['FRAGMENT_CACHE_MAX_BYTES']:
+            fragment_cache.set(key, cached)
+    return cached
+
+def load_task_rows(conn):
+    tasks, cursor = load_tasks_page(conn)
+    return {'tasks': tasks}, cursor
+
+def load_expense_rows(conn):
+    expenses, cursor = load_expenses_page(conn)
+    return {'expenses': expenses}, cursor
+
+def load_client_cards(conn):
+    return {'clients_list': load_clients_summary(conn, jobs_limit=app.config['PAGE_SIZE'])}, None
+
+
 # --- ROUTE UTAMA (MENGIRIM SEMUA DATA KE index.html) ---
 
 @app.route('/', defaults={'page': 'dashboard'})
 @app.route('/<page>')
 @login_required
 def all_pages(page='dashboard'):
-    """Route tunggal yang memuat index.html dengan data spesifik halaman."""
+    """Route tunggal yang memuat index.html dengan data spesifik halaman.
+
+    Hanya dataset yang dirender oleh bagian halaman yang diminta yang dimuat,
+    dan daftar panjang dibatasi satu halaman (sisanya lewat endpoint "load more").
+    Bagian daftar dirender sebagai fragment yang di-cache per versi data.
+    """
     
-    conn = get_db_connection()
     context = {}
     
-    # --- Data Tugas & Dasar ---
-    tasks = conn.execute('SELECT * FROM tasks ORDER BY id DESC').fetchall()
-    context['tasks'] = tasks
-    
-    # --- Data Finansial ---
-    expenses = conn.execute('SELECT * FROM expenses ORDER BY date DESC').fetchall()
-    context['expenses'] = expenses
+    if page in ('dashboard', 'financials', 'clients'):
+        conn = get_db_connection()
+        version = read_data_version(conn)
 
-    # --- Data Klien Rinci ---
-    clients_list = conn.execute('SELECT * FROM clients ORDER BY name').fetchall()
-    clients_data = []
-    for client in clients_list:
-        jobs = conn.execute('SELECT name, status, price, paid FROM tasks WHERE client_id = ? ORDER BY id DESC', (client['id'],)).fetchall()
-        client_dict = dict(client)
-        client_dict['jobs'] = [dict(job) for job in jobs]
-        client_dict['total_revenue'] = sum(job['price'] for job in jobs)
-        client_dict['jobs_done'] = sum(1 for job in jobs if job['status'] == 'Done')
-        clients_data.append(client_dict)
-    context['clients_list'] = clients_data
-    
-    conn.close()
+        # --- Data Tugas & Dasar ---
+        if page == 'dashboard':
+            context['task_rows'], context['tasks_cursor'] = render_fragment('task_rows', version, lambda: load_task_rows(conn))
+
+        # --- Data Finansial ---
+        elif page == 'financials':
+            context['expense_rows'], context['expenses_cursor'] = render_fragment('expense_rows', version, lambda: load_expense_rows(conn))
+
+        # --- Data Klien Rinci ---
+        elif page == 'clients':
+            context['client_cards'], _ = render_fragment('client_cards', version, lambda: load_client_cards(conn))
     
     # --- INJEKSI LAPORAN BOT KE TEMPLATE ---
-    global DAILY_REPORT
-    context['bot_report'] = DAILY_REPORT 
+    context['bot_report'] = get_daily_report()
     
     # --- PERBAIKAN KRITIS: Kirim objek datetime ke template ---
     context['datetime'] = datetime 
 
     return render_template('index.html', current_page=page, user=current_user, **context)
 
+# --- EVENT STREAM (SERVER-SENT EVENTS) ---
+# Setiap route yang menulis mengirim event 'change' kecil (versi data, ringkasan finansial
+# terbaru dan selisihnya) ke /api/stream setelah commit; job bot mengirim event 'report'.
+# Broker bawaan ('memory') hanya menjangkau klien di proses yang sama. Dengan beberapa worker
+# pakai EVENT_BROKER = 'sqlite': event ditulis ke tabel events dan setiap proses membacanya
+# dengan satu thread poller, jadi event dari worker mana pun (termasuk leader scheduler) sampai.
+# Stream memegang satu thread selama klien terhubung: jalankan gunicorn dengan worker gthread/gevent.
+app.config['EVENT_BROKER'] = 'memory'        # 'memory' | 'sqlite'
+app.config['EVENT_BACKLOG'] = 256            # Event terakhir yang bisa diputar ulang lewat Last-Event-ID
+app.config['EVENT_QUEUE_SIZE'] = 100         # Antrean per klien; klien yang tertinggal diminta memuat ulang
+app.config['EVENT_POLL_INTERVAL'] = 0.5      # Detik; hanya untuk broker 'sqlite'
+app.config['EVENT_HEARTBEAT'] = 15           # Detik; komentar keep-alive agar proxy tidak memutus koneksi
+app.config['EVENT_STREAM_MAX_SECONDS'] = 300  # Stream ditutup berkala; browser menyambung ulang otomatis
+app.config['EVENT_RETRY_MS'] = 3000
+
+class EventSubscription:
+    """Antrean event untuk satu klien stream."""
+    def __init__(self, broker, maxsize):
+        self.broker = broker
+        self.queue = queue.Queue(maxsize)
+        self.lagging = False
+
+    def put(self, message):
+        try:
+            self.queue.put_nowait(message)
+        except queue.Full:
+            self.lagging = True
+
+    def get(self, timeout):
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+class EventBroker:
+    """Pub/sub di memori proses dengan backlog untuk memutar ulang event (Last-Event-ID)."""
+    def __init__(self, backlog=256, queue_size=100):
+        self.queue_size = queue_size
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._backlog = deque(maxlen=backlog)
+        self._last_id = 0
+
+    def publish(self, event, data):
+        self.deliver(None, event, data)
+
+    def deliver(self, event_id, event, data):
+        """Mengantarkan event ke semua klien lokal; event_id None = nomor berikutnya dari broker ini."""
+        with self._lock:
+            if event_id is None:
+                event_id = self._last_id + 1
+            message = {'id': event_id, 'event': event, 'data': data}
+            self._last_id = max(self._last_id, event_id)
+            self._backlog.append(message)
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            subscription.put(message)
+
+    def subscribe(self, last_event_id=None):
+        """Mendaftarkan klien; jika last_event_id diberikan, event sesudahnya diantrekan lebih dulu.
+
+        Jika sebagian event itu sudah tidak ada di backlog, klien mendapat event 'reset' dan
+        sebaiknya memuat ulang datanya.
+        """
+        subscription = EventSubscription(self, self.queue_size)
+        with self._lock:
+            self._subscribers.add(subscription)
+            if last_event_id is not None:
+                oldest = self._backlog[0]['id'] if self._backlog else self._last_id + 1
+                if last_event_id > self._last_id or last_event_id < oldest - 1:
+                    subscription.put(self._reset_message())
+                else:
+                    for message in self._backlog:
+                        if message['id'] > last_event_id:
+                            subscription.put(message)
+        return subscription
+
+    def _reset_message(self):
+        return {'id': self._last_id, 'event': 'reset', 'data': {}}
+
+    def reset_message(self):
+        with self._lock:
+            return self._reset_message()
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def stats(self):
+        with self._lock:
+            return {'subscribers': len(self._subscribers), 'last_id': self._last_id}
+
+class SQLiteEventBroker(EventBroker):
+    """Broker lintas worker: publish menulis ke tabel events, thread poller mengantarkannya ke klien lokal."""
+    def __init__(self, backlog=256, queue_size=100, poll_interval=0.5):
+        super().__init__(backlog, queue_size)
+        self.backlog_size = backlog
+        self.poll_interval = poll_interval
+        self._poller = None
+
+    def publish(self, event, data):
+        conn = get_db_connection()
+        event_id = conn.execute('INSERT INTO events (event, data, created_at) VALUES (?, ?, ?)',
+                                (event, json.dumps(data), time.time())).lastrowid
+        conn.execute('DELETE FROM events WHERE id <= ?', (event_id - self.backlog_size,))
+        conn.commit()
+
+    def subscribe(self, last_event_id=None):
+        self._start_poller()
+        return super().subscribe(last_event_id)
+
+    def _start_poller(self):
+        with self._lock:
+            if self._poller is not None:
+                return
+            conn = get_db_pool().acquire()
+            # Mulai dari event terbaru; event lebih lama tidak diputar ulang (klien mendapat 'reset')
+            self._last_id = conn.execute('SELECT COALESCE(MAX(id), 0) FROM events').fetchone()[0]
+            self._poller = threading.Thread(target=self._poll, args=(conn, self._last_id),
+                                            name='event-poller', daemon=True)
+            self._poller.start()
+
+    def _poll(self, conn, last_id):
+        while True:
+            time.sleep(self.poll_interval)
+            last_id = self.poll_once(conn, last_id)
+
+    def poll_once(self, conn, last_id):
+        """Mengantarkan event sesudah last_id ke klien lokal; mengembalikan id terakhir yang sudah dibaca."""
+        try:
+            with self._lock:
+                if not self._subscribers:
+                    # Tanpa pendengar event dilompati, agar klien pertama sesudah masa sepi tidak menerima
+                    # rentetan event basi; backlog dikosongkan sehingga Last-Event-ID lama mendapat 'reset'
+                    latest = conn.execute('SELECT COALESCE(MAX(id), 0) FROM events').fetchone()[0]
+                    if latest > self._last_id:
+                        self._backlog.clear()
+                        self._last_id = latest
+                    return max(last_id, latest)
+            rows = conn.execute('SELECT id, event, data FROM events WHERE id > ? ORDER BY id', (last_id,)).fetchall()
+        except sqlite3.Error as e:
+            logging.getLogger(__name__).warning('Gagal membaca event: %s', e)
+            return last_id
+        for row in rows:
+            self.deliver(row['id'], row['event'], json.loads(row['data']))
+            last_id = row['id']
+        return last_id
+
+EVENT_BROKERS = {'memory': EventBroker, 'sqlite': SQLiteEventBroker}
+
+def get_event_broker():
+    broker = app.extensions.get('event_broker')
+    if broker is None:
+        with _pool_lock:
+            broker = app.extensions.get('event_broker')
+            if broker is None:
+                kind = app.config['EVENT_BROKER']
+                options = {'backlog': app.config['EVENT_BACKLOG'], 'queue_size': app.config['EVENT_QUEUE_SIZE']}
+                if kind == 'sqlite':
+                    options['poll_interval'] = app.config['EVENT_POLL_INTERVAL']
+                broker = EVENT_BROKERS[kind](**options)
+                app.extensions['event_broker'] = broker
+    return broker
+
+def load_dashboard_summary(conn):
+    """Ringkasan yang dikirim bersama event 'change' (semua dari tabel ringkasan, O(1))."""
+    summary = build_financial_summary(conn)
+    summary['projected_revenue'] = load_financial_totals(conn)['projected_revenue']
+    return summary
+
+def publish_change(conn, kind, before=None, report=None, **detail):
+    """Mengirim event 'change' setelah commit; `before` = load_dashboard_summary sebelum penulisan."""
+    summary = load_dashboard_summary(conn)
+    data = {'kind': kind, 'version': read_data_version(conn), 'summary': summary, 'detail': detail}
+    if before is not None:
+        data['delta'] = {key: value - before[key] for key, value in summary.items() if value != before[key]}
+    if report is not None:
+        data['report'] = report
+    get_event_broker().publish('change', data)
+
+def publish_report(report):
+    get_event_broker().publish('report', report)
+
+def format_sse(message):
+    return f"id: {message['id']}\nevent: {message['event']}\ndata: {json.dumps(message['data'])}\n\n"
+
+@app.route('/api/stream')
+@login_required
+def event_stream():
+    last_event_id = request.headers.get('Last-Event-ID', type=int)
+    subscription = get_event_broker().subscribe(last_event_id)
+    # Lepas koneksi database sekarang: stream bisa terbuka berjam-jam dan tidak butuh database
+    close_db_connection()
+    heartbeat = app.config['EVENT_HEARTBEAT']
+    deadline = time.monotonic() + app.config['EVENT_STREAM_MAX_SECONDS']
+    retry_ms = app.config['EVENT_RETRY_MS']
+
+    def stream():
+        try:
+            yield f'retry: {retry_ms}\n\n'
+            while time.monotonic() < deadline:
+                message = subscription.get(timeout=min(heartbeat, max(0.1, deadline - time.monotonic())))
+                if subscription.lagging:
+                    # Klien terlalu lambat dan ada event yang terbuang: minta muat ulang penuh
+                    yield format_sse(subscription.broker.reset_message())
+                    return
+                yield format_sse(message) if message else ': keep-alive\n\n'
+        finally:
+            subscription.close()
+
+    response = Response(stream(), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'  # Nginx: jangan buffer stream
+    return response
+
 # --- CRUD APIS (Diperbarui untuk Progress) ---
 
+def status_from_progress(progress):
+    """Status tugas dihitung dari progress: 100 = Done, >= 10 = In Progress, selain itu To Do."""
+    if progress == 100:
+        return 'Done'
+    elif progress >= 10:
+        return 'In Progress'
+    return 'To Do'
+
 @app.route('/add_task', methods=['POST'])
 @login_required
 def add_task():
@@ -267,23 +2361,20 @@ def add_task():
     completion_date = data.get('completion_date')
     
     progress = int(data.get('progress', 0)) 
-    
-    if progress == 100:
-        calculated_status = 'Done'
-    elif progress >= 10:
-        calculated_status = 'In Progress'
-    else: 
-        calculated_status = 'To Do'
+    calculated_status = status_from_progress(progress)
 
     if not completion_date: completion_date = None
     
     conn = get_db_connection()
-    conn.execute(
+    before = load_dashboard_summary(conn)
+    task_id = conn.execute(
         'INSERT INTO tasks (name, status, priority, price, paid, completion_date, progress) VALUES (?, ?, ?, ?, ?, ?, ?)', 
         (name, calculated_status, priority, price, paid, completion_date, progress)
-    )
+    ).lastrowid
+    bump_data_version(conn)
     conn.commit()
-    conn.close()
+    generate_daily_report(conn)
+    publish_change(conn, 'task_added', before, report=get_daily_report(conn), id=task_id, status=calculated_status)
     flash('Tugas berhasil ditambahkan!', 'success')
     return redirect(url_for('all_pages', page='dashboard'))
 
@@ -291,9 +2382,12 @@ def add_task():
 @login_required
 def delete_task(task_id):
     conn = get_db_connection()
+    before = load_dashboard_summary(conn)
     conn.execute('DELETE FROM tasks WHERE id = ?', (task_id,))
+    bump_data_version(conn)
     conn.commit()
-    conn.close()
+    generate_daily_report(conn)
+    publish_change(conn, 'task_deleted', before, report=get_daily_report(conn), id=task_id)
     return jsonify({"status": "success"})
 
 @app.route('/add_client', methods=['POST'])
@@ -304,9 +2398,10 @@ def add_client():
     contact = data.get('contact')
     email = data.get('email')
     conn = get_db_connection()
-    conn.execute('INSERT INTO clients (name, contact, email) VALUES (?, ?, ?)', (name, contact, email))
+    client_id = conn.execute('INSERT INTO clients (name, contact, email) VALUES (?, ?, ?)', (name, contact, email)).lastrowid
+    bump_data_version(conn)
     conn.commit()
-    conn.close()
+    publish_change(conn, 'client_added', id=client_id)
     flash('Klien berhasil ditambahkan!', 'success')
     return redirect(url_for('all_pages', page='clients'))
 
@@ -318,11 +2413,180 @@ def add_expense():
     amount = float(data['amount'])
     date = data['date']
     conn = get_db_connection()
-    conn.execute('INSERT INTO expenses (description, amount, date) VALUES (?, ?, ?)', (description, amount, date))
+    before = load_dashboard_summary(conn)
+    expense_id = conn.execute('INSERT INTO expenses (description, amount, date) VALUES (?, ?, ?)', (description, amount, date)).lastrowid
+    bump_data_version(conn)
     conn.commit()
-    conn.close()
+    publish_change(conn, 'expense_added', before, id=expense_id, amount=amount)
     return jsonify({"status": "success", "message": "Expense added successfully"})
 
+# --- BATCH API (BANYAK OPERASI, SATU TRANSAKSI) ---
+# POST /api/tasks/batch dan /api/expenses/batch menerima {"operations": [...]} dengan item
+#   {"op": "create", "data": {...}} | {"op": "update", "id": 5, "data": {...}} | {"op": "delete", "id": 7}
+# Semua item divalidasi dulu, lalu diterapkan dalam satu transaksi (satu commit/fsync).
+# Jika satu item gagal, tidak ada yang disimpan; hasil per item menjelaskan item mana yang gagal.
+app.config['BATCH_MAX_OPERATIONS'] = 5000
+BATCH_OPERATIONS = ('create', 'update', 'delete')
+
+def task_batch_fields(data, partial):
+    """Kolom tugas dari satu item batch; status selalu dihitung dari progress seperti add_task."""
+    fields = {}
+    if 'status' in data:
+        raise ValueError("status dihitung dari progress; kirim 'progress'")
+    if not partial or 'name' in data:
+        fields['name'] = required_text(data, 'name')
+    if not partial or 'priority' in data:
+        fields['priority'] = optional_text(data, 'priority') or 'Medium'
+        if fields['priority'] not in TASK_PRIORITIES:
+            raise ValueError(f"prioritas '{fields['priority']}' tidak dikenal")
+    if not partial or 'price' in data:
+        fields['price'] = number_field(data, 'price')
+    if not partial or 'paid' in data:
+        fields['paid'] = number_field(data, 'paid', default=0.0)
+    if not partial or 'completion_date' in data:
+        fields['completion_date'] = date_field(data, 'completion_date')
+    if not partial or 'client_id' in data:
+        fields['client_id'] = None if is_blank(data.get('client_id')) else number_field(data, 'client_id', integer=True)
+    if not partial or 'progress' in data:
+        progress = number_field(data, 'progress', default=0, integer=True)
+        if not 0 <= progress <= 100:
+            raise ValueError("kolom 'progress' harus di antara 0 dan 100")
+        fields['progress'] = progress
+        fields['status'] = status_from_progress(progress)
+    return fields
+
+def expense_batch_fields(data, partial):
+    fields = {}
+    if not partial or 'description' in data:
+        fields['description'] = required_text(data, 'description')
+    if not partial or 'amount' in data:
+        fields['amount'] = number_field(data, 'amount')
+    if not partial or 'date' in data:
+        fields['date'] = date_field(data, 'date', required=True)
+    return fields
+
+BATCH_TABLES = {
+    'tasks': (task_batch_fields, {'name', 'priority', 'price', 'paid', 'completion_date', 'client_id', 'progress', 'status'}),
+    'expenses': (expense_batch_fields, {'description', 'amount', 'date'}),
+}
+
+def prepare_batch_item(table, item):
+    """Memvalidasi satu item batch; mengembalikan (op, id, kolom)."""
+    fields_for, allowed = BATCH_TABLES[table]
+    if not isinstance(item, dict):
+        raise ValueError('item harus berupa objek')
+    op = item.get('op')
+    if op not in BATCH_OPERATIONS:
+        raise ValueError("op harus create, update, atau delete")
+    row_id = None
+    if op != 'create':
+        row_id = item.get('id')
+        if not isinstance(row_id, int) or isinstance(row_id, bool):
+            raise ValueError("id wajib berupa bilangan bulat")
+    if op == 'delete':
+        return op, row_id, {}
+    data = item.get('data')
+    if not isinstance(data, dict):
+        raise ValueError("data wajib berupa objek")
+    unknown = sorted(set(data) - allowed)
+    if unknown:
+        raise ValueError('kolom tidak dikenal: ' + ', '.join(unknown))
+    fields = fields_for(data, partial=(op == 'update'))
+    if not fields:
+        raise ValueError('tidak ada kolom yang diubah')
+    return op, row_id, fields
+
+def apply_batch(conn, table, operations):
+    """Menerapkan semua operasi dalam satu transaksi; mengembalikan (hasil per item, diterapkan?)."""
+    results, prepared = [], []
+    for index, item in enumerate(operations):
+        try:
+            op, row_id, fields = prepare_batch_item(table, item)
+        except ValueError as e:
+            results.append({'index': index, 'status': 'error', 'error': str(e)})
+            continue
+        results.append({'index': index, 'op': op, 'status': 'ok'})
+        prepared.append((index, op, row_id, fields))
+
+    applied = len(prepared) == len(operations)
+    if applied:
+        known_clients = set()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            for index, op, row_id, fields in prepared:
+                result = results[index]
+                try:
+                    client_id = fields.get('client_id')
+                    if client_id is not None and client_id not in known_clients:
+                        if conn.execute('SELECT 1 FROM clients WHERE id = ?', (client_id,)).fetchone() is None:
+                            raise ValueError(f'client_id {client_id} tidak ditemukan')
+                        known_clients.add(client_id)
+                    if op == 'create':
+                        columns = ', '.join(fields)
+                        placeholders = ', '.join('?' * len(fields))
+                        row_id = conn.execute(f'INSERT INTO {table} ({columns}) VALUES ({placeholders})',
+                                              tuple(fields.values())).lastrowid
+                    elif op == 'update':
+                        assignments = ', '.join(f'{column} = ?' for column in fields)
+                        if conn.execute(f'UPDATE {table} SET {assignments} WHERE id = ?',
+                                        tuple(fields.values()) + (row_id,)).rowcount == 0:
+                            raise ValueError(f'id {row_id} tidak ditemukan')
+                    elif conn.execute(f'DELETE FROM {table} WHERE id = ?', (row_id,)).rowcount == 0:
+                        raise ValueError(f'id {row_id} tidak ditemukan')
+                    result['id'] = row_id
+                except (ValueError, sqlite3.IntegrityError) as e:
+                    result.update(status='error', error=str(e))
+                    applied = False
+            if applied:
+                bump_data_version(conn)
+                conn.commit()
+            else:
+                conn.rollback()
+        except Exception:
+            conn.rollback()
+            raise
+
+    if not applied:
+        # Tidak ada yang disimpan: item yang valid ditandai dilewati
+        for result in results:
+            if result['status'] == 'ok':
+                result['status'] = 'skipped'
+                result.pop('id', None)
+    return results, applied
+
+def batch_route(table):
+    """Menjalankan batch dari body JSON request untuk `table`; response berisi hasil per item."""
+    payload = request.get_json(silent=True)
+    operations = payload.get('operations') if isinstance(payload, dict) else None
+    if not isinstance(operations, list) or not operations:
+        return jsonify({'status': 'error', 'message': "Body harus berupa JSON {\"operations\": [...]} yang tidak kosong."}), 400
+    if len(operations) > app.config['BATCH_MAX_OPERATIONS']:
+        return jsonify({'status': 'error', 'message': f"Maksimal {app.config['BATCH_MAX_OPERATIONS']} operasi per batch."}), 413
+
+    conn = get_db_connection()
+    before = load_dashboard_summary(conn)
+    results, applied = apply_batch(conn, table, operations)
+    if not applied:
+        return jsonify({'status': 'error', 'applied': False, 'results': results}), 400
+
+    counts = {op: sum(1 for result in results if result['op'] == op) for op in BATCH_OPERATIONS}
+    report = None
+    if table == 'tasks':
+        generate_daily_report(conn)
+        report = get_daily_report(conn)
+    publish_change(conn, f'{table}_batch', before, report=report, **counts)
+    return jsonify({'status': 'success', 'applied': True, 'counts': counts, 'results': results})
+
+@app.route('/api/tasks/batch', methods=['POST'])
+@login_required
+def tasks_batch():
+    return batch_route('tasks')
+
+@app.route('/api/expenses/batch', methods=['POST'])
+@login_required
+def expenses_batch():
+    return batch_route('expenses')
+
 # --- ROUTES PENGATURAN YANG BERFUNGSI ---
 
 # 1. UBAH KATA SANDI
@@ -335,7 +2599,6 @@ def change_password():
 
     conn = get_db_connection()
     user_data = conn.execute("SELECT id, password_hash FROM users WHERE id = ?", (current_user.id,)).fetchone()
-    conn.close()
 
     if not check_password_hash(user_data['password_hash'], old_password):
         flash('Kata sandi lama salah.', 'danger')
@@ -350,92 +2613,237 @@ def change_password():
         return redirect(url_for('all_pages', page='settings'))
 
     hashed_password = generate_password_hash(new_password, method='pbkdf2:sha256')
-    conn = get_db_connection()
     conn.execute('UPDATE users SET password_hash = ? WHERE id = ?', (hashed_password, current_user.id))
     conn.commit()
-    conn.close()
+    User.invalidate(current_user.id)
 
     flash('Kata sandi berhasil diubah.', 'success')
     return redirect(url_for('all_pages', page='settings'))
 
 # 2. UPLOAD FOTO PROFIL
+# File diterima dengan batas ukuran dan disalin ke disk per potongan sambil di-hash.
+# Pemrosesan berjalan di thread pool, bukan di thread request: Pillow memvalidasi
+# gambar, memotongnya persegi ke setiap AVATAR_SIZES lalu menyimpannya sebagai WebP
+# bernama hash isi (upload identik memakai file yang sama, aman di-cache selamanya).
+# File yang tidak lagi dirujuk pengguna dihapus oleh job cleanup.
+image_executor = ThreadPoolExecutor(max_workers=app.config['IMAGE_WORKERS'], thread_name_prefix='image')
+
+def avatar_filename(digest, size):
+    return f'{digest}_{size}.webp'
+
+@app.template_global()
+def profile_pic_url(profile_pic, size=128):
+    """URL foto profil: thumbnail hash (nilai tanpa ekstensi) atau file lama di static/uploads."""
+    if not profile_pic or '.' in profile_pic:
+        return url_for('static', filename='uploads/' + (profile_pic or 'default.png'))
+    return url_for('avatar_file', filename=avatar_filename(profile_pic, size))
+
+@app.route('/avatars/<filename>')
+def avatar_file(filename):
+    # Nama file = hash isi, jadi isinya tidak pernah berubah
+    response = send_from_directory(app.config['AVATAR_FOLDER'], filename, max_age=365 * 24 * 60 * 60)
+    response.cache_control.immutable = True
+    return response
+
+def stream_upload_to_disk(file, folder, chunk_size=64 * 1024):
+    """Menyalin upload ke file sementara per potongan; mengembalikan (path, hash isi)."""
+    os.makedirs(folder, exist_ok=True)
+    digest = hashlib.sha256()
+    fd, path = tempfile.mkstemp(dir=folder, prefix='incoming-', suffix='.upload')
+    with os.fdopen(fd, 'wb') as out:
+        for chunk in iter(lambda: file.stream.read(chunk_size), b''):
+            digest.update(chunk)
+            out.write(chunk)
+    return path, digest.hexdigest()[:32]
+
+def process_profile_pic(user_id, source_path, digest):
+    """Dijalankan di image_executor: membuat thumbnail lalu mengganti foto profil pengguna."""
+    folder = app.config['AVATAR_FOLDER']
+    try:
+        with Image.open(source_path) as image:
+            if image.format not in ('PNG', 'JPEG', 'GIF'):
+                raise ValueError(f'format {image.format} tidak diizinkan')
+            if image.width * image.height > app.config['MAX_PROFILE_PIC_PIXELS']:
+                raise ValueError(f'resolusi {image.width}x{image.height} terlalu besar')
+            has_alpha = image.mode in ('RGBA', 'LA', 'PA') or 'transparency' in image.info
+            image = ImageOps.exif_transpose(image).convert('RGBA' if has_alpha else 'RGB')
+            for size in app.config['AVATAR_SIZES']:
+                target = os.path.join(folder, avatar_filename(digest, size))
+                if os.path.exists(target):
+                    continue
+                # Tulis ke file sementara lalu rename agar tidak pernah tersaji setengah jadi
+                partial = f'{target}.{threading.get_ident()}.tmp'
+                ImageOps.fit(image, (size, size), Image.Resampling.LANCZOS).save(partial, 'WEBP', quality=85)
+                os.replace(partial, target)
+        with app.app_context():
+            conn = get_db_connection()
+            conn.execute('UPDATE users SET profile_pic = ? WHERE id = ?', (digest, user_id))
+            conn.commit()
+        User.invalidate(user_id)
+    except (OSError, ValueError, Image.DecompressionBombError) as e:
+        app.logger.warning('Foto profil user %s gagal diproses: %s', user_id, e)
+    except sqlite3.Error:
+        app.logger.exception('Foto profil user %s tidak tersimpan ke database', user_id)
+    finally:
+        os.remove(source_path)
+
+def log_image_task_failure(future):
+    """Done-callback image_executor: exception tak terduga tidak hilang di Future yang tidak pernah dibaca."""
+    if future.cancelled():
+        return
+    error = future.exception()
+    if error is not None:
+        app.logger.error('Pemrosesan foto profil gagal', exc_info=error)
+
 @app.route('/upload_profile_pic', methods=['POST'])
 @login_required
 def upload_profile_pic():
-    if 'profile_pic' not in request.files:
+    request.max_content_length = app.config['MAX_PROFILE_PIC_BYTES']
+    try:
+        files = request.files
+    except RequestEntityTooLarge:
+        flash(f"Ukuran file maksimal {app.config['MAX_PROFILE_PIC_BYTES'] // (1024 * 1024)} MB.", 'danger')
+        return redirect(url_for('all_pages', page='settings'))
+
+    if 'profile_pic' not in files:
         flash('Tidak ada file yang diunggah.', 'danger')
         return redirect(url_for('all_pages', page='settings'))
         
-    file = request.files['profile_pic']
+    file = files['profile_pic']
     
     if file.filename == '':
         flash('Tidak ada file yang dipilih.', 'danger')
         return redirect(url_for('all_pages', page='settings'))
         
     if file and allowed_file(file.filename):
-        filename = secure_filename(f"{current_user.id}_{datetime.now().strftime('%Y%m%d%H%M%S')}_{file.filename}")
-        file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        
-        # Hapus file lama jika ada (optional)
-        if current_user.profile_pic and current_user.profile_pic != 'default.png':
-            old_file_path = os.path.join(app.config['UPLOAD_FOLDER'], current_user.profile_pic)
-            if os.path.exists(old_file_path):
-                os.remove(old_file_path)
-
-        file.save(file_path)
-        
-        conn = get_db_connection()
-        conn.execute('UPDATE users SET profile_pic = ? WHERE id = ?', (filename, current_user.id))
-        conn.commit()
-        conn.close()
-        
-        # Perbarui objek current_user di session
-        user_data = User.get(current_user.id)
-        current_user.profile_pic = user_data.profile_pic
+        source_path, digest = stream_upload_to_disk(file, app.config['AVATAR_FOLDER'])
+        image_executor.submit(process_profile_pic, current_user.id, source_path, digest).add_done_callback(log_image_task_failure)
         
-        flash('Foto profil berhasil diunggah dan diperbarui!', 'success')
+        flash('Foto profil berhasil diunggah dan sedang diproses; akan tampil dalam beberapa detik.', 'success')
         return redirect(url_for('all_pages', page='settings'))
     else:
         flash('Jenis file tidak diizinkan. Gunakan PNG, JPG, atau GIF.', 'danger')
         return redirect(url_for('all_pages', page='settings'))
 
-
-# 3. EXPORT DATA (BACKUP CSV)
-@app.route('/export_data')
-@login_required
-def export_data():
-    conn = get_db_connection()
-    tables = {'tasks': 'tasks', 'clients': 'clients', 'expenses': 'expenses'}
-    
+def cleanup_uploads(conn, now=None):
+    """Menghapus foto/thumbnail yang tidak dirujuk pengguna dan sisa upload lama; mengembalikan jumlah file."""
+    now = time.time() if now is None else now
+    in_use = {row['profile_pic'] for row in conn.execute('SELECT DISTINCT profile_pic FROM users WHERE profile_pic IS NOT NULL')}
+    in_use.add('default.png')
+    removed = 0
+    # File lama dinamai apa adanya; thumbnail dinamai <hash>_<ukuran>.webp
+    for folder, reference_of in ((os.path.join(app.root_path, app.config['UPLOAD_FOLDER']), lambda name: name),
+                                 (app.config['AVATAR_FOLDER'], lambda name: name.split('_', 1)[0])):
+        if not os.path.isdir(folder):
+            continue
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                if not entry.is_file() or reference_of(entry.name) in in_use:
+                    continue
+                # Beri jeda agar upload yang masih diproses tidak ikut terhapus
+                if now - entry.stat().st_mtime < app.config['UPLOAD_CLEANUP_GRACE']:
+                    continue
+                try:
+                    os.remove(entry.path)
+                    removed += 1
+                except FileNotFoundError:
+                    pass
+    return removed
+
+def bot_job_cleanup_uploads():
+    with app.app_context():
+        removed = cleanup_uploads(get_db_connection())
+    print(f"--- Bot Job: Upload cleanup at {current_time()} ({removed} file dihapus) ---")
+
+register_leader_job('UploadCleanup', bot_job_cleanup_uploads, trigger='interval', hours=6)
+
+
+# 3. EXPORT DATA (BACKUP CSV / NDJSON)
+# Export dialirkan (streaming) per potongan baris dengan fetchmany, sehingga
+# pemakaian memori tetap datar berapa pun jumlah barisnya.
+# Tugas arsip punya seksi sendiri agar import mengembalikannya ke tasks_archive, bukan ke tasks
+EXPORT_TABLES = ('tasks', 'tasks_archive', 'clients', 'expenses')
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+}
+
+def iter_table_rows(conn, table_name, chunk_size):
+    """Menghasilkan (kolom, potongan baris) untuk satu tabel; kolom tetap tersedia walau tabel kosong."""
+    cursor = conn.execute(f"SELECT * FROM {table_name}")
+    columns = [description[0] for description in cursor.description]
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+        if not rows:
+            return
+        yield columns, rows
+
+def generate_csv_export(conn, tables, exported_at, chunk_size):
     output = StringIO()
     writer = csv.writer(output)
-    
+
+    def flush():
+        chunk = output.getvalue()
+        output.seek(0)
+        output.truncate(0)
+        return chunk
+
     writer.writerow(['--- JOB JOKI PRO DATA EXPORT ---'])
-    writer.writerow(['Exported At', datetime.now().strftime('%Y-%m-%d %H:%M:%S')])
+    writer.writerow(['Exported At', exported_at.strftime('%Y-%m-%d %H:%M:%S')])
     writer.writerow([''])
-
-    for table_name in tables.keys():
-        data = conn.execute(f"SELECT * FROM {table_name}").fetchall()
-        
-        if not data:
+    yield flush()
+
+    for table_name in tables:
+        has_rows = False
+        for columns, rows in iter_table_rows(conn, table_name, chunk_size):
+            if not has_rows:
+                writer.writerow([f'TABLE: {table_name.upper()}'])
+                writer.writerow(columns)
+                has_rows = True
+            writer.writerows(rows)
+            yield flush()
+
+        if not has_rows:
             writer.writerow([f'Tabel {table_name} kosong.'])
-            writer.writerow([''])
-            continue
-
-        writer.writerow([f'TABLE: {table_name.upper()}'])
-        
-        headers = data[0].keys()
-        writer.writerow(headers)
-        
-        for row in data:
-            writer.writerow(list(row))
         writer.writerow([''])
-        
-    conn.close()
+        yield flush()
+
+def generate_ndjson_export(conn, tables, exported_at, chunk_size):
+    # Baris pertama berisi metadata, setiap baris berikutnya satu record: {"table": ..., "row": {...}}
+    yield json.dumps({'export': 'JOB JOKI PRO DATA EXPORT', 'exported_at': exported_at.strftime('%Y-%m-%d %H:%M:%S'), 'tables': list(tables)}) + '\n'
+    for table_name in tables:
+        for columns, rows in iter_table_rows(conn, table_name, chunk_size):
+            yield ''.join(json.dumps({'table': table_name, 'row': dict(zip(columns, row))}) + '\n' for row in rows)
+
+@app.route('/export_data')
+@login_required
+def export_data():
+    export_format = request.args.get('format', 'csv')
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({'status': 'error', 'message': 'Format export harus csv atau ndjson.'}), 400
+
+    requested = request.args.get('tables')
+    tables = [name.strip() for name in requested.split(',') if name.strip()] if requested else list(EXPORT_TABLES)
+    unknown = [name for name in tables if name not in EXPORT_TABLES]
+    if unknown or not tables:
+        return jsonify({'status': 'error', 'message': 'Tabel tidak dikenal: ' + ', '.join(unknown)}), 400
 
-    response = app.make_response(output.getvalue())
-    response.headers["Content-Disposition"] = "attachment; filename=jokipro_backup_" + datetime.now().strftime('%Y%m%d') + ".csv"
-    response.headers["Content-type"] = "text/csv"
+    exported_at = current_time()
+    chunk_size = app.config['EXPORT_CHUNK_SIZE']
+    generate = generate_csv_export if export_format == 'csv' else generate_ndjson_export
+
+    def stream():
+        conn = get_db_connection()
+        # Satu transaksi baca: semua tabel diambil dari snapshot yang sama (WAL tidak memblokir writer)
+        conn.execute('BEGIN')
+        try:
+            yield from generate(conn, tables, exported_at, chunk_size)
+        finally:
+            conn.commit()
+
+    mimetype, extension = EXPORT_FORMATS[export_format]
+    response = Response(stream_with_context(stream()), mimetype=mimetype)
+    response.headers["Content-Disposition"] = f"attachment; filename=jokipro_backup_{exported_at.strftime('%Y%m%d')}.{extension}"
     return response
 
 
@@ -444,49 +2852,541 @@ def export_data():
 @login_required
 def reset_all_data():
     conn = get_db_connection()
+    before = load_dashboard_summary(conn)
     conn.execute('DELETE FROM tasks')
+    conn.execute('DELETE FROM tasks_archive')
     conn.execute('DELETE FROM clients')
     conn.execute('DELETE FROM expenses')
+    bump_data_version(conn)
     conn.commit()
-    conn.close()
+    generate_daily_report(conn)
+    publish_change(conn, 'reset', before, report=get_daily_report(conn))
     
     flash('Semua data proyek (Tugas, Klien, Biaya) berhasil direset!', 'warning')
     return redirect(url_for('all_pages', page='settings'))
 
 
-# --- API DATA (AJAX) ---
-# ... (Semua API data tetap sama seperti sebelumnya) ...
+# 5. IMPORT DATA (RESTORE CSV / NDJSON)
+# Membaca file dengan format yang sama seperti export_data (CSV multi-seksi atau
+# NDJSON), atau CSV spreadsheet biasa satu tabel. Baris divalidasi lalu dimuat
+# dengan executemany per batch; baris yang ditolak dilaporkan beserta nomor barisnya.
+# Seksi tasks_archive di-upsert kembali ke arsip; satu id tugas tidak boleh sekaligus ada
+# di tasks dan tasks_archive (baris seperti itu ditolak, bukan digandakan).
+IMPORT_TABLES = ('clients', 'tasks', 'tasks_archive', 'expenses')
+IMPORT_MODES = ('insert', 'upsert')
+TASK_STATUSES = ('To Do', 'In Progress', 'Review', 'Done')
+TASK_PRIORITIES = ('High', 'Medium', 'Low')
+MAX_REPORTED_REJECTIONS = 100
+
+def iter_csv_records(lines, default_table=None):
+    """Menghasilkan (tabel, nomor_baris, dict_baris) dari CSV hasil export atau CSV satu tabel."""
+    reader = csv.reader(lines)
+    table = default_table
+    header = None
+    for row in reader:
+        if not any(cell.strip() for cell in row):
+            # Baris kosong memisahkan seksi pada file export
+            if default_table is None:
+                table, header = None, None
+            continue
+        if len(row) == 1 and row[0].startswith('TABLE: '):
+            table, header = row[0][len('TABLE: '):].strip().lower(), None
+            continue
+        if table is None:
+            continue  # Judul export, "Exported At", "Tabel x kosong."
+        if header is None:
+            header = [cell.strip() for cell in row]
+            continue
+        yield table, reader.line_num, dict(zip(header, row))
 
-@app.route('/api/financial_summary')
+def iter_ndjson_records(lines):
+    """Menghasilkan (tabel, nomor_baris, dict_baris) dari NDJSON hasil export; baris rusak menghasilkan baris None."""
+    for line_no, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            yield None, line_no, None
+            continue
+        if isinstance(record, dict) and 'table' in record and isinstance(record.get('row'), dict):
+            yield record['table'], line_no, record['row']
+
+def is_blank(value):
+    return value is None or (isinstance(value, str) and not value.strip())
+
+def optional_text(row, key):
+    value = row.get(key)
+    return None if is_blank(value) else str(value).strip()
+
+def required_text(row, key):
+    value = optional_text(row, key)
+    if value is None:
+        raise ValueError(f"kolom '{key}' wajib diisi")
+    return value
+
+def number_field(row, key, default=None, integer=False):
+    value = row.get(key)
+    if is_blank(value):
+        if default is None:
+            raise ValueError(f"kolom '{key}' wajib diisi")
+        return default
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"kolom '{key}' harus berupa angka")
+    # inf/nan merusak setiap SUM di task_totals & rollups (nan bahkan ditolak NOT NULL oleh SQLite)
+    if not math.isfinite(number):
+        raise ValueError(f"kolom '{key}' harus berupa angka terhingga")
+    return int(number) if integer else number
+
+def date_field(row, key, required=False):
+    value = optional_text(row, key)
+    if value is None:
+        if required:
+            raise ValueError(f"kolom '{key}' wajib diisi")
+        return None
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').strftime('%Y-%m-%d')
+    except ValueError:
+        raise ValueError(f"kolom '{key}' harus berformat YYYY-MM-DD")
+
+def validate_client_row(row):
+    return (required_text(row, 'name'), optional_text(row, 'contact'), optional_text(row, 'email'))
+
+def validate_expense_row(row):
+    return (required_text(row, 'description'), number_field(row, 'amount'), date_field(row, 'date', required=True))
+
+def validate_task_row(row, client_id):
+    progress = number_field(row, 'progress', default=0, integer=True)
+    if not 0 <= progress <= 100:
+        raise ValueError("kolom 'progress' harus di antara 0 dan 100")
+    status = optional_text(row, 'status') or status_from_progress(progress)
+    if status not in TASK_STATUSES:
+        raise ValueError(f"status '{status}' tidak dikenal")
+    priority = optional_text(row, 'priority') or 'Medium'
+    if priority not in TASK_PRIORITIES:
+        raise ValueError(f"prioritas '{priority}' tidak dikenal")
+    return (
+        required_text(row, 'name'), status, priority,
+        number_field(row, 'price'), number_field(row, 'paid', default=0.0),
+        date_field(row, 'completion_date'), client_id, progress,
+    )
+
+class DataImporter:
+    """Memuat record hasil parsing ke database dalam batch executemany.
+
+    Klien diproses lebih dulu (pass pertama) sehingga client_id pada tugas dari
+    file export bisa dipetakan ulang lewat nama klien yang UNIQUE.
+    """
+
+    CLIENT_SQL = {
+        'insert': 'INSERT INTO clients (name, contact, email) VALUES (?, ?, ?) ON CONFLICT(name) DO NOTHING',
+        'upsert': 'INSERT INTO clients (name, contact, email) VALUES (?, ?, ?) '
+                  'ON CONFLICT(name) DO UPDATE SET contact = excluded.contact, email = excluded.email',
+    }
+    TASK_INSERT_SQL = 'INSERT INTO tasks (name, status, priority, price, paid, completion_date, client_id, progress) VALUES (?, ?, ?, ?, ?, ?, ?, ?)'
+    TASK_UPSERT_SQL = ('INSERT INTO tasks (name, status, priority, price, paid, completion_date, client_id, progress, id) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) '
+                       'ON CONFLICT(id) DO UPDATE SET name = excluded.name, status = excluded.status, priority = excluded.priority, '
+                       'price = excluded.price, paid = excluded.paid, completion_date = excluded.completion_date, '
+                       'client_id = excluded.client_id, progress = excluded.progress')
+    TASK_ARCHIVE_UPSERT_SQL = ('INSERT INTO tasks_archive (name, status, priority, price, paid, completion_date, client_id, progress, archived_at, id) '
+                               'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?) '
+                               'ON CONFLICT(id) DO UPDATE SET name = excluded.name, status = excluded.status, priority = excluded.priority, '
+                               'price = excluded.price, paid = excluded.paid, completion_date = excluded.completion_date, '
+                               'client_id = excluded.client_id, progress = excluded.progress, archived_at = excluded.archived_at')
+    EXPENSE_INSERT_SQL = 'INSERT INTO expenses (description, amount, date) VALUES (?, ?, ?)'
+    EXPENSE_UPSERT_SQL = ('INSERT INTO expenses (description, amount, date, id) VALUES (?, ?, ?, ?) '
+                          'ON CONFLICT(id) DO UPDATE SET description = excluded.description, amount = excluded.amount, date = excluded.date')
+    # Upsert tugas -> tabel yang tidak boleh sudah memegang id yang sama
+    TASK_ID_CONFLICTS = {TASK_UPSERT_SQL: 'tasks_archive', TASK_ARCHIVE_UPSERT_SQL: 'tasks'}
+
+    def __init__(self, conn, mode='insert', batch_size=500):
+        if mode not in IMPORT_MODES:
+            raise ValueError(f"mode import '{mode}' tidak dikenal")
+        self.conn = conn
+        self.mode = mode
+        self.batch_size = batch_size
+        self.imported = {table: 0 for table in IMPORT_TABLES}
+        self.rejected = []
+        self.rejected_count = 0
+        self.client_id_map = {}      # client_id di file -> id di database
+        self.client_name_cache = {}  # nama klien -> id di database
+        self.known_client_ids = set()
+
+    def reject(self, table, line_no, error):
+        self.rejected_count += 1
+        if len(self.rejected) < MAX_REPORTED_REJECTIONS:
+            self.rejected.append({'table': table, 'line': line_no, 'error': error})
+
+    def run(self, open_records):
+        """open_records() harus mengembalikan iterator record baru setiap kali dipanggil (dua pass)."""
+        before = load_dashboard_summary(self.conn)
+        self._import_clients(open_records())
+        self._import_tasks_and_expenses(open_records())
+        report = None
+        if self.imported['tasks'] or self.imported['tasks_archive']:
+            generate_daily_report(self.conn)
+            report = get_daily_report(self.conn)
+        if any(self.imported.values()):
+            publish_change(self.conn, 'import', before, report=report, imported=dict(self.imported))
+        return self.report()
+
+    def report(self):
+        return {
+            'status': 'success',
+            'mode': self.mode,
+            'imported': self.imported,
+            'rejected_count': self.rejected_count,
+            'rejected': self.rejected,
+        }
+
+    def _flush(self, table, sql, batch):
+        """Menjalankan satu batch dalam satu transaksi; jika gagal, ulangi per baris untuk menemukan baris yang rusak."""
+        if not batch:
+            return []
+        params = [values for _, values in batch]
+        try:
+            self.conn.executemany(sql, params)
+            bump_data_version(self.conn)
+            self.conn.commit()
+            self.imported[table] += len(batch)
+            return batch
+        except sqlite3.Error:
+            self.conn.rollback()
+        stored = []
+        for line_no, values in batch:
+            try:
+                self.conn.execute(sql, values)
+                stored.append((line_no, values))
+            except sqlite3.Error as e:
+                self.reject(table, line_no, str(e))
+        if stored:
+            bump_data_version(self.conn)
+        self.conn.commit()
+        self.imported[table] += len(stored)
+        return stored
+
+    def _without_task_id_conflicts(self, table, sql, batch):
+        """Menolak baris upsert tugas yang id-nya sudah ada di tabel tugas lainnya (aktif vs arsip)."""
+        other = self.TASK_ID_CONFLICTS.get(sql)
+        if other is None or not batch:
+            return batch
+        ids = [values[-1] for _, values in batch]
+        placeholders = ', '.join('?' * len(ids))
+        taken = {row[0] for row in self.conn.execute(f'SELECT id FROM {other} WHERE id IN ({placeholders})', ids)}
+        kept = []
+        for line_no, values in batch:
+            if values[-1] in taken:
+                self.reject(table, line_no, f'id {values[-1]} sudah ada di {other}')
+            else:
+                kept.append((line_no, values))
+        return kept
+
+    def _import_clients(self, records):
+        batch, file_ids = [], []
+
+        def flush():
+            stored = self._flush('clients', self.CLIENT_SQL[self.mode], batch)
+            names = [values[0] for _, values in stored]
+            if names:
+                placeholders = ', '.join('?' * len(names))
+                for row in self.conn.execute(f'SELECT id, name FROM clients WHERE name IN ({placeholders})', names):
+                    self.client_name_cache[row['name']] = row['id']
+            for file_id, name in file_ids:
+                if file_id is not None and name in self.client_name_cache:
+                    self.client_id_map[file_id] = self.client_name_cache[name]
+            batch.clear()
+            file_ids.clear()
+
+        for table, line_no, row in records:
+            if table != 'clients':
+                continue
+            try:
+                values = validate_client_row(row)
+                file_id = None if is_blank(row.get('id')) else number_field(row, 'id', integer=True)
+            except ValueError as e:
+                self.reject(table, line_no, str(e))
+                continue
+            batch.append((line_no, values))
+            file_ids.append((file_id, values[0]))
+            if len(batch) >= self.batch_size:
+                flush()
+        flush()
+
+    def _resolve_client(self, row):
+        name = optional_text(row, 'client') or optional_text(row, 'client_name')
+        if name is not None:
+            if name not in self.client_name_cache:
+                found = self.conn.execute('SELECT id FROM clients WHERE name = ?', (name,)).fetchone()
+                if found is None:
+                    raise ValueError(f"klien '{name}' tidak ditemukan")
+                self.client_name_cache[name] = found['id']
+            return self.client_name_cache[name]
+
+        if is_blank(row.get('client_id')):
+            return None
+        file_id = number_field(row, 'client_id', integer=True)
+        if file_id in self.client_id_map:
+            return self.client_id_map[file_id]
+        if file_id not in self.known_client_ids:
+            if self.conn.execute('SELECT 1 FROM clients WHERE id = ?', (file_id,)).fetchone() is None:
+                raise ValueError(f"client_id {file_id} tidak ditemukan")
+            self.known_client_ids.add(file_id)
+        return file_id
+
+    def _import_tasks_and_expenses(self, records):
+        batches = {
+            self.TASK_INSERT_SQL: ('tasks', []),
+            self.TASK_UPSERT_SQL: ('tasks', []),
+            self.TASK_ARCHIVE_UPSERT_SQL: ('tasks_archive', []),
+            self.EXPENSE_INSERT_SQL: ('expenses', []),
+            self.EXPENSE_UPSERT_SQL: ('expenses', []),
+        }
+        for table, line_no, row in records:
+            if table == 'clients':
+                continue
+            if row is None:
+                self.reject(table, line_no, 'baris JSON tidak valid')
+                continue
+            try:
+                upsert_extra = ()
+                if table == 'tasks':
+                    values = validate_task_row(row, self._resolve_client(row))
+                    insert_sql, upsert_sql = self.TASK_INSERT_SQL, self.TASK_UPSERT_SQL
+                elif table == 'tasks_archive':
+                    # Tanpa id (atau mode insert) dimuat sebagai tugas baru; job arsip memindahkannya lagi
+                    values = validate_task_row(row, self._resolve_client(row))
+                    insert_sql, upsert_sql = self.TASK_INSERT_SQL, self.TASK_ARCHIVE_UPSERT_SQL
+                    upsert_extra = (optional_text(row, 'archived_at') or current_time().isoformat(timespec='seconds'),)
+                elif table == 'expenses':
+                    values = validate_expense_row(row)
+                    insert_sql, upsert_sql = self.EXPENSE_INSERT_SQL, self.EXPENSE_UPSERT_SQL
+                else:
+                    raise ValueError(f"tabel '{table}' tidak didukung")
+                row_id = None if self.mode == 'insert' or is_blank(row.get('id')) else number_field(row, 'id', integer=True)
+            except ValueError as e:
+                self.reject(table, line_no, str(e))
+                continue
+
+            if row_id is None:
+                sql = insert_sql
+            else:
+                sql, values = upsert_sql, values + upsert_extra + (row_id,)
+            batch_table, batch = batches[sql]
+            batch.append((line_no, values))
+            if len(batch) >= self.batch_size:
+                self._flush(batch_table, sql, self._without_task_id_conflicts(batch_table, sql, batch))
+                batch.clear()
+
+        for sql, (table, batch) in batches.items():
+            self._flush(table, sql, self._without_task_id_conflicts(table, sql, batch))
+        if self.imported['tasks_archive']:
+            sync_task_sequence(self.conn)
+            self.conn.commit()
+
+def open_import_records(open_text, export_format, default_table=None):
+    """Membungkus sumber teks menjadi fungsi yang menghasilkan iterator record baru setiap dipanggil."""
+    def open_records():
+        with open_text() as lines:
+            if export_format == 'ndjson':
+                yield from iter_ndjson_records(lines)
+            else:
+                yield from iter_csv_records(lines, default_table)
+    return open_records
+
+def import_format_for(filename):
+    return 'ndjson' if filename.lower().endswith(('.ndjson', '.jsonl')) else 'csv'
+
+@app.route('/import_data', methods=['POST'])
 @login_required
-def get_financial_summary():
+def import_data():
+    file = request.files.get('import_file')
+    if not file or file.filename == '':
+        return jsonify({'status': 'error', 'message': 'Tidak ada file yang dipilih.'}), 400
+    mode = request.form.get('mode', 'insert')
+    if mode not in IMPORT_MODES:
+        return jsonify({'status': 'error', 'message': 'Mode import harus insert atau upsert.'}), 400
+    default_table = request.form.get('table') or None
+    if default_table is not None and default_table not in IMPORT_TABLES:
+        return jsonify({'status': 'error', 'message': 'Tabel tidak dikenal.'}), 400
+
+    @contextmanager
+    def open_text():
+        file.stream.seek(0)
+        text = io.TextIOWrapper(file.stream, encoding='utf-8-sig', newline='')
+        try:
+            yield text
+        finally:
+            text.detach()  # Jangan ikut menutup stream upload
+
+    records = open_import_records(open_text, import_format_for(file.filename), default_table)
+    importer = DataImporter(get_db_connection(), mode, app.config['IMPORT_BATCH_SIZE'])
+    try:
+        report = importer.run(records)
+    except UnicodeDecodeError:
+        return jsonify({'status': 'error', 'message': 'File harus berencoding UTF-8.'}), 400
+    return jsonify(report)
+
+@app.cli.command('import-data')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--mode', type=click.Choice(IMPORT_MODES), default='insert', show_default=True)
+@click.option('--table', type=click.Choice(IMPORT_TABLES), default=None, help='Tabel tujuan untuk CSV spreadsheet tanpa seksi TABLE:.')
+def import_data_command(path, mode, table):
+    """Mengimpor file CSV/NDJSON (format export_data) ke database."""
+    records = open_import_records(lambda: open(path, encoding='utf-8-sig', newline=''), import_format_for(path), table)
+    report = DataImporter(get_db_connection(), mode, app.config['IMPORT_BATCH_SIZE']).run(records)
+    for table_name, count in report['imported'].items():
+        click.echo(f'{table_name}: {count} baris diimpor')
+    click.echo(f"Ditolak: {report['rejected_count']} baris")
+    for rejection in report['rejected']:
+        click.echo(f"  [{rejection['table']} baris {rejection['line']}] {rejection['error']}")
+
+
+# --- API PAGINASI ("LOAD MORE") ---
+
+@app.route('/api/tasks')
+@login_required
+def api_tasks_page():
     conn = get_db_connection()
-    summary = conn.execute('SELECT SUM(price) as total_revenue, SUM(paid) as total_paid FROM tasks').fetchone()
-    expense_summary = conn.execute('SELECT SUM(amount) as total_expenses FROM expenses').fetchone()
-    conn.close()
-    total_revenue = summary['total_revenue'] if summary['total_revenue'] else 0
-    total_paid = summary['total_paid'] if summary['total_paid'] else 0
-    total_expenses = expense_summary['total_expenses'] if expense_summary['total_expenses'] else 0
-    remaining_due = total_revenue - total_paid
-    net_profit = total_paid - total_expenses 
-    return jsonify({'total_revenue': total_revenue, 'total_paid': total_paid, 'remaining_due': remaining_due, 'total_expenses': total_expenses, 'net_profit': net_profit})
+    rows, next_cursor = load_tasks_page(conn, request.args.get('cursor', type=int), request.args.get('limit', type=int))
+    return jsonify({'items': [dict(row) for row in rows], 'next_cursor': next_cursor})
 
-@app.route('/api/revenue_pipeline')
+@app.route('/api/expenses')
 @login_required
-def get_revenue_pipeline():
+def api_expenses_page():
     conn = get_db_connection()
-    pipeline = conn.execute("SELECT SUM(price) as projected_revenue FROM tasks WHERE status IN ('To Do', 'In Progress', 'Review')").fetchone()
-    conn.close()
-    projected_revenue = pipeline['projected_revenue'] if pipeline['projected_revenue'] else 0
-    return jsonify({'projected_revenue': projected_revenue})
+    try:
+        rows, next_cursor = load_expenses_page(conn, request.args.get('cursor'), request.args.get('limit', type=int))
+    except ValueError:
+        return jsonify({'status': 'error', 'message': 'Cursor tidak valid.'}), 400
+    return jsonify({'items': [dict(row) for row in rows], 'next_cursor': next_cursor})
 
-@app.route('/api/client_retention')
+@app.route('/api/clients/<int:client_id>/jobs')
 @login_required
-def get_client_retention():
+def api_client_jobs_page(client_id):
     conn = get_db_connection()
+    rows, next_cursor = load_client_jobs_page(conn, client_id, request.args.get('cursor', type=int), request.args.get('limit', type=int))
+    return jsonify({'items': [dict(row) for row in rows], 'next_cursor': next_cursor})
+
+
+# --- PENCARIAN (FTS5) ---
+MAX_SEARCH_TERMS = 8
+
+def build_match_query(text):
+    """Mengubah input bebas menjadi query MATCH FTS5: setiap kata jadi awalan yang di-quote (AND)."""
+    terms = re.findall(r'\w+', text)[:MAX_SEARCH_TERMS]
+    return ' '.join('"' + term.replace('"', '""') + '"*' for term in terms)
+
+def search_records(conn, text, kind=None, cursor=None, limit=None):
+    """Hasil pencarian terurut relevansi (bm25, judul berbobot 10x); cursor adalah offset hasil berikutnya."""
+    limit = page_limit(limit)
+    offset = max(0, cursor or 0)
+    match = build_match_query(text)
+    if not match:
+        return [], None
+    sql = '''
+        SELECT kind, ref_id AS id, title, body, bm25(search_index, 0.0, 0.0, 10.0, 1.0) AS score
+        FROM search_index
+        WHERE search_index MATCH ?
+    '''
+    params = [match]
+    if kind:
+        sql += ' AND kind = ?'
+        params.append(kind)
+    sql += ' ORDER BY score, rowid LIMIT ? OFFSET ?'
+    rows = conn.execute(sql, params + [limit + 1, offset]).fetchall()
+    return split_page(rows, limit, lambda row: offset + limit)
+
+@app.route('/api/search')
+@login_required
+def api_search():
+    text = request.args.get('q', '')
+    kind = request.args.get('kind')
+    if kind and kind not in SEARCH_KINDS:
+        return jsonify({'status': 'error', 'message': f'Jenis tidak dikenal: {kind}'}), 400
+    conn = get_db_connection()
+    rows, next_cursor = search_records(conn, text, kind, request.args.get('cursor', type=int), request.args.get('limit', type=int))
+    items = [{'kind': row['kind'], 'id': row['id'], 'title': row['title'], 'detail': row['body'], 'score': round(row['score'], 4)} for row in rows]
+    return jsonify({'items': items, 'next_cursor': next_cursor})
+
+@app.cli.command('rebuild-search-index')
+def rebuild_search_index_command():
+    """Membangun ulang index pencarian FTS5 dari tabel tugas, klien, dan pengeluaran."""
+    conn = get_db_connection()
+    conn.execute('BEGIN IMMEDIATE')
+    rebuild_search_index(conn)
+    conn.commit()
+    count = conn.execute('SELECT COUNT(*) FROM search_index').fetchone()[0]
+    click.echo(f'Index pencarian dibangun ulang: {count} entri.')
+
+@app.route('/api/cache_stats')
+@login_required
+def get_cache_stats():
+    return jsonify({'user_cache': user_cache.stats(), 'api_cache': api_cache.stats(), 'fragment_cache': fragment_cache.stats()})
+
+
+# --- CACHE RESPONS API (ETag / 304) ---
+# Hasil endpoint analitik di-memo per (endpoint, query string, versi data[, tanggal]).
+# ETag adalah hash isi respons, sehingga sama di semua worker untuk data yang sama.
+app.config['API_CACHE_SIZE'] = 256
+api_cache = TTLCache(app.config['API_CACHE_SIZE'], ttl=24 * 60 * 60)
+
+def clear_caches():
+    """Mengosongkan semua cache per proses (pengguna, laporan bot, API, fragmen template)."""
+    for cache in (user_cache, report_cache, api_cache, fragment_cache):
+        cache.clear()
+
+def cached_api(date_dependent=False):
+    """Decorator untuk endpoint JSON read-only: memo per versi data + ETag kuat + 304.
+
+    date_dependent=True untuk endpoint yang hasilnya bergantung pada tanggal hari ini,
+    agar cache otomatis basi saat pergantian hari.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            version = read_data_version(get_db_connection())
+            day = current_time().strftime('%Y-%m-%d') if date_dependent else ''
+            key = (request.endpoint, request.query_string, version, day)
+            cached = api_cache.get(key)
+            if cached is None:
+                response = app.make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+                body = response.get_data()
+                cached = (hashlib.sha256(body).hexdigest()[:32], body, response.mimetype)
+                api_cache.set(key, cached)
+            etag, body, mimetype = cached
+            response = app.response_class(body, mimetype=mimetype)
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = 'private, no-cache'
+            return response.make_conditional(request)
+        return wrapper
+    return decorator
+
+
+# --- API DATA (AJAX) ---
+# Setiap bagian dashboard dihitung oleh fungsi build_* yang menerima koneksi,
+# sehingga endpoint tunggal maupun /api/dashboard memakai logika yang sama.
+
+def build_financial_summary(conn):
+    totals = load_financial_totals(conn)
+    total_revenue = totals['total_revenue']
+    total_paid = totals['total_paid']
+    total_expenses = totals['total_expenses']
+    remaining_due = total_revenue - total_paid
+    net_profit = total_paid - total_expenses
+    return {'total_revenue': total_revenue, 'total_paid': total_paid, 'remaining_due': remaining_due, 'total_expenses': total_expenses, 'net_profit': net_profit}
+
+def build_revenue_pipeline(conn):
+    projected_revenue = load_financial_totals(conn)['projected_revenue']
+    return {'projected_revenue': projected_revenue}
+
+def build_client_retention(conn):
     retention_data = conn.execute('''
         SELECT c.name, COUNT(t.id) as total_jobs
-        FROM tasks t
+        FROM all_tasks t
         JOIN clients c ON t.client_id = c.id
         WHERE t.status = 'Done' AND t.client_id IS NOT NULL 
         GROUP BY c.name
@@ -495,137 +3395,213 @@ def get_client_retention():
     ''').fetchall()
     total_clients_row = conn.execute("SELECT COUNT(DISTINCT id) FROM clients").fetchone()
     total_clients = total_clients_row[0] if total_clients_row else 0
-    conn.close()
-    return jsonify({'retained_clients_count': len(retention_data), 'total_clients': total_clients})
+    return {'retained_clients_count': len(retention_data), 'total_clients': total_clients}
+
+def build_aging_analysis(conn, today=None):
+    """Piutang tugas selesai yang lewat deadline, dikelompokkan per umur (1-30, 31-60, >60 hari) di SQL."""
+    today = (today or current_time().date()).strftime('%Y-%m-%d')
+    overdue = '''
+        SELECT id, name, (price - paid) AS remaining_due,
+               (julianday(:today) - julianday(completion_date)) AS days_overdue
+        FROM tasks
+        WHERE status = 'Done' AND completion_date IS NOT NULL AND price - paid > 0
+    '''
+
+    buckets = conn.execute(f'''
+        SELECT COALESCE(SUM(remaining_due), 0.0) AS total_overdue,
+               COALESCE(SUM(CASE WHEN days_overdue <= 30 THEN remaining_due END), 0.0) AS aging_1_30,
+               COALESCE(SUM(CASE WHEN days_overdue > 30 AND days_overdue <= 60 THEN remaining_due END), 0.0) AS aging_31_60,
+               COALESCE(SUM(CASE WHEN days_overdue > 60 THEN remaining_due END), 0.0) AS aging_60_plus
+        FROM ({overdue})
+        WHERE days_overdue > 0
+    ''', {'today': today}).fetchone()
+
+    risky_tasks = [
+        {'name': row['name'], 'days': row['days'], 'amount': row['remaining_due']}
+        for row in conn.execute(f'''
+            SELECT name, CAST(days_overdue AS INTEGER) AS days, remaining_due
+            FROM ({overdue})
+            WHERE days_overdue >= 31
+            ORDER BY days_overdue DESC, id
+        ''', {'today': today})
+    ]
 
-@app.route('/api/aging_analysis')
-@login_required
-def get_aging_analysis():
-    conn = get_db_connection()
-    today = datetime.now().strftime('%Y-%m-%d')
-    
-    aging_data = conn.execute(f'''
-        SELECT 
-            name, 
-            completion_date, 
-            (price - paid) AS remaining_due,
-            (julianday('{today}') - julianday(completion_date)) AS days_overdue
-        FROM tasks 
-        WHERE status = 'Done' AND remaining_due > 0 AND completion_date IS NOT NULL
-        HAVING days_overdue > 0
-        ORDER BY days_overdue DESC
-    ''').fetchall()
-    
     aging_summary = {
-        'total_overdue': 0.0,
-        'aging_1_30': 0.0,
-        'aging_31_60': 0.0,
-        'aging_60_plus': 0.0,
-        'risky_tasks': []
+        'total_overdue': buckets['total_overdue'],
+        'aging_1_30': buckets['aging_1_30'],
+        'aging_31_60': buckets['aging_31_60'],
+        'aging_60_plus': buckets['aging_60_plus'],
+        'risky_tasks': risky_tasks
     }
-    
-    for row in aging_data:
-        days = row['days_overdue']
-        due_amount = row['remaining_due']
-        aging_summary['total_overdue'] += due_amount
-        
-        if days <= 30:
-            aging_summary['aging_1_30'] += due_amount
-        elif days <= 60:
-            aging_summary['aging_31_60'] += due_amount
-        else:
-            aging_summary['aging_60_plus'] += due_amount
-            
-        if days >= 31:
-             aging_summary['risky_tasks'].append({
-                 'name': row['name'],
-                 'days': int(days),
-                 'amount': due_amount
-             })
-
-    paid_row = conn.execute("SELECT SUM(paid) as total_paid, SUM(price) as total_revenue FROM tasks").fetchone()
-    total_paid = paid_row['total_paid'] if paid_row['total_paid'] else 0
-    total_revenue = paid_row['total_revenue'] if paid_row['total_revenue'] else 0
+
+    totals = load_financial_totals(conn)
+    total_paid = totals['total_paid']
+    total_revenue = totals['total_revenue']
     
     collection_ratio = (total_paid / total_revenue) * 100 if total_revenue > 0 else 0
-    
-    conn.close()
 
-    return jsonify({
+    return {
         'aging_summary': aging_summary,
         'collection_ratio': round(collection_ratio, 2),
-        'risky_tasks': sorted(aging_summary['risky_tasks'], key=lambda x: x['days'], reverse=True)
-    })
+        'risky_tasks': risky_tasks
+    }
 
-@app.route('/api/monthly_cashflow')
-@login_required
-def get_monthly_cashflow():
-    conn = get_db_connection()
-    cashflow = conn.execute("SELECT strftime('%Y-%m', completion_date) as month, SUM(paid) as total_paid FROM tasks WHERE completion_date IS NOT NULL AND paid > 0 GROUP BY month ORDER BY month").fetchall()
-    conn.close()
+def build_monthly_cashflow(conn):
+    # Dibaca dari rollup bulanan (satu baris per bulan), bukan GROUP BY seluruh tabel tugas
+    cashflow = conn.execute("SELECT bucket AS month, value AS total_paid FROM rollups WHERE granularity = 'month' AND metric = 'paid' AND value > 0.005 ORDER BY bucket").fetchall()
     labels = [row['month'] for row in cashflow]
-    data = [row['total_paid'] for row in cashflow]
-    return jsonify({'labels': labels, 'data': data})
+    data = [round(row['total_paid'], 2) for row in cashflow]
+    return {'labels': labels, 'data': data}
 
-@app.route('/api/priority_data')
-@login_required
-def get_priority_data():
-    conn = get_db_connection()
+def build_priority_data(conn):
     counts = conn.execute('SELECT priority, COUNT(id) as count FROM tasks GROUP BY priority').fetchall()
-    conn.close()
     priority_order = {'High': 0, 'Medium': 1, 'Low': 2}
     sorted_counts = sorted(counts, key=lambda x: priority_order.get(x['priority'], 99))
     labels = [row['priority'] for row in sorted_counts]
     data = [row['count'] for row in sorted_counts]
-    return jsonify({'labels': labels, 'data': data})
+    return {'labels': labels, 'data': data}
+
+def build_deadline_risk(conn, today=None):
+    """Risiko deadline tugas terbuka dalam 14 hari ke depan, dihitung dan diurutkan di SQL (top 5).
+
+    Hanya completion_date berformat YYYY-MM-DD lengkap yang dihitung (sama seperti rollup &
+    risk_watch); tanggal tanpa nol di depan seperti '2025-6-1' dianggap tidak valid.
+    """
+    today = today or current_time().date()
+    rows = conn.execute('''
+        WITH upcoming AS (
+            SELECT id, name,
+                   CAST(julianday(completion_date) - julianday(:today) AS INTEGER) AS days_left,
+                   CASE priority WHEN 'High' THEN 3 WHEN 'Medium' THEN 2 ELSE 1 END AS weight
+            FROM tasks
+            WHERE status IN ('To Do', 'In Progress')
+              AND completion_date BETWEEN :today AND :horizon
+              AND date(completion_date) = completion_date
+        ), scored AS (
+            SELECT id, name, days_left, weight,
+                   MIN(100, MAX(0, weight * 10 - days_left * 5) * 5) AS risk_score
+            FROM upcoming
+        )
+        SELECT name, days_left, risk_score,
+               CASE WHEN risk_score >= 70 THEN 'High' WHEN risk_score >= 30 THEN 'Medium' ELSE 'Low' END AS risk_level,
+               SUM(weight) OVER () AS workload_score
+        FROM scored
+        ORDER BY risk_score DESC, id
+        LIMIT 5
+    ''', {'today': today.strftime('%Y-%m-%d'), 'horizon': (today + timedelta(days=14)).strftime('%Y-%m-%d')}).fetchall()
+
+    workload_score = rows[0]['workload_score'] if rows else 0
+    risk_data = [
+        {'name': row['name'], 'days_left': row['days_left'], 'risk_level': row['risk_level'], 'risk_score': row['risk_score']}
+        for row in rows
+    ]
+    overall_workload = 'Heavy' if workload_score >= 10 else ('Moderate' if workload_score >= 5 else 'Light')
+    return {'overall_workload': overall_workload, 'risky_tasks': risk_data}
+
+# Urutan di sini juga urutan default bagian pada /api/dashboard
+DASHBOARD_SECTIONS = {
+    'financial_summary': build_financial_summary,
+    'revenue_pipeline': build_revenue_pipeline,
+    'client_retention': build_client_retention,
+    'aging_analysis': build_aging_analysis,
+    'deadline_risk': build_deadline_risk,
+    'priority_data': build_priority_data,
+    'monthly_cashflow': build_monthly_cashflow,
+}
+
+def build_dashboard(conn, sections):
+    """Menghitung beberapa bagian dashboard dalam satu transaksi baca (snapshot konsisten)."""
+    conn.execute('BEGIN')
+    try:
+        return {name: DASHBOARD_SECTIONS[name](conn) for name in sections}
+    finally:
+        conn.commit()
+
+@app.route('/api/dashboard')
+@login_required
+@cached_api(date_dependent=True)
+def get_dashboard():
+    requested = request.args.get('sections')
+    if requested:
+        sections = [name.strip() for name in requested.split(',') if name.strip()]
+    else:
+        sections = list(DASHBOARD_SECTIONS)
+    unknown = [name for name in sections if name not in DASHBOARD_SECTIONS]
+    if unknown:
+        return jsonify({'status': 'error', 'message': 'Bagian tidak dikenal: ' + ', '.join(unknown)}), 400
+    return jsonify(build_dashboard(get_db_connection(), sections))
+
+@app.route('/api/financial_summary')
+@login_required
+@cached_api()
+def get_financial_summary():
+    return jsonify(build_financial_summary(get_db_connection()))
+
+@app.route('/api/revenue_pipeline')
+@login_required
+@cached_api()
+def get_revenue_pipeline():
+    return jsonify(build_revenue_pipeline(get_db_connection()))
+
+@app.route('/api/client_retention')
+@login_required
+@cached_api()
+def get_client_retention():
+    return jsonify(build_client_retention(get_db_connection()))
+
+@app.route('/api/aging_analysis')
+@login_required
+@cached_api(date_dependent=True)
+def get_aging_analysis():
+    return jsonify(build_aging_analysis(get_db_connection()))
+
+@app.route('/api/monthly_cashflow')
+@login_required
+@cached_api()
+def get_monthly_cashflow():
+    return jsonify(build_monthly_cashflow(get_db_connection()))
+
+@app.route('/api/priority_data')
+@login_required
+@cached_api()
+def get_priority_data():
+    return jsonify(build_priority_data(get_db_connection()))
 
 @app.route('/api/deadline_risk')
 @login_required
+@cached_api(date_dependent=True)
 def get_deadline_risk():
-    conn = get_db_connection()
-    tasks = conn.execute("SELECT name, completion_date, priority FROM tasks WHERE status IN ('To Do', 'In Progress') AND completion_date IS NOT NULL").fetchall()
-    conn.close()
-    risk_data = []
-    today = datetime.now().date()
-    workload_score = 0
-    for task in tasks:
-        try:
-            deadline = datetime.strptime(task['completion_date'], '%Y-%m-%d').date()
-            days_left = (deadline - today).days
-            priority_weight = {'High': 3, 'Medium': 2, 'Low': 1}.get(task['priority'], 1)
-            if days_left >= 0 and days_left <= 14:
-                workload_score += priority_weight
-                risk_value = max(0, (priority_weight * 10) - (days_left * 5))
-                normalized_risk = min(100, risk_value * 5) 
-                risk_level = 'High' if normalized_risk >= 70 else ('Medium' if normalized_risk >= 30 else 'Low')
-                risk_data.append({'name': task['name'], 'days_left': days_left, 'risk_level': risk_level, 'risk_score': normalized_risk})
-        except ValueError:
-            continue
-    risk_data.sort(key=lambda x: x['risk_score'], reverse=True)
-    overall_workload = 'Heavy' if workload_score >= 10 else ('Moderate' if workload_score >= 5 else 'Light')
-    return jsonify({'overall_workload': overall_workload, 'risky_tasks': risk_data[:5]})
+    return jsonify(build_deadline_risk(get_db_connection()))
+
+TREND_METRICS = ('paid', 'revenue', 'expenses', 'expense_count') + tuple(f'tasks:{status}' for status in TASK_STATUSES)
+
+@app.route('/api/trends')
+@login_required
+@cached_api()
+def get_trends():
+    """Tren dari tabel rollups: ?granularity=day|week|month&metrics=paid,expenses&start=YYYY-MM-DD&end=YYYY-MM-DD."""
+    granularity = request.args.get('granularity', 'month')
+    if granularity not in ROLLUP_BUCKETS:
+        return jsonify({'status': 'error', 'message': f'Granularitas tidak dikenal: {granularity}'}), 400
+    metrics = [m for m in request.args.get('metrics', 'paid,revenue,expenses').split(',') if m]
+    unknown = [m for m in metrics if m not in TREND_METRICS]
+    if unknown or not metrics:
+        return jsonify({'status': 'error', 'message': f"Metrik tidak dikenal: {', '.join(unknown) or '-'}"}), 400
+    try:
+        start, end = (datetime.strptime(request.args[key], '%Y-%m-%d').date() if request.args.get(key) else None
+                      for key in ('start', 'end'))
+    except ValueError:
+        return jsonify({'status': 'error', 'message': 'Tanggal harus berformat YYYY-MM-DD.'}), 400
+    labels, series = load_rollup_series(get_db_connection(), granularity, metrics, start, end)
+    return jsonify({'granularity': granularity, 'labels': labels, 'series': series})
 
 if __name__ == '__main__':
     # Pastikan direktori uploads ada saat start
     if not os.path.exists(UPLOAD_FOLDER):
         os.makedirs(UPLOAD_FOLDER)
-    
-    # 1. Inisialisasi dan Start Scheduler
-    scheduler.init_app(app)
-    
-    # 2. Tambahkan Job untuk Bot (Setiap hari pukul 08:00 AM)
-    scheduler.add_job(
-        id='DailyRiskReport', 
-        func=bot_job_generate_daily_report, 
-        trigger='cron', 
-        hour=8, 
-        minute=0
-    )
-    
-    # 3. Jalankan Job sekali saat startup agar ada laporan saat aplikasi baru dibuka
-    with app.app_context():
-        bot_job_generate_daily_report() 
 
-    scheduler.start()
-    
-    app.run(debug=True)
\ No newline at end of file
+    # Start Scheduler; job pergantian hari (00:00: risk_watch & laporan bot, plus sekali saat startup
+    # jika laporan hari ini belum ada) dan job bot lain hanya dijadwalkan di proses pemegang lease scheduler
+    start_scheduler()
+
+    app.run(debug=True)
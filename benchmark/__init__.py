@@ -0,0 +1,10 @@
+"""Benchmark reproducible untuk app.py.
+
+    python -m benchmark generate --scale 100k --database bench.db
+    python -m benchmark run --scale 100k --out hasil.json
+    python -m benchmark compare sebelum.json sesudah.json
+    python -m benchmark startup --runs 5 --max-ms 1500
+
+Data dibuat oleh generator ber-seed (datagen.py) sehingga dua commit yang
+dijalankan dengan --scale/--seed/--anchor yang sama mengukur data yang identik.
+"""
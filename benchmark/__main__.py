@@ -0,0 +1,86 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+from datetime import date
+
+from .datagen import SCALES, generate_dataset
+from .harness import compare_results, load_app, measure_startup, run_benchmark, write_results
+
+
+def generate(database, scale, seed, anchor):
+    app_module = load_app(database)
+    with app_module.app.app_context():
+        counts = generate_dataset(app_module.get_db_connection(), scale, seed, anchor)
+    print(f"{database}: {counts['tasks']} tugas, {counts['clients']} klien, {counts['expenses']} pengeluaran")
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmark', description='Benchmark app.py dengan data sintetis.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    def data_options(command):
+        command.add_argument('--scale', choices=sorted(SCALES, key=SCALES.get), default='1k')
+        command.add_argument('--seed', type=int, default=42)
+        command.add_argument('--anchor', type=date.fromisoformat, default=None,
+                             help='Tanggal acuan data (YYYY-MM-DD); default hari ini.')
+
+    gen = commands.add_parser('generate', help='Isi database dengan data sintetis (isi lama dihapus).')
+    gen.add_argument('--database', default='bench.db')
+    data_options(gen)
+
+    run = commands.add_parser('run', help='Ukur semua halaman, /api/*, dan export.')
+    run.add_argument('--database', help='Pakai database yang sudah diisi `generate`; default: database sementara baru.')
+    data_options(run)
+    run.add_argument('--iterations', type=int, default=20)
+    run.add_argument('--warm', action='store_true', help='Jangan kosongkan cache (API, fragmen, pengguna, laporan) di antara request.')
+    run.add_argument('--out', help='Tulis hasil JSON ke file ini.')
+
+    compare = commands.add_parser('compare', help='Bandingkan dua file hasil JSON.')
+    compare.add_argument('before')
+    compare.add_argument('after')
+    compare.add_argument('--fail-over', type=float, default=None, help='Exit 1 jika p95 memburuk lebih dari N persen.')
+
+    startup = commands.add_parser('startup', help='Ukur waktu `import app` (tanpa I/O database maupun hashing).')
+    startup.add_argument('--runs', type=int, default=5)
+    startup.add_argument('--max-ms', type=float, default=None, help='Exit 1 jika median melebihi N milidetik.')
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'generate':
+        generate(args.database, args.scale, args.seed, args.anchor)
+    elif args.command == 'run':
+        meta = {'scale': args.scale, 'seed': args.seed, 'anchor': (args.anchor or date.today()).isoformat()}
+        with tempfile.TemporaryDirectory() as tmp:
+            database = args.database
+            if database is None:
+                database = os.path.join(tmp, 'bench.db')
+                generate(database, args.scale, args.seed, args.anchor)
+            else:
+                meta = {'database': database}
+            meta['import_ms'] = measure_startup(runs=3, log=lambda line: None)['median_ms']
+            results = run_benchmark(database, args.iterations, args.warm, meta)
+        if args.out:
+            write_results(results, args.out)
+            print(f'Hasil ditulis ke {args.out}')
+    elif args.command == 'startup':
+        result = measure_startup(args.runs)
+        if result['created_files']:
+            print(f"import app membuat file: {', '.join(result['created_files'])}")
+            sys.exit(1)
+        if args.max_ms is not None and result['median_ms'] > args.max_ms:
+            print(f"median {result['median_ms']:.2f} ms melebihi batas {args.max_ms:.2f} ms")
+            sys.exit(1)
+    elif args.command == 'compare':
+        with open(args.before, encoding='utf-8') as f:
+            before = json.load(f)
+        with open(args.after, encoding='utf-8') as f:
+            after = json.load(f)
+        if compare_results(before, after, args.fail_over):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
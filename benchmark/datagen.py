@@ -0,0 +1,111 @@
+"""Generator data sintetis ber-seed untuk tabel tasks, clients, dan expenses."""
+import random
+from datetime import date, timedelta
+
+# Skala = jumlah tugas; klien dan pengeluaran mengikuti rasio tetap
+SCALES = {'1k': 1_000, '10k': 10_000, '100k': 100_000, '1m': 1_000_000}
+CLIENTS_PER_TASK = 1 / 20
+EXPENSES_PER_TASK = 1 / 2
+BATCH_SIZE = 10_000
+
+# Hanya status yang bisa dihasilkan aplikasi lewat status_from_progress() (tanpa 'Review')
+STATUS_WEIGHTS = {'To Do': 25, 'In Progress': 30, 'Done': 45}
+PRIORITY_WEIGHTS = {'High': 20, 'Medium': 50, 'Low': 30}
+WORDS = [
+    'Desain', 'Logo', 'Website', 'Aplikasi', 'Mobile', 'Rebranding', 'Kampanye', 'Iklan', 'Foto',
+    'Video', 'Konten', 'Laporan', 'Server', 'Hosting', 'Domain', 'Landing', 'Page', 'Katalog',
+    'Produk', 'Brosur', 'Banner', 'Maskot', 'Ilustrasi', 'Animasi', 'Dashboard', 'Integrasi',
+]
+CITIES = ['Jakarta', 'Bandung', 'Surabaya', 'Medan', 'Makassar', 'Yogyakarta', 'Semarang', 'Denpasar']
+EXPENSE_ITEMS = ['Langganan', 'Lisensi', 'Transport', 'Makan', 'Cetak', 'Internet', 'Listrik', 'Peralatan', 'Freelancer']
+
+
+def _weighted(rng, weights):
+    return rng.choices(list(weights), weights=list(weights.values()))[0]
+
+
+def _progress_for(rng, status):
+    # Konsisten dengan status_from_progress(): 100 = Done, >= 10 = In Progress, selain itu To Do
+    if status == 'Done':
+        return 100
+    if status == 'To Do':
+        return rng.randint(0, 9)
+    return rng.randint(10, 99)
+
+
+def _paid_for(rng, status, price):
+    roll = rng.random()
+    if status == 'Done':
+        return price if roll < 0.7 else (round(price * rng.uniform(0.2, 0.9), -3) if roll < 0.9 else 0.0)
+    # Tugas berjalan: sebagian sudah membayar uang muka
+    return round(price * rng.choice([0.3, 0.5]), -3) if roll < 0.4 else 0.0
+
+
+def iter_clients(rng, count):
+    for i in range(count):
+        city = rng.choice(CITIES)
+        name = f'{rng.choice(["PT", "CV", "Studio", "Toko"])} {rng.choice(WORDS)} {city} {i + 1}'
+        yield (name, f'08{rng.randint(10**9, 10**10 - 1)}', f'kontak{i + 1}@{city.lower()}.co.id')
+
+
+def iter_tasks(rng, count, client_count, anchor):
+    for i in range(count):
+        status = _weighted(rng, STATUS_WEIGHTS)
+        price = float(rng.randrange(250_000, 25_000_000, 50_000))
+        # Tugas selesai condong ke masa lalu, tugas terbuka ke masa depan dekat
+        offset = -rng.randint(0, 365) if status == 'Done' else rng.randint(-30, 60)
+        completion_date = None if rng.random() < 0.03 else (anchor + timedelta(days=offset)).isoformat()
+        client_id = rng.randint(1, client_count) if client_count and rng.random() < 0.85 else None
+        yield (
+            f'{rng.choice(WORDS)} {rng.choice(WORDS)} #{i + 1}', status, _weighted(rng, PRIORITY_WEIGHTS),
+            price, _paid_for(rng, status, price), completion_date, client_id, _progress_for(rng, status),
+        )
+
+
+def iter_expenses(rng, count, anchor):
+    for i in range(count):
+        amount = round(min(rng.lognormvariate(12.5, 1.0), 50_000_000), -2)
+        yield (f'{rng.choice(EXPENSE_ITEMS)} {rng.choice(WORDS)}', amount, (anchor - timedelta(days=rng.randint(0, 365))).isoformat())
+
+
+def _insert(conn, sql, rows):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            conn.executemany(sql, batch)
+            batch.clear()
+    if batch:
+        conn.executemany(sql, batch)
+
+
+def generate_dataset(conn, scale='1k', seed=42, anchor=None):
+    """Mengganti isi tasks/clients/expenses dengan data sintetis; mengembalikan jumlah baris per tabel.
+
+    `conn` harus sudah dimigrasi (lewat trigger, ringkasan & index pencarian ikut terisi).
+    tasks_archive ikut dikosongkan agar total dan rollup hanya berasal dari data baru.
+    """
+    task_count = SCALES[scale] if isinstance(scale, str) else int(scale)
+    client_count = max(1, int(task_count * CLIENTS_PER_TASK))
+    expense_count = int(task_count * EXPENSES_PER_TASK)
+    anchor = anchor or date.today()
+    rng = random.Random(seed)
+
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        for table in ('tasks', 'tasks_archive', 'clients', 'expenses'):
+            conn.execute(f'DELETE FROM {table}')
+            conn.execute('DELETE FROM sqlite_sequence WHERE name = ?', (table,))
+        _insert(conn, 'INSERT INTO clients (name, contact, email) VALUES (?, ?, ?)', iter_clients(rng, client_count))
+        _insert(conn, '''
+            INSERT INTO tasks (name, status, priority, price, paid, completion_date, client_id, progress)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', iter_tasks(rng, task_count, client_count, anchor))
+        _insert(conn, 'INSERT INTO expenses (description, amount, date) VALUES (?, ?, ?)', iter_expenses(rng, expense_count, anchor))
+        conn.execute("UPDATE app_meta SET value = value + 1 WHERE key = 'data_version'")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    conn.execute('ANALYZE')
+    return {'tasks': task_count, 'clients': client_count, 'expenses': expense_count}
@@ -0,0 +1,204 @@
+"""Harness benchmark: menjalankan halaman, endpoint /api/*, dan export lewat Flask test client."""
+import json
+import os
+import platform
+import re
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGES = ['/', '/financials', '/clients', '/settings']
+EXPORTS = ['/export_data?format=csv', '/export_data?format=ndjson']
+# Endpoint /api/* yang butuh query string agar melakukan pekerjaan nyata
+API_QUERY = {'/api/search': 'q=desain+logo'}
+# Endpoint yang bukan request-response biasa (mis. stream tanpa akhir)
+SKIP_ENDPOINTS = {'event_stream'}
+SERVER_TIMING_DB = re.compile(r'db;dur=([\d.]+);desc="(\d+) queries"')
+
+
+def load_app(database):
+    """Import app.py dengan DATABASE diarahkan ke `database` (skema dimigrasi, admin dibuat)."""
+    if REPO_ROOT not in sys.path:
+        sys.path.insert(0, REPO_ROOT)
+    import app as app_module
+    app_module.app.config['DATABASE'] = os.path.abspath(database)
+    app_module.app.config['SLOW_QUERY_MS'] = None
+    with app_module.app.app_context():
+        app_module.init_db(app_module.get_db_connection())
+    return app_module
+
+
+# Diukur di proses baru agar modul belum ter-cache; cwd sementara menangkap file yang dibuat saat import
+STARTUP_SCRIPT = (
+    'import sys, time; sys.path.insert(0, sys.argv[1]); '
+    'start = time.perf_counter(); import app; '
+    'print((time.perf_counter() - start) * 1000)'
+)
+
+
+def measure_startup(runs=5, log=print):
+    """Mengukur waktu `import app` di proses baru; juga mengembalikan file yang tercipta karena import."""
+    timings, created = [], set()
+    for _ in range(runs):
+        with tempfile.TemporaryDirectory() as tmp:
+            output = subprocess.run([sys.executable, '-c', STARTUP_SCRIPT, REPO_ROOT], cwd=tmp,
+                                    capture_output=True, text=True, check=True).stdout
+            timings.append(float(output.strip().splitlines()[-1]))
+            for root, _, files in os.walk(tmp):
+                created.update(os.path.relpath(os.path.join(root, name), tmp) for name in files)
+    timings.sort()
+    result = {'runs': runs, 'median_ms': round(timings[len(timings) // 2], 2),
+              'max_ms': round(timings[-1], 2), 'created_files': sorted(created)}
+    log(f"import app: median {result['median_ms']:.2f} ms  max {result['max_ms']:.2f} ms  ({runs} proses)")
+    return result
+
+
+def discover_urls(app_module, conn):
+    """Semua URL yang diukur: halaman, setiap GET /api/*, dan export."""
+    client_id = conn.execute('SELECT id FROM clients ORDER BY id LIMIT 1').fetchone()
+    urls = list(PAGES)
+    for rule in sorted(app_module.app.url_map.iter_rules(), key=lambda r: r.rule):
+        if not rule.rule.startswith('/api/') or 'GET' not in rule.methods or rule.endpoint in SKIP_ENDPOINTS:
+            continue
+        url = rule.rule
+        if '<int:client_id>' in url:
+            if client_id is None:
+                continue
+            url = url.replace('<int:client_id>', str(client_id[0]))
+        if '<' in url:
+            continue
+        if rule.rule in API_QUERY:
+            url += '?' + API_QUERY[rule.rule]
+        urls.append(url)
+    return urls + EXPORTS
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+def measure(app_module, client, url, iterations, warm):
+    """Latensi (ms) per iterasi plus query & waktu DB dari header Server-Timing dan puncak memori.
+
+    Response streaming (export) tidak punya Server-Timing; query & waktu DB-nya None (n/a).
+    """
+    timings, queries, db_times = [], [], []
+    status = None
+    for _ in range(iterations + 1):
+        if not warm:
+            app_module.clear_caches()
+        started = time.perf_counter()
+        response = client.get(url)
+        response.get_data()  # Habiskan body; response streaming baru dihitung di sini
+        elapsed = (time.perf_counter() - started) * 1000
+        status = response.status_code
+        match = SERVER_TIMING_DB.search(response.headers.get('Server-Timing', ''))
+        if _ == 0:
+            continue  # Iterasi pertama = pemanasan (import template, cache halaman SQLite)
+        timings.append(elapsed)
+        if match:
+            db_times.append(float(match.group(1)))
+            queries.append(int(match.group(2)))
+
+    # Puncak memori diukur terpisah karena tracemalloc memperlambat eksekusi
+    if not warm:
+        app_module.clear_caches()
+    tracemalloc.start()
+    try:
+        client.get(url).get_data()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'status': status,
+        'p50_ms': round(percentile(timings, 50), 3),
+        'p95_ms': round(percentile(timings, 95), 3),
+        'mean_ms': round(sum(timings) / len(timings), 3),
+        'queries': max(queries) if queries else None,
+        'db_ms_p50': round(percentile(db_times, 50), 3) if db_times else None,
+        'peak_kb': round(peak / 1024, 1),
+    }
+
+
+def format_optional(value):
+    return 'n/a' if value is None else str(value)
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmark(database, iterations=20, warm=False, meta=None, log=print):
+    """Mengukur semua URL terhadap `database` yang sudah berisi data; mengembalikan dict hasil."""
+    app_module = load_app(database)
+    client = app_module.app.test_client()
+    response = client.post('/login', data={'username': 'admin', 'password': 'admin123'})
+    if response.status_code != 302:
+        raise RuntimeError('Login admin gagal; database benchmark harus memakai pengguna admin bawaan.')
+
+    with app_module.app.app_context():
+        conn = app_module.get_db_connection()
+        urls = discover_urls(app_module, conn)
+        rows = {table: conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0] for table in ('tasks', 'clients', 'expenses')}
+
+    results = {}
+    for url in urls:
+        results[url] = measure(app_module, client, url, iterations, warm)
+        log(f"{url:45} p50 {results[url]['p50_ms']:9.2f} ms  p95 {results[url]['p95_ms']:9.2f} ms  "
+            f"queries {format_optional(results[url]['queries']):>4}  peak {results[url]['peak_kb']:9.1f} KiB  [{results[url]['status']}]")
+
+    return {
+        'meta': dict(meta or {}, **{
+            'commit': git_commit(),
+            'rows': rows,
+            'iterations': iterations,
+            'cache': 'warm' if warm else 'cold',
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'platform': platform.platform(),
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+        }),
+        'endpoints': results,
+    }
+
+
+def compare_results(before, after, fail_over=None, log=print):
+    """Mencetak perubahan p50/p95/query/memori; True jika ada p95 yang memburuk lebih dari fail_over persen."""
+    def change(old, new):
+        if old in (None, 0) or new is None:
+            return '     -'
+        return f'{(new - old) / old * 100:+6.1f}%'
+
+    log(f"sebelum: {before['meta'].get('commit')}  sesudah: {after['meta'].get('commit')}")
+    regressed = False
+    old_import, new_import = before['meta'].get('import_ms'), after['meta'].get('import_ms')
+    if old_import is not None and new_import is not None:
+        log(f"{'import app':45} median {old_import:8.2f} -> {new_import:8.2f} ({change(old_import, new_import)})")
+    for url in sorted(set(before['endpoints']) | set(after['endpoints'])):
+        old, new = before['endpoints'].get(url), after['endpoints'].get(url)
+        if old is None or new is None:
+            log(f"{url:45} {'hanya sesudah' if old is None else 'hanya sebelum'}")
+            continue
+        log(f"{url:45} p50 {old['p50_ms']:8.2f} -> {new['p50_ms']:8.2f} ({change(old['p50_ms'], new['p50_ms'])})  "
+            f"p95 {old['p95_ms']:8.2f} -> {new['p95_ms']:8.2f} ({change(old['p95_ms'], new['p95_ms'])})  "
+            f"queries {format_optional(old['queries'])} -> {format_optional(new['queries'])}  peak {change(old['peak_kb'], new['peak_kb'])}")
+        if fail_over is not None and old['p95_ms'] and (new['p95_ms'] - old['p95_ms']) / old['p95_ms'] * 100 > fail_over:
+            regressed = True
+    return regressed
+
+
+def write_results(results, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2, sort_keys=True)
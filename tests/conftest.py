@@ -0,0 +1,85 @@
+from datetime import datetime
+
+import pytest
+
+import app as app_module
+
+
+@pytest.fixture
+def app(tmp_path):
+    """Aplikasi dengan database baru per test; skema dimigrasi tanpa admin bawaan (hash pbkdf2 mahal)."""
+    flask_app = app_module.app
+    original_config = dict(flask_app.config)
+    flask_app.config.update(
+        TESTING=True,
+        DATABASE=str(tmp_path / 'test.db'),
+        AUTO_MIGRATE=False,
+        SNAPSHOT_FOLDER=str(tmp_path / 'snapshots'),
+    )
+    app_module.clear_caches()
+    with flask_app.app_context():
+        app_module.migrate_db(app_module.get_db_connection())
+        yield flask_app
+    pool = flask_app.extensions.pop('sqlite_pool', None)
+    if pool is not None:
+        pool.close_all()
+    flask_app.config.clear()
+    flask_app.config.update(original_config)
+
+
+@pytest.fixture
+def client(app):
+    app.config['LOGIN_DISABLED'] = True
+    return app.test_client()
+
+
+@pytest.fixture
+def clock(app):
+    """Jam palsu untuk current_time(); ubah `clock.now` untuk memajukan waktu."""
+    class Clock:
+        now = datetime(2025, 6, 15, 9, 0)
+
+    fake = Clock()
+    app.config['CLOCK'] = lambda: fake.now
+    return fake
+
+
+@pytest.fixture
+def conn(app):
+    return app_module.get_db_connection()
+
+
+@pytest.fixture
+def count_queries(conn):
+    """Menjalankan fungsi dan mengembalikan (hasil, jumlah statement SQL) lewat InstrumentedConnection."""
+    def count(func, *args, **kwargs):
+        conn.stats = app_module.QueryStats()
+        try:
+            result = func(*args, **kwargs)
+            return result, conn.stats.count
+        finally:
+            conn.stats = None
+    return count
+
+
+@pytest.fixture
+def add_client(conn):
+    def add(name, contact=None, email=None):
+        cursor = conn.execute('INSERT INTO clients (name, contact, email) VALUES (?, ?, ?)', (name, contact, email))
+        conn.commit()
+        return cursor.lastrowid
+    return add
+
+
+@pytest.fixture
+def add_task(conn):
+    def add(name='Tugas', status='To Do', priority='Medium', price=100.0, paid=0.0,
+            completion_date=None, client_id=None, progress=0):
+        cursor = conn.execute(
+            'INSERT INTO tasks (name, status, priority, price, paid, completion_date, client_id, progress) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+            (name, status, priority, price, paid, completion_date, client_id, progress)
+        )
+        conn.commit()
+        return cursor.lastrowid
+    return add
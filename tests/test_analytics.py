@@ -0,0 +1,202 @@
+"""aging_analysis & deadline_risk versi SQL dibandingkan dengan implementasi Python lama.
+
+reference_* adalah kode Python asli sebelum perhitungan dipindah ke SQL, dengan dua
+perbedaan yang disengaja: baris dibaca urut id agar urutan saat skor seri deterministik,
+dan deadline tanpa nol di depan ('2025-6-1', diterima strptime) dilewati seperti di SQL
+(date(x) = x), sama dengan rollup & risk_watch.
+"""
+import random
+from datetime import date, datetime, timedelta
+
+import pytest
+
+import app as app_module
+
+TODAY = date(2025, 6, 15)
+
+
+def reference_aging_analysis(conn, today):
+    aging_data = conn.execute('''
+        SELECT name, completion_date, (price - paid) AS remaining_due,
+               (julianday(?) - julianday(completion_date)) AS days_overdue
+        FROM tasks
+        WHERE status = 'Done' AND remaining_due > 0 AND completion_date IS NOT NULL
+          AND days_overdue > 0
+        ORDER BY days_overdue DESC, id
+    ''', (today.strftime('%Y-%m-%d'),)).fetchall()
+    aging_summary = {'total_overdue': 0.0, 'aging_1_30': 0.0, 'aging_31_60': 0.0, 'aging_60_plus': 0.0, 'risky_tasks': []}
+    for row in aging_data:
+        days = row['days_overdue']
+        due_amount = row['remaining_due']
+        aging_summary['total_overdue'] += due_amount
+        if days <= 30:
+            aging_summary['aging_1_30'] += due_amount
+        elif days <= 60:
+            aging_summary['aging_31_60'] += due_amount
+        else:
+            aging_summary['aging_60_plus'] += due_amount
+        if days >= 31:
+            aging_summary['risky_tasks'].append({'name': row['name'], 'days': int(days), 'amount': due_amount})
+    totals = app_module.load_financial_totals(conn)
+    collection_ratio = (totals['total_paid'] / totals['total_revenue']) * 100 if totals['total_revenue'] > 0 else 0
+    return {
+        'aging_summary': aging_summary,
+        'collection_ratio': round(collection_ratio, 2),
+        'risky_tasks': sorted(aging_summary['risky_tasks'], key=lambda x: x['days'], reverse=True)
+    }
+
+
+def reference_deadline_risk(conn, today):
+    tasks = conn.execute("SELECT name, completion_date, priority FROM tasks WHERE status IN ('To Do', 'In Progress') AND completion_date IS NOT NULL ORDER BY id").fetchall()
+    risk_data = []
+    workload_score = 0
+    for task in tasks:
+        try:
+            deadline = datetime.strptime(task['completion_date'], '%Y-%m-%d').date()
+            if deadline.strftime('%Y-%m-%d') != task['completion_date']:
+                continue
+            days_left = (deadline - today).days
+            priority_weight = {'High': 3, 'Medium': 2, 'Low': 1}.get(task['priority'], 1)
+            if days_left >= 0 and days_left <= 14:
+                workload_score += priority_weight
+                risk_value = max(0, (priority_weight * 10) - (days_left * 5))
+                normalized_risk = min(100, risk_value * 5)
+                risk_level = 'High' if normalized_risk >= 70 else ('Medium' if normalized_risk >= 30 else 'Low')
+                risk_data.append({'name': task['name'], 'days_left': days_left, 'risk_level': risk_level, 'risk_score': normalized_risk})
+        except ValueError:
+            continue
+    risk_data.sort(key=lambda x: x['risk_score'], reverse=True)
+    overall_workload = 'Heavy' if workload_score >= 10 else ('Moderate' if workload_score >= 5 else 'Light')
+    return {'overall_workload': overall_workload, 'risky_tasks': risk_data[:5]}
+
+
+def assert_same_json(expected, actual, path='', tolerance=1e-6):
+    """Struktur JSON harus sama; angka float dibandingkan relatif terhadap toleransi."""
+    if isinstance(expected, dict):
+        assert isinstance(actual, dict) and expected.keys() == actual.keys(), path
+        for key in expected:
+            assert_same_json(expected[key], actual[key], f'{path}.{key}', tolerance)
+    elif isinstance(expected, list):
+        assert isinstance(actual, list) and len(expected) == len(actual), path
+        for i, (a, b) in enumerate(zip(expected, actual)):
+            assert_same_json(a, b, f'{path}[{i}]', tolerance)
+    elif isinstance(expected, (int, float)) and isinstance(actual, (int, float)):
+        assert abs(expected - actual) <= tolerance * max(1.0, abs(expected)), f'{path}: {expected} != {actual}'
+    else:
+        assert expected == actual, path
+
+
+def day(offset):
+    return (TODAY + timedelta(days=offset)).strftime('%Y-%m-%d')
+
+
+@pytest.mark.parametrize('offset, bucket', [
+    (0, None),
+    (-1, 'aging_1_30'),
+    (-30, 'aging_1_30'),
+    (-31, 'aging_31_60'),
+    (-60, 'aging_31_60'),
+    (-61, 'aging_60_plus'),
+    (5, None),
+])
+def test_aging_bucket_boundaries(conn, add_task, offset, bucket):
+    add_task(name='Piutang', status='Done', price=300.0, paid=100.0, completion_date=day(offset))
+
+    result = app_module.build_aging_analysis(conn, TODAY)
+
+    summary = result['aging_summary']
+    for name in ('aging_1_30', 'aging_31_60', 'aging_60_plus'):
+        assert summary[name] == (200.0 if name == bucket else 0.0)
+    assert summary['total_overdue'] == (200.0 if bucket else 0.0)
+    assert [task['days'] for task in result['risky_tasks']] == ([-offset] if -offset >= 31 else [])
+    assert_same_json(reference_aging_analysis(conn, TODAY), result)
+
+
+def test_aging_skips_missing_deadline_paid_and_open_tasks(conn, add_task):
+    add_task(name='Tanpa deadline', status='Done', price=500.0, paid=0.0, completion_date=None)
+    add_task(name='Harga nol', status='Done', price=0.0, paid=0.0, completion_date=day(-45))
+    add_task(name='Lunas', status='Done', price=500.0, paid=500.0, completion_date=day(-45))
+    add_task(name='Belum selesai', status='In Progress', price=500.0, paid=0.0, completion_date=day(-45))
+
+    result = app_module.build_aging_analysis(conn, TODAY)
+
+    assert result['aging_summary']['total_overdue'] == 0.0
+    assert result['risky_tasks'] == []
+    assert result['collection_ratio'] == 33.33
+    assert_same_json(reference_aging_analysis(conn, TODAY), result)
+
+
+def test_aging_collection_ratio_without_revenue(conn, add_task):
+    add_task(name='Harga nol', status='Done', price=0.0, paid=0.0, completion_date=day(-10))
+
+    result = app_module.build_aging_analysis(conn, TODAY)
+
+    assert result['collection_ratio'] == 0
+    assert_same_json(reference_aging_analysis(conn, TODAY), result)
+
+
+def test_deadline_risk_window(conn, add_task):
+    add_task(name='Hari ini', priority='High', completion_date=day(0))
+    add_task(name='Kemarin', priority='High', completion_date=day(-1))
+    add_task(name='Batas horizon', priority='Low', completion_date=day(14))
+    add_task(name='Lewat horizon', priority='High', completion_date=day(15))
+    add_task(name='Tanpa deadline', priority='High', completion_date=None)
+    add_task(name='Tanggal rusak', priority='High', completion_date='besok')
+    add_task(name='Tanpa nol', priority='High', completion_date=f'{TODAY.year}-{TODAY.month}-{TODAY.day + 1}')
+    add_task(name='Sudah selesai', status='Done', priority='High', completion_date=day(1))
+    add_task(name='Tanpa prioritas', status='In Progress', priority=None, completion_date=day(2))
+
+    result = app_module.build_deadline_risk(conn, TODAY)
+
+    # Skor seri diurutkan menurut id
+    assert result['risky_tasks'] == [
+        {'name': 'Hari ini', 'days_left': 0, 'risk_level': 'High', 'risk_score': 100},
+        {'name': 'Batas horizon', 'days_left': 14, 'risk_level': 'Low', 'risk_score': 0},
+        {'name': 'Tanpa prioritas', 'days_left': 2, 'risk_level': 'Low', 'risk_score': 0},
+    ]
+    assert result['overall_workload'] == 'Moderate'
+    assert_same_json(reference_deadline_risk(conn, TODAY), result)
+
+
+def test_deadline_risk_without_tasks(conn):
+    result = app_module.build_deadline_risk(conn, TODAY)
+
+    assert result == {'overall_workload': 'Light', 'risky_tasks': []}
+    assert_same_json(reference_deadline_risk(conn, TODAY), result)
+
+
+def generate_sample_tasks(conn, count, seed, today):
+    """Mengisi tabel tasks dengan data acak yang dapat direproduksi di sekitar tanggal `today`."""
+    rng = random.Random(seed)
+    statuses = ['To Do', 'In Progress', 'Review', 'Done']
+    priorities = ['High', 'Medium', 'Low', None]
+    junk_dates = [None, '', 'besok', '2024-13-40']
+
+    def rows():
+        for i in range(count):
+            day = today + timedelta(days=rng.randint(-150, 40))
+            roll = rng.random()
+            if roll < 0.02:
+                completion_date = rng.choice(junk_dates)
+            elif roll < 0.04:
+                completion_date = f'{day.year}-{day.month}-{day.day}'  # Tanpa nol di depan
+            else:
+                completion_date = day.strftime('%Y-%m-%d')
+            price = round(rng.uniform(50_000, 5_000_000), 2)
+            paid = rng.choice([0.0, price, round(price * rng.random(), 2)])
+            yield (f'Tugas {i}', rng.choice(statuses), rng.choice(priorities), price, paid, completion_date)
+
+    conn.executemany('INSERT INTO tasks (name, status, priority, price, paid, completion_date) VALUES (?, ?, ?, ?, ?, ?)', rows())
+    conn.commit()
+
+
+@pytest.mark.parametrize('build, reference', [
+    (app_module.build_aging_analysis, reference_aging_analysis),
+    (app_module.build_deadline_risk, reference_deadline_risk),
+], ids=['aging_analysis', 'deadline_risk'])
+@pytest.mark.slow
+def test_sql_matches_reference_on_random_data(conn, build, reference):
+    generate_sample_tasks(conn, 100_000, seed=42, today=TODAY)
+    for week in range(5):
+        today = TODAY + timedelta(days=week * 7)
+        assert_same_json(reference(conn, today), build(conn, today), path=str(today))
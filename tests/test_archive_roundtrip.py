@@ -0,0 +1,109 @@
+"""Export lalu import tidak boleh menggandakan tugas yang sudah diarsipkan."""
+import io
+from contextlib import contextmanager
+
+import pytest
+
+import app as app_module
+
+
+def task_ids(conn, table):
+    return [row[0] for row in conn.execute(f'SELECT id FROM {table} ORDER BY id')]
+
+
+def snapshot_totals(conn):
+    return (
+        app_module.build_financial_summary(conn),
+        sorted(tuple(row) for row in conn.execute('SELECT granularity, metric, bucket, value FROM rollups')),
+    )
+
+
+def import_text(conn, text, export_format, mode='upsert'):
+    @contextmanager
+    def open_text():
+        yield io.StringIO(text, newline='')
+
+    importer = app_module.DataImporter(conn, mode)
+    return importer.run(app_module.open_import_records(open_text, export_format))
+
+
+@pytest.fixture
+def archived(conn, clock, add_client, add_task):
+    client_id = add_client('PT Arsip')
+    add_task(name='Lama lunas', status='Done', price=900.0, paid=900.0, completion_date='2023-01-10',
+             client_id=client_id, progress=100)
+    add_task(name='Berjalan', status='In Progress', price=400.0, paid=100.0, completion_date='2025-07-01',
+             client_id=client_id, progress=50)
+    assert app_module.archive_tasks(conn, app_module.archive_cutoff()) == 1
+    return task_ids(conn, 'tasks_archive')[0]
+
+
+@pytest.mark.parametrize('export_format', ['csv', 'ndjson'])
+def test_export_import_keeps_archived_tasks_in_archive(conn, client, archived, export_format):
+    before = snapshot_totals(conn)
+    exported = client.get(f'/export_data?format={export_format}').get_data(as_text=True)
+
+    report = import_text(conn, exported, export_format)
+
+    assert report['rejected'] == []
+    assert report['imported']['tasks_archive'] == 1
+    assert task_ids(conn, 'tasks_archive') == [archived]
+    assert archived not in task_ids(conn, 'tasks')
+    assert snapshot_totals(conn) == before
+    assert app_module.financial_summary_drift(conn) == []
+    assert app_module.rollup_drift(conn) == []
+
+
+def test_upsert_rejects_task_id_held_by_archive(conn, archived):
+    before = snapshot_totals(conn)
+    text = (f'{{"table": "tasks", "row": {{"id": {archived}, "name": "Ganda", "status": "Done", '
+            f'"price": 900, "paid": 900, "completion_date": "2023-01-10", "progress": 100}}}}\n')
+
+    report = import_text(conn, text, 'ndjson')
+
+    assert report['rejected'] == [{'table': 'tasks', 'line': 1, 'error': f'id {archived} sudah ada di tasks_archive'}]
+    assert archived not in task_ids(conn, 'tasks')
+    assert snapshot_totals(conn) == before
+
+
+def test_upsert_of_changed_archived_row_updates_totals(conn, client, archived):
+    text = (f'{{"table": "tasks_archive", "row": {{"id": {archived}, "name": "Lama lunas", "status": "Done", '
+            f'"price": 1500, "paid": 1500, "completion_date": "2023-02-10", "progress": 100}}}}\n')
+
+    report = import_text(conn, text, 'ndjson')
+
+    assert report['rejected'] == []
+    assert app_module.financial_summary_drift(conn) == []
+    assert app_module.rollup_drift(conn) == []
+    assert client.get('/api/financial_summary').get_json()['total_revenue'] == 1900.0
+
+
+def test_import_into_fresh_database_keeps_new_task_ids_clear_of_archive(conn, client, add_task, archived):
+    exported = client.get('/export_data?format=ndjson').get_data(as_text=True)
+    for table in ('tasks', 'tasks_archive', 'clients', 'sqlite_sequence'):
+        conn.execute(f'DELETE FROM {table}')
+    conn.commit()
+
+    import_text(conn, exported, 'ndjson')
+    new_id = add_task(name='Baru lunas', status='Done', price=200.0, paid=200.0, completion_date='2023-03-01', progress=100)
+
+    assert new_id > archived
+    assert app_module.archive_tasks(conn, app_module.archive_cutoff()) == 1
+    ids = [row[0] for row in conn.execute('SELECT id FROM all_tasks')]
+    assert len(ids) == len(set(ids))
+    assert app_module.financial_summary_drift(conn) == []
+
+
+def test_archive_skips_ids_already_in_archive(conn, clock, add_task, archived, caplog):
+    # Database yang rusak sebelum sqlite_sequence disinkronkan: id arsip dipakai ulang di tasks
+    conn.execute("INSERT INTO tasks (id, name, status, priority, price, paid, completion_date, progress) "
+                 "VALUES (?, 'Bentrok', 'Done', 'Low', 50, 50, '2023-04-01', 100)", (archived,))
+    conn.commit()
+    other = add_task(name='Lain lunas', status='Done', price=70.0, paid=70.0, completion_date='2023-04-02', progress=100)
+
+    assert app_module.archive_id_collisions(conn, app_module.archive_cutoff()) == [archived]
+    assert app_module.archive_tasks(conn, app_module.archive_cutoff()) == 1
+
+    assert other in task_ids(conn, 'tasks_archive')
+    assert archived in task_ids(conn, 'tasks')
+    assert f'id {archived} sudah ada di tasks_archive' in caplog.text
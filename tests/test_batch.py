@@ -0,0 +1,88 @@
+import pytest
+
+import app as app_module
+
+
+def post_batch(client, table, operations):
+    response = client.post(f'/api/{table}/batch', json={'operations': operations})
+    return response.status_code, response.get_json()
+
+
+def task_rows(conn):
+    return [tuple(row) for row in conn.execute('SELECT id, name, status, progress, price FROM tasks ORDER BY id')]
+
+
+def test_task_batch_applies_every_operation_and_reports_each_item(client, conn, add_task):
+    existing = add_task(name='Lama', progress=0)
+    removed = add_task(name='Hapus')
+
+    status, body = post_batch(client, 'tasks', [
+        {'op': 'create', 'data': {'name': 'Baru', 'price': 1000, 'progress': 100}},
+        {'op': 'update', 'id': existing, 'data': {'progress': 40}},
+        {'op': 'delete', 'id': removed},
+    ])
+
+    assert status == 200
+    assert body['applied'] is True
+    assert body['counts'] == {'create': 1, 'update': 1, 'delete': 1}
+    created = body['results'][0]['id']
+    assert body['results'] == [
+        {'index': 0, 'op': 'create', 'status': 'ok', 'id': created},
+        {'index': 1, 'op': 'update', 'status': 'ok', 'id': existing},
+        {'index': 2, 'op': 'delete', 'status': 'ok', 'id': removed},
+    ]
+    # Status selalu dihitung ulang dari progress
+    assert task_rows(conn) == [(existing, 'Lama', 'In Progress', 40, 100.0), (created, 'Baru', 'Done', 100, 1000.0)]
+    assert app_module.financial_summary_drift(conn) == []
+
+
+def test_task_batch_is_all_or_nothing(client, conn, add_task):
+    existing = add_task(name='Lama')
+    before = task_rows(conn)
+
+    status, body = post_batch(client, 'tasks', [
+        {'op': 'create', 'data': {'name': 'Baru', 'price': 1000}},
+        {'op': 'update', 'id': existing, 'data': {'progress': 100}},
+        {'op': 'delete', 'id': existing + 100},
+    ])
+
+    assert status == 400
+    assert body['applied'] is False
+    assert [result['status'] for result in body['results']] == ['skipped', 'skipped', 'error']
+    assert body['results'][2]['error'] == f'id {existing + 100} tidak ditemukan'
+    assert all('id' not in result for result in body['results'][:2])
+    assert task_rows(conn) == before
+    assert app_module.financial_summary_drift(conn) == []
+
+
+def test_task_batch_rejects_invalid_items_before_writing(client, conn):
+    status, body = post_batch(client, 'tasks', [
+        {'op': 'create', 'data': {'name': 'Baru', 'price': 1000}},
+        {'op': 'create', 'data': {'name': 'Status', 'price': 1, 'status': 'Done'}},
+        {'op': 'create', 'data': {'name': 'Progress', 'price': 1, 'progress': 101}},
+        {'op': 'rename', 'id': 1},
+    ])
+
+    assert status == 400
+    assert [result['status'] for result in body['results']] == ['skipped', 'error', 'error', 'error']
+    assert task_rows(conn) == []
+
+
+@pytest.mark.parametrize('table, data, field', [
+    ('tasks', {'name': 'Tak hingga', 'price': 1e400}, 'price'),
+    ('tasks', {'name': 'Bukan angka', 'price': 'nan'}, 'price'),
+    ('tasks', {'name': 'Progress', 'price': 1, 'progress': 'inf'}, 'progress'),
+    ('expenses', {'description': 'Tak hingga', 'amount': '1e400', 'date': '2025-06-01'}, 'amount'),
+    ('expenses', {'description': 'Bukan angka', 'amount': 'NaN', 'date': '2025-06-01'}, 'amount'),
+])
+def test_batch_rejects_non_finite_numbers(client, conn, table, data, field):
+    status, body = post_batch(client, table, [{'op': 'create', 'data': data}])
+
+    assert status == 400
+    assert body['results'] == [{'index': 0, 'status': 'error', 'error': f"kolom '{field}' harus berupa angka terhingga"}]
+    assert conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0] == 0
+
+
+def test_batch_requires_operations(client):
+    assert client.post('/api/tasks/batch', json={}).status_code == 400
+    assert client.post('/api/expenses/batch', json={'operations': []}).status_code == 400
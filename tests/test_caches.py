@@ -0,0 +1,50 @@
+import app as app_module
+
+CACHES = ('user_cache', 'report_cache', 'api_cache', 'fragment_cache')
+
+
+def test_clear_caches_empties_every_cache(client, add_client):
+    add_client('PT Contoh')
+    assert client.get('/clients').status_code == 200
+    assert client.get('/api/financial_summary').status_code == 200
+    assert app_module.fragment_cache.stats()['size'] > 0
+    assert app_module.api_cache.stats()['size'] > 0
+
+    app_module.clear_caches()
+
+    assert {name: getattr(app_module, name).stats()['size'] for name in CACHES} == dict.fromkeys(CACHES, 0)
+
+
+def test_if_none_match_returns_304(client, add_task):
+    add_task(name='Logo', price=1000.0)
+    first = client.get('/api/financial_summary')
+    etag = first.headers['ETag']
+    assert first.status_code == 200
+    assert first.headers['Cache-Control'] == 'private, no-cache'
+
+    again = client.get('/api/financial_summary', headers={'If-None-Match': etag})
+
+    assert again.status_code == 304
+    assert again.get_data() == b''
+    assert again.headers['ETag'] == etag
+    assert client.get('/api/financial_summary', headers={'If-None-Match': '"lain"'}).status_code == 200
+
+
+def test_etag_changes_after_write(client, conn):
+    etag = client.get('/api/financial_summary').headers['ETag']
+
+    response = client.post('/api/tasks/batch', json={'operations': [{'op': 'create', 'data': {'name': 'Logo', 'price': 1000}}]})
+    assert response.status_code == 200
+
+    after = client.get('/api/financial_summary', headers={'If-None-Match': etag})
+    assert after.status_code == 200
+    assert after.headers['ETag'] != etag
+    assert after.get_json()['total_revenue'] == 1000.0
+
+
+def test_etag_is_stable_for_unchanged_data_version(client, conn):
+    etag = client.get('/api/financial_summary').headers['ETag']
+    app_module.clear_caches()
+
+    # Body sama menghasilkan ETag sama walau cache sudah dikosongkan
+    assert client.get('/api/financial_summary').headers['ETag'] == etag
@@ -0,0 +1,41 @@
+import pytest
+
+import app as app_module
+
+
+def seed_clients(add_client, add_task, start, stop, tasks_per_client=3):
+    for i in range(start, stop):
+        client_id = add_client(f'Klien {i:03d}')
+        for j in range(tasks_per_client):
+            add_task(name=f'Tugas {i}-{j}', status='Done' if j == 0 else 'To Do', price=100.0, client_id=client_id)
+
+
+@pytest.mark.parametrize('jobs_limit', [None, 2])
+def test_query_count_does_not_grow_with_clients(conn, add_client, add_task, count_queries, jobs_limit):
+    counts = []
+    seeded = 0
+    for total in (1, 10, 50):
+        seed_clients(add_client, add_task, seeded, total)
+        seeded = total
+        clients, count = count_queries(app_module.load_clients_summary, conn, jobs_limit=jobs_limit)
+        assert len(clients) == total
+        counts.append(count)
+    assert counts == [2, 2, 2]
+
+
+def test_aggregates_and_job_pagination(conn, add_client, add_task):
+    busy = add_client('Busy')
+    add_client('Idle')
+    for i in range(3):
+        add_task(name=f'Job {i}', status='Done' if i < 2 else 'In Progress', price=100.0 * (i + 1), client_id=busy)
+
+    clients = {client['name']: client for client in app_module.load_clients_summary(conn, jobs_limit=2)}
+
+    assert clients['Busy']['total_revenue'] == 600.0
+    assert clients['Busy']['jobs_done'] == 2
+    assert clients['Busy']['job_count'] == 3
+    assert [job['name'] for job in clients['Busy']['jobs']] == ['Job 2', 'Job 1']
+    assert clients['Busy']['jobs_cursor'] == clients['Busy']['jobs'][-1]['id']
+    assert clients['Idle']['total_revenue'] == 0
+    assert clients['Idle']['jobs'] == []
+    assert clients['Idle']['jobs_cursor'] is None
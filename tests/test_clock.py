@@ -0,0 +1,20 @@
+from datetime import datetime
+
+
+def test_date_dependent_api_cache_follows_injected_clock(client, clock, add_task):
+    add_task(name='Deadline hari ini', priority='High', completion_date='2025-06-15')
+
+    today = client.get('/api/deadline_risk').get_json()
+    assert [task['days_left'] for task in today['risky_tasks']] == [0]
+
+    # Versi data tidak berubah; hanya tanggal dari jam aplikasi yang membuat cache basi
+    clock.now = datetime(2025, 6, 16, 0, 5)
+    assert client.get('/api/deadline_risk').get_json()['risky_tasks'] == []
+
+
+def test_aging_analysis_uses_injected_clock(client, clock, add_task):
+    add_task(name='Piutang', status='Done', price=300.0, paid=100.0, completion_date='2025-05-01')
+
+    summary = client.get('/api/aging_analysis').get_json()['aging_summary']
+
+    assert summary['aging_31_60'] == 200.0
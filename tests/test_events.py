@@ -0,0 +1,127 @@
+import pytest
+
+import app as app_module
+
+
+class Harness:
+    """Broker memory atau sqlite dengan publish() yang langsung sampai ke klien lokal."""
+    def __init__(self, kind, conn):
+        self.kind = kind
+        self.conn = conn
+        if kind == 'memory':
+            self.broker = app_module.EventBroker(backlog=3, queue_size=10)
+        else:
+            # Poller thread praktis tidak pernah bangun; test menjalankan poll_once sendiri
+            self.broker = app_module.SQLiteEventBroker(backlog=3, queue_size=10, poll_interval=3600)
+        self.last_id = 0
+
+    def publish(self, event, data):
+        self.broker.publish(event, data)
+        self.poll()
+
+    def poll(self):
+        if self.kind == 'sqlite':
+            self.last_id = self.broker.poll_once(self.conn, self.last_id)
+
+
+def drain(subscription):
+    messages = []
+    while True:
+        message = subscription.get(timeout=0)
+        if message is None:
+            return [(m['id'], m['event'], m['data']) for m in messages]
+        messages.append(message)
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def events(request, conn):
+    harness = Harness(request.param, conn)
+    if request.param == 'sqlite':
+        harness.broker.subscribe().close()  # Menyalakan poller seperti request pertama
+    return harness
+
+
+def test_publish_reaches_every_subscriber(events):
+    first, second = events.broker.subscribe(), events.broker.subscribe()
+
+    events.publish('change', {'n': 1})
+    events.publish('report', {'n': 2})
+
+    expected = [(1, 'change', {'n': 1}), (2, 'report', {'n': 2})]
+    assert drain(first) == expected
+    assert drain(second) == expected
+
+
+def test_last_event_id_replays_newer_events(events):
+    listener = events.broker.subscribe()
+    for n in range(1, 4):
+        events.publish('change', {'n': n})
+
+    replay = events.broker.subscribe(last_event_id=1)
+
+    assert [message[0] for message in drain(replay)] == [2, 3]
+    assert len(drain(listener)) == 3
+
+
+@pytest.mark.parametrize('last_event_id', [0, 9])
+def test_last_event_id_outside_backlog_gets_reset(events, last_event_id):
+    listener = events.broker.subscribe()
+    for n in range(1, 6):
+        events.publish('change', {'n': n})
+
+    # Backlog 3: event 1-2 sudah terbuang; id 9 belum pernah ada
+    replay = events.broker.subscribe(last_event_id=last_event_id)
+
+    assert drain(replay) == [(5, 'reset', {})]
+    listener.close()
+
+
+def test_lagging_subscriber_is_flagged(events):
+    subscription = events.broker.subscribe()
+    for n in range(11):
+        events.publish('change', {'n': n})
+
+    assert subscription.lagging
+
+
+def test_sqlite_poller_skips_events_published_while_idle(conn):
+    events = Harness('sqlite', conn)
+    events.broker.subscribe().close()
+    for n in range(5):
+        events.publish('change', {'n': n})
+    assert events.broker.stats()['last_id'] == 5
+
+    subscription = events.broker.subscribe()
+    events.publish('change', {'n': 'baru'})
+    assert drain(subscription) == [(6, 'change', {'n': 'baru'})]
+
+    # Klien yang terputus sebelum masa sepi tidak bisa diputar ulang dengan benar: minta muat ulang
+    assert drain(events.broker.subscribe(last_event_id=2)) == [(6, 'reset', {})]
+
+
+def test_write_routes_publish_change_events(client, conn, monkeypatch):
+    broker = app_module.EventBroker()
+    monkeypatch.setitem(client.application.extensions, 'event_broker', broker)
+    subscription = broker.subscribe()
+
+    client.post('/api/tasks/batch', json={'operations': [{'op': 'create', 'data': {'name': 'Logo', 'price': 1000}}]})
+
+    [(event_id, event, data)] = drain(subscription)
+    assert event == 'change'
+    assert data['kind'] == 'tasks_batch'
+    assert data['version'] == app_module.read_data_version(conn)
+    assert data['delta'] == {'total_revenue': 1000.0, 'remaining_due': 1000.0, 'projected_revenue': 1000.0}
+
+
+def test_stream_replays_from_last_event_id(client, monkeypatch):
+    broker = app_module.EventBroker()
+    monkeypatch.setitem(client.application.extensions, 'event_broker', broker)
+    client.application.config['EVENT_STREAM_MAX_SECONDS'] = 0.2
+    for n in range(1, 4):
+        broker.publish('change', {'n': n})
+
+    body = client.get('/api/stream', headers={'Last-Event-ID': '1'}).get_data(as_text=True)
+
+    assert body.startswith('retry: ')
+    assert 'id: 2\nevent: change\ndata: {"n": 2}\n\n' in body
+    assert 'id: 3\n' in body and 'id: 1\n' not in body
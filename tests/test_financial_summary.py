@@ -0,0 +1,17 @@
+import app as app_module
+
+
+def test_rebuild_summary_repairs_drift_and_invalidates_caches(app, client, conn, add_task):
+    add_task(name='Logo', price=1000.0, paid=250.0)
+    # Ringkasan rusak tanpa menaikkan versi data; nilai rusak ikut masuk cache API
+    conn.execute('UPDATE task_totals SET revenue = 1')
+    conn.commit()
+    assert client.get('/api/financial_summary').get_json()['total_revenue'] == 1.0
+
+    runner = app.test_cli_runner()
+    assert runner.invoke(args=['rebuild-summary', '--check']).exit_code == 1
+    result = runner.invoke(args=['rebuild-summary'])
+
+    assert result.exit_code == 0, result.output
+    assert app_module.financial_summary_drift(conn) == []
+    assert client.get('/api/financial_summary').get_json()['total_revenue'] == 1000.0
@@ -0,0 +1,142 @@
+import io
+import json
+
+import pytest
+
+import app as app_module
+
+
+def upload(client, text, filename='data.csv', **form):
+    data = {'import_file': (io.BytesIO(text.encode('utf-8')), filename), **form}
+    response = client.post('/import_data', data=data, content_type='multipart/form-data')
+    return response.status_code, response.get_json()
+
+
+def rows(conn, sql):
+    return [tuple(row) for row in conn.execute(sql)]
+
+
+def ndjson(*records):
+    return ''.join(json.dumps({'table': table, 'row': row}) + '\n' for table, row in records)
+
+
+EXPORT_CSV = '''--- JOB JOKI PRO DATA EXPORT ---
+Exported At,2025-06-15 09:00:00
+
+TABLE: TASKS
+id,name,status,priority,price,paid,completion_date,client_id,progress
+10,Logo,In Progress,High,1500,500,2025-07-01,7,40
+11,Website,Done,Low,3000,3000,2025-05-01,,100
+
+TABLE: CLIENTS
+id,name,contact,email
+7,PT Maju,0811,maju@example.com
+
+TABLE: EXPENSES
+id,description,amount,date
+3,Hosting,250,2025-06-01
+'''
+
+
+def test_spreadsheet_csv_resolves_client_names_and_reports_bad_rows(client, conn, add_client):
+    client_id = add_client('PT Maju')
+    text = ('name,client,price,paid,progress,completion_date\n'
+            'Logo,PT Maju,1500,500,40,2025-07-01\n'
+            'Poster,PT Hilang,200,0,0,\n'
+            'Banner,,abc,0,0,\n'
+            'Video,,1e400,0,0,\n'
+            'Brosur,,300,0,120,\n'
+            'Kartu,,100,0,100,2025-13-01\n')
+
+    status, report = upload(client, text, table='tasks')
+
+    assert status == 200
+    assert report['imported']['tasks'] == 1
+    assert report['rejected'] == [
+        {'table': 'tasks', 'line': 3, 'error': "klien 'PT Hilang' tidak ditemukan"},
+        {'table': 'tasks', 'line': 4, 'error': "kolom 'price' harus berupa angka"},
+        {'table': 'tasks', 'line': 5, 'error': "kolom 'price' harus berupa angka terhingga"},
+        {'table': 'tasks', 'line': 6, 'error': "kolom 'progress' harus di antara 0 dan 100"},
+        {'table': 'tasks', 'line': 7, 'error': "kolom 'completion_date' harus berformat YYYY-MM-DD"},
+    ]
+    assert report['rejected_count'] == 5
+    # Status dihitung dari progress bila kolom status kosong
+    assert rows(conn, 'SELECT name, status, client_id, price FROM tasks') == [('Logo', 'In Progress', client_id, 1500.0)]
+
+
+def test_insert_mode_remaps_client_ids_and_ignores_row_ids(client, conn, add_client):
+    add_client('Klien lain')
+
+    for _ in range(2):
+        status, report = upload(client, EXPORT_CSV, mode='insert')
+        assert status == 200
+        assert report['rejected'] == []
+
+    (maju_id,) = conn.execute("SELECT id FROM clients WHERE name = 'PT Maju'").fetchone()
+    assert maju_id != 7
+    # Klien tidak digandakan (nama UNIQUE), tugas & pengeluaran dimuat sebagai baris baru
+    assert rows(conn, 'SELECT COUNT(*) FROM clients') == [(2,)]
+    assert rows(conn, 'SELECT name, client_id FROM tasks ORDER BY id') == [
+        ('Logo', maju_id), ('Website', None), ('Logo', maju_id), ('Website', None),
+    ]
+    assert 10 not in [row[0] for row in conn.execute('SELECT id FROM tasks')]
+    assert rows(conn, 'SELECT COUNT(*) FROM expenses') == [(2,)]
+    assert app_module.financial_summary_drift(conn) == []
+
+
+def test_upsert_mode_updates_rows_by_id(client, conn):
+    upload(client, EXPORT_CSV, mode='upsert')
+    changed = EXPORT_CSV.replace('10,Logo,In Progress,High,1500,500', '10,Logo,Done,High,1800,1800') \
+                        .replace('7,PT Maju,0811', '7,PT Maju,0899')
+
+    status, report = upload(client, changed, mode='upsert')
+
+    assert status == 200
+    assert report['mode'] == 'upsert'
+    assert report['imported'] == {'clients': 1, 'tasks': 2, 'tasks_archive': 0, 'expenses': 1}
+    assert rows(conn, 'SELECT id, status, price, paid FROM tasks ORDER BY id') == [
+        (10, 'Done', 1800.0, 1800.0), (11, 'Done', 3000.0, 3000.0),
+    ]
+    assert rows(conn, 'SELECT name, contact FROM clients') == [('PT Maju', '0899')]
+    assert rows(conn, 'SELECT id, amount FROM expenses') == [(3, 250.0)]
+    assert app_module.financial_summary_drift(conn) == []
+    assert app_module.rollup_drift(conn) == []
+
+
+def test_ndjson_reports_malformed_lines(client, conn):
+    text = (json.dumps({'export': 'JOB JOKI PRO DATA EXPORT'}) + '\n'
+            + ndjson(('clients', {'name': 'PT Maju'}))
+            + '{"table": "tasks", "row": {"name": "Rusak"\n'
+            + ndjson(('tasks', {'name': 'Logo', 'price': 100, 'client': 'PT Maju'}),
+                     ('expenses', {'description': 'Tanpa tanggal', 'amount': 5}),
+                     ('expenses', {'description': 'NaN', 'amount': 'nan', 'date': '2025-06-01'}),
+                     ('users', {'username': 'admin'})))
+
+    status, report = upload(client, text, filename='backup.ndjson')
+
+    assert status == 200
+    assert report['imported'] == {'clients': 1, 'tasks': 1, 'tasks_archive': 0, 'expenses': 0}
+    assert report['rejected'] == [
+        {'table': None, 'line': 3, 'error': 'baris JSON tidak valid'},
+        {'table': 'expenses', 'line': 5, 'error': "kolom 'date' wajib diisi"},
+        {'table': 'expenses', 'line': 6, 'error': "kolom 'amount' harus berupa angka terhingga"},
+        {'table': 'users', 'line': 7, 'error': "tabel 'users' tidak didukung"},
+    ]
+    assert rows(conn, 'SELECT t.name, c.name FROM tasks t JOIN clients c ON c.id = t.client_id') == [('Logo', 'PT Maju')]
+
+
+@pytest.mark.parametrize('form, message', [
+    ({'mode': 'replace'}, 'Mode import harus insert atau upsert.'),
+    ({'table': 'users'}, 'Tabel tidak dikenal.'),
+])
+def test_import_rejects_unknown_options(client, form, message):
+    status, body = upload(client, 'name\nx\n', **form)
+
+    assert status == 400
+    assert body['message'] == message
+
+
+def test_import_requires_a_file(client):
+    response = client.post('/import_data', data={}, content_type='multipart/form-data')
+
+    assert response.status_code == 400
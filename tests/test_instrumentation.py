@@ -0,0 +1,37 @@
+import re
+
+import app as app_module
+
+
+def histogram_totals(histogram, route):
+    """(jumlah observasi, total detik) untuk satu route."""
+    series = [value for labels, value in histogram._series.items() if labels[0] == route]
+    return sum(count for _, _, count in series), sum(total for _, total, _ in series)
+
+
+def test_server_timing_counts_queries(client, add_task):
+    add_task(name='Desain logo')
+    app_module.close_db_connection()
+
+    response = client.get('/api/tasks')
+
+    assert response.status_code == 200
+    match = re.search(r'db;dur=[\d.]+;desc="(\d+) queries"', response.headers['Server-Timing'])
+    assert match and int(match.group(1)) > 0
+
+
+def test_streamed_export_has_no_server_timing_and_is_recorded_on_close(client, add_task):
+    add_task(name='Desain logo')
+    # Request harus meminjam koneksinya sendiri agar query-nya tercatat di QueryStats request
+    app_module.close_db_connection()
+    count_before, seconds_before = histogram_totals(app_module.db_time_histogram, '/export_data')
+
+    response = client.get('/export_data?format=ndjson')
+    body = response.get_data(as_text=True)
+    response.close()
+
+    assert 'Desain logo' in body
+    assert 'Server-Timing' not in response.headers
+    count_after, seconds_after = histogram_totals(app_module.db_time_histogram, '/export_data')
+    assert count_after == count_before + 1
+    assert seconds_after > seconds_before
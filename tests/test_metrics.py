@@ -0,0 +1,35 @@
+import pytest
+
+
+@pytest.fixture
+def user_id(conn):
+    cursor = conn.execute("INSERT INTO users (username, password_hash) VALUES ('admin', 'x')")
+    conn.commit()
+    return cursor.lastrowid
+
+
+def test_metrics_requires_login_without_token(app):
+    response = app.test_client().get('/metrics')
+
+    assert response.status_code == 302
+    assert '/login' in response.headers['Location']
+
+
+def test_metrics_for_logged_in_user(app, user_id):
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = str(user_id)
+
+    response = client.get('/metrics')
+
+    assert response.status_code == 200
+    assert 'http_request_duration_seconds' in response.get_data(as_text=True)
+
+
+def test_metrics_token(app):
+    app.config['METRICS_TOKEN'] = 'rahasia'
+    client = app.test_client()
+
+    assert client.get('/metrics').status_code == 401
+    assert client.get('/metrics', headers={'Authorization': 'Bearer salah'}).status_code == 401
+    assert client.get('/metrics', headers={'Authorization': 'Bearer rahasia'}).status_code == 200
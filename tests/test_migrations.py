@@ -0,0 +1,45 @@
+import sqlite3
+
+import app as app_module
+
+
+def schema(conn):
+    return sorted(tuple(row) for row in conn.execute("SELECT type, name, sql FROM sqlite_master WHERE name NOT LIKE 'sqlite_%'"))
+
+
+def open_database(path):
+    conn = sqlite3.connect(str(path))
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def test_upgrade_matches_fresh_schema(tmp_path, monkeypatch):
+    fresh = open_database(tmp_path / 'fresh.db')
+    app_module.migrate_db(fresh)
+
+    # Database lama dinaikkan satu versi per rilis, dengan data sejak versi 1
+    migrations = app_module.MIGRATIONS
+    upgraded = open_database(tmp_path / 'upgraded.db')
+    for version in range(1, len(migrations)):
+        monkeypatch.setattr(app_module, 'MIGRATIONS', migrations[:version])
+        app_module.migrate_db(upgraded)
+        if version == 1:
+            upgraded.execute("INSERT INTO tasks (name, status, price, paid, completion_date) VALUES ('Lama', 'Done', 100, 100, '2024-01-10')")
+            upgraded.commit()
+    monkeypatch.undo()
+    assert app_module.migrate_db(upgraded) == [len(migrations)]
+
+    assert schema(upgraded) == schema(fresh)
+    assert app_module.financial_summary_drift(upgraded) == []
+    assert app_module.rollup_drift(upgraded) == []
+
+
+def test_released_migrations_do_not_need_the_archive(tmp_path, monkeypatch):
+    # Migrasi 002 & 008 berjalan sebelum tasks_archive/all_tasks ada
+    conn = open_database(tmp_path / 'v9.db')
+    monkeypatch.setattr(app_module, 'MIGRATIONS', app_module.MIGRATIONS[:9])
+    app_module.migrate_db(conn)
+
+    names = {row['name'] for row in conn.execute('SELECT name FROM sqlite_master')}
+    assert 'tasks_archive' not in names and 'all_tasks' not in names
+    assert 'rollups_tasks_archive_after_insert' not in names
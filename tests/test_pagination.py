@@ -0,0 +1,87 @@
+import pytest
+
+import app as app_module
+
+
+def walk(client, url, limit):
+    """Mengikuti next_cursor sampai habis; mengembalikan daftar halaman (list item)."""
+    pages, cursor = [], None
+    while True:
+        params = {'limit': limit} if cursor is None else {'limit': limit, 'cursor': cursor}
+        body = client.get(url, query_string=params).get_json()
+        pages.append(body['items'])
+        cursor = body['next_cursor']
+        if cursor is None:
+            return pages
+
+
+def test_tasks_pages_are_continuous_newest_first(client, add_task):
+    ids = [add_task(name=f'Tugas {n}') for n in range(7)]
+
+    pages = walk(client, '/api/tasks', 3)
+
+    assert [len(page) for page in pages] == [3, 3, 1]
+    assert [item['id'] for page in pages for item in page] == ids[::-1]
+
+
+def test_exact_multiple_has_no_empty_trailing_page(client, add_task):
+    for n in range(4):
+        add_task(name=f'Tugas {n}')
+
+    assert [len(page) for page in walk(client, '/api/tasks', 2)] == [2, 2]
+
+
+def test_tasks_cursor_is_stable_when_rows_are_added(client, add_task):
+    ids = [add_task(name=f'Tugas {n}') for n in range(4)]
+    first = client.get('/api/tasks?limit=2').get_json()
+
+    add_task(name='Baru')  # Tidak menggeser halaman berikutnya seperti OFFSET
+    second = client.get('/api/tasks', query_string={'limit': 2, 'cursor': first['next_cursor']}).get_json()
+
+    assert [item['id'] for item in second['items']] == [ids[1], ids[0]]
+
+
+def test_expense_pages_break_date_ties_by_id(client, conn):
+    rows = [('A', '2025-06-02'), ('B', '2025-06-01'), ('C', '2025-06-02'), ('D', '2025-06-02'), ('E', '2025-05-30')]
+    conn.executemany('INSERT INTO expenses (description, amount, date) VALUES (?, 10, ?)', rows)
+    conn.commit()
+
+    pages = walk(client, '/api/expenses', 2)
+
+    assert [[item['description'] for item in page] for page in pages] == [['D', 'C'], ['A', 'B'], ['E']]
+
+
+@pytest.mark.parametrize('cursor', ['abc', '2025-06-01|x', '|5'])
+def test_invalid_expense_cursor_is_rejected(client, cursor):
+    response = client.get('/api/expenses', query_string={'cursor': cursor})
+
+    assert response.status_code == 400
+    assert response.get_json()['message'] == 'Cursor tidak valid.'
+
+
+def test_non_numeric_task_cursor_starts_from_first_page(client, add_task):
+    newest = [add_task(name=f'Tugas {n}') for n in range(3)][-1]
+
+    body = client.get('/api/tasks?cursor=abc&limit=1').get_json()
+
+    assert [item['id'] for item in body['items']] == [newest]
+
+
+def test_page_limit_is_clamped(app):
+    assert app_module.page_limit(0) == 1
+    assert app_module.page_limit(10 ** 6) == app_module.MAX_PAGE_SIZE
+    assert app_module.page_limit(None) == app.config['PAGE_SIZE']
+
+
+def test_client_jobs_pages_include_archived_tasks(client, conn, clock, add_client, add_task):
+    client_id = add_client('PT Arsip')
+    other = add_client('PT Lain')
+    old = add_task(name='Lama', status='Done', price=100.0, paid=100.0, completion_date='2023-01-01',
+                   client_id=client_id, progress=100)
+    add_task(name='Milik lain', client_id=other)
+    recent = [add_task(name=f'Baru {n}', client_id=client_id) for n in range(3)]
+    assert app_module.archive_tasks(conn, app_module.archive_cutoff()) == 1
+
+    pages = walk(client, f'/api/clients/{client_id}/jobs', 2)
+
+    assert [item['id'] for page in pages for item in page] == recent[::-1] + [old]
@@ -0,0 +1,72 @@
+import logging
+from concurrent.futures import Future
+
+import pytest
+from PIL import Image
+
+import app as app_module
+
+
+@pytest.fixture
+def avatar_folder(app, tmp_path):
+    folder = tmp_path / 'avatars'
+    folder.mkdir()
+    app.config['AVATAR_FOLDER'] = str(folder)
+    return folder
+
+
+@pytest.fixture
+def user_id(conn):
+    cursor = conn.execute("INSERT INTO users (username, password_hash) VALUES ('budi', 'x')")
+    conn.commit()
+    return cursor.lastrowid
+
+
+def write_upload(folder, name, data=None):
+    path = folder / name
+    if data is None:
+        Image.new('RGB', (300, 200), 'red').save(path, 'PNG')
+    else:
+        path.write_bytes(data)
+    return str(path)
+
+
+def test_thumbnails_are_saved_and_linked(conn, avatar_folder, user_id):
+    source = write_upload(avatar_folder, 'incoming-1.upload')
+
+    app_module.process_profile_pic(user_id, source, 'abc123')
+
+    assert sorted(path.name for path in avatar_folder.iterdir()) == ['abc123_128.webp', 'abc123_256.webp', 'abc123_64.webp']
+    assert conn.execute('SELECT profile_pic FROM users WHERE id = ?', (user_id,)).fetchone()[0] == 'abc123'
+
+
+def test_invalid_image_is_logged(avatar_folder, user_id, caplog):
+    source = write_upload(avatar_folder, 'incoming-2.upload', b'bukan gambar')
+
+    with caplog.at_level(logging.WARNING, logger=app_module.app.logger.name):
+        app_module.process_profile_pic(user_id, source, 'def456')
+
+    assert 'gagal diproses' in caplog.text
+    assert list(avatar_folder.iterdir()) == []
+
+
+def test_database_error_is_logged(conn, avatar_folder, user_id, caplog):
+    source = write_upload(avatar_folder, 'incoming-3.upload')
+    conn.execute('DROP TABLE users')
+    conn.commit()
+
+    with caplog.at_level(logging.ERROR, logger=app_module.app.logger.name):
+        app_module.process_profile_pic(user_id, source, 'abc789')
+
+    assert 'tidak tersimpan ke database' in caplog.text
+    assert not (avatar_folder / 'incoming-3.upload').exists()
+
+
+def test_unexpected_executor_failure_is_logged(app, caplog):
+    future = Future()
+    future.set_exception(RuntimeError('tak terduga'))
+
+    with caplog.at_level(logging.ERROR, logger=app.logger.name):
+        app_module.log_image_task_failure(future)
+
+    assert 'tak terduga' in caplog.text
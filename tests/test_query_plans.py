@@ -0,0 +1,13 @@
+import pytest
+
+import app as app_module
+
+
+@pytest.mark.parametrize(
+    'run, table, index_name',
+    [expectation[1:] for expectation in app_module.QUERY_PLAN_EXPECTATIONS],
+    ids=[expectation[0] for expectation in app_module.QUERY_PLAN_EXPECTATIONS],
+)
+def test_hot_query_uses_expected_index(conn, run, table, index_name):
+    failures = app_module.query_plan_failures(conn, run, table, index_name)
+    assert failures == [], '\n'.join(f"{' '.join(sql.split())}\n  {plan}" for sql, plan in failures)
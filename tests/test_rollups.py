@@ -0,0 +1,71 @@
+import app as app_module
+
+
+def stored_rollups(conn):
+    return {tuple(row[:3]): round(row[3], 2) for row in conn.execute('SELECT granularity, metric, bucket, value FROM rollups')}
+
+
+def recomputed_rollups(conn):
+    """GROUP BY langsung dari tabel sumber; bucket bernilai 0 dianggap sama dengan tidak ada."""
+    rows = conn.execute(app_module.rollup_source_query(app_module.ALL_ROLLUP_SOURCES))
+    return {tuple(row[:3]): round(row[3], 2) for row in rows if round(row[3], 2) != 0}
+
+
+def nonzero(rollups):
+    return {key: value for key, value in rollups.items() if value != 0}
+
+
+def test_triggers_keep_rollups_equal_to_group_by(conn, clock, add_task):
+    first = add_task(name='Logo', status='Done', price=1000.0, paid=1000.0, completion_date='2025-05-30', progress=100)
+    second = add_task(name='Web', status='In Progress', price=500.0, paid=100.0, completion_date='2025-06-02', progress=50)
+    add_task(name='Tanpa tanggal', price=300.0, completion_date=None)
+    add_task(name='Tanggal rusak', price=300.0, completion_date='2025-6-3')
+    conn.execute("INSERT INTO expenses (description, amount, date) VALUES ('Hosting', 75, '2025-06-01')")
+    conn.commit()
+    assert nonzero(stored_rollups(conn)) == recomputed_rollups(conn)
+    assert stored_rollups(conn)[('month', 'revenue', '2025-06')] == 500.0
+    assert stored_rollups(conn)[('week', 'paid', '2025-05-26')] == 1000.0
+
+    # Pindah bucket (tanggal), ganti status & nilai, lalu hapus
+    conn.execute("UPDATE tasks SET completion_date = '2025-06-20', status = 'Done', paid = 500 WHERE id = ?", (second,))
+    conn.execute("UPDATE expenses SET amount = 80, date = '2025-07-01'")
+    conn.commit()
+    assert nonzero(stored_rollups(conn)) == recomputed_rollups(conn)
+
+    conn.execute('DELETE FROM tasks WHERE id = ?', (first,))
+    conn.commit()
+    assert nonzero(stored_rollups(conn)) == recomputed_rollups(conn)
+    assert app_module.archive_tasks(conn, '2025-07-01') == 1
+    assert nonzero(stored_rollups(conn)) == recomputed_rollups(conn)
+    assert app_module.rollup_drift(conn) == []
+
+
+def test_trends_api_reads_rollups(client, add_task):
+    add_task(name='Mei', status='Done', price=1000.0, paid=400.0, completion_date='2025-05-10', progress=100)
+    add_task(name='Juni', status='Done', price=600.0, paid=600.0, completion_date='2025-06-10', progress=100)
+
+    body = client.get('/api/trends?granularity=month&metrics=paid,revenue').get_json()
+    assert body == {'granularity': 'month', 'labels': ['2025-05', '2025-06'],
+                    'series': {'paid': [400.0, 600.0], 'revenue': [1000.0, 600.0]}}
+
+    body = client.get('/api/trends?granularity=day&metrics=paid&start=2025-06-01').get_json()
+    assert body['labels'] == ['2025-06-10']
+
+    assert client.get('/api/trends?granularity=year').status_code == 400
+    assert client.get('/api/trends?metrics=laba').status_code == 400
+    assert client.get('/api/trends?start=juni').status_code == 400
+
+
+def test_rebuild_rollups_repairs_drift_and_invalidates_caches(app, client, conn, add_task):
+    add_task(name='Logo', status='Done', price=1000.0, paid=1000.0, completion_date='2025-05-10', progress=100)
+    conn.execute("UPDATE rollups SET value = 1 WHERE metric = 'paid'")
+    conn.commit()
+    assert client.get('/api/trends?metrics=paid').get_json()['series']['paid'] == [1.0]
+
+    runner = app.test_cli_runner()
+    assert runner.invoke(args=['rebuild-rollups', '--check']).exit_code == 1
+    result = runner.invoke(args=['rebuild-rollups'])
+
+    assert result.exit_code == 0, result.output
+    assert app_module.rollup_drift(conn) == []
+    assert client.get('/api/trends?metrics=paid').get_json()['series']['paid'] == [1000.0]
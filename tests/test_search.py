@@ -0,0 +1,82 @@
+import app as app_module
+
+
+def search(client, query, **params):
+    response = client.get('/api/search', query_string={'q': query, **params})
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def hits(client, query, **params):
+    return [(item['kind'], item['title']) for item in search(client, query, **params)['items']]
+
+
+def test_index_follows_insert_rename_and_delete(client, conn, add_task, add_client):
+    task_id = add_task(name='Desain Logo Kopi')
+    client_id = add_client('PT Kopi Nusantara', contact='0811', email='halo@kopi.id')
+    conn.execute("INSERT INTO expenses (description, amount, date) VALUES ('Biji kopi contoh', 50, '2025-06-01')")
+    conn.commit()
+    assert sorted(hits(client, 'kopi')) == [
+        ('client', 'PT Kopi Nusantara'), ('expense', 'Biji kopi contoh'), ('task', 'Desain Logo Kopi'),
+    ]
+
+    conn.execute("UPDATE tasks SET name = 'Desain Logo Teh' WHERE id = ?", (task_id,))
+    conn.execute("UPDATE clients SET email = 'halo@warung.id' WHERE id = ?", (client_id,))
+    conn.commit()
+    assert hits(client, 'teh') == [('task', 'Desain Logo Teh')]
+    assert ('task', 'Desain Logo Kopi') not in hits(client, 'kopi')
+    assert hits(client, 'warung') == [('client', 'PT Kopi Nusantara')]
+
+    conn.execute('DELETE FROM tasks WHERE id = ?', (task_id,))
+    conn.execute('DELETE FROM clients WHERE id = ?', (client_id,))
+    conn.execute('DELETE FROM expenses')
+    conn.commit()
+    assert hits(client, 'desain') == []
+    assert hits(client, 'kopi') == []
+
+
+def test_prefix_terms_and_diacritics(client, add_task):
+    add_task(name='Rebranding Café Senja')
+    add_task(name='Rebranding Toko Buku')
+
+    assert len(hits(client, 'reb')) == 2
+    assert hits(client, 'reb caf') == [('task', 'Rebranding Café Senja')]
+    assert hits(client, 'cafe') == [('task', 'Rebranding Café Senja')]
+    # Tanda kutip & kurung tidak diteruskan ke sintaks MATCH FTS5; setiap kata wajib ada
+    assert hits(client, '"senja" (buku') == []
+    assert hits(client, '"senja*" (') == [('task', 'Rebranding Café Senja')]
+    assert search(client, '  ') == {'items': [], 'next_cursor': None}
+
+
+def test_title_matches_rank_above_body_matches(client, add_client):
+    add_client('Studio Lain', email='kontak@cetak.id')
+    add_client('Cetak Kilat')
+
+    assert hits(client, 'cetak') == [('client', 'Cetak Kilat'), ('client', 'Studio Lain')]
+
+
+def test_kind_filter_and_pagination(client, add_task, add_client):
+    for n in range(5):
+        add_task(name=f'Video promosi {n}')
+    add_client('Video Kreatif')
+
+    assert hits(client, 'video', kind='client') == [('client', 'Video Kreatif')]
+    assert client.get('/api/search?q=video&kind=user').status_code == 400
+
+    seen, cursor = [], None
+    while True:
+        params = {'limit': 2} if cursor is None else {'limit': 2, 'cursor': cursor}
+        page = search(client, 'video', **params)
+        assert len(page['items']) <= 2
+        seen += [(item['kind'], item['id']) for item in page['items']]
+        cursor = page['next_cursor']
+        if cursor is None:
+            break
+    assert len(seen) == len(set(seen)) == 6
+
+
+def test_archived_tasks_leave_the_index(client, conn, clock, add_task):
+    add_task(name='Maskot lama', status='Done', price=100.0, paid=100.0, completion_date='2023-01-01', progress=100)
+    assert app_module.archive_tasks(conn, app_module.archive_cutoff()) == 1
+
+    assert hits(client, 'maskot') == []
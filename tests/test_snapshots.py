@@ -0,0 +1,58 @@
+import gzip
+import os
+import shutil
+import sqlite3
+
+import app as app_module
+
+
+def write_snapshot(app, tmp_path, name, prepare):
+    """Snapshot gzip di SNAPSHOT_FOLDER dari database baru yang disiapkan oleh `prepare(conn)`."""
+    raw_path = tmp_path / f'{name}.db'
+    conn = sqlite3.connect(str(raw_path))
+    conn.row_factory = sqlite3.Row
+    prepare(conn)
+    conn.commit()
+    conn.close()
+    os.makedirs(app.config['SNAPSHOT_FOLDER'], exist_ok=True)
+    path = os.path.join(app.config['SNAPSHOT_FOLDER'], f'{app_module.SNAPSHOT_PREFIX}{name}{app_module.SNAPSHOT_SUFFIX}')
+    with open(raw_path, 'rb') as raw, gzip.open(path, 'wb') as compressed:
+        shutil.copyfileobj(raw, compressed)
+    return path
+
+
+def test_verify_counts_archived_tasks(conn, clock, add_task):
+    add_task(name='Lama lunas', status='Done', price=900.0, paid=900.0, completion_date='2023-01-10', progress=100)
+    add_task(name='Berjalan', status='In Progress', completion_date='2025-07-01', progress=50)
+    app_module.archive_tasks(conn, app_module.archive_cutoff())
+
+    report = app_module.verify_snapshot(app_module.create_snapshot()['path'])
+
+    assert report['problems'] == []
+    assert report['counts'] == {'tasks': 1, 'tasks_archive': 1, 'clients': 0, 'expenses': 0}
+
+
+def test_verify_accepts_snapshot_from_before_the_archive(app, tmp_path, monkeypatch):
+    def prepare(conn):
+        monkeypatch.setattr(app_module, 'MIGRATIONS', app_module.MIGRATIONS[:9])
+        app_module.migrate_db(conn)
+        monkeypatch.undo()
+        conn.execute("INSERT INTO tasks (name, status, price, paid) VALUES ('Lama', 'To Do', 100, 0)")
+
+    report = app_module.verify_snapshot(write_snapshot(app, tmp_path, 'v9', prepare))
+
+    assert report['problems'] == []
+    assert report['schema_version'] == 9
+    assert report['counts'] == {'tasks': 1, 'clients': 0, 'expenses': 0}
+
+
+def test_verify_reports_missing_archive_table(app, tmp_path):
+    def prepare(conn):
+        app_module.migrate_db(conn)
+        conn.execute('DROP VIEW all_tasks')
+        conn.execute('DROP TABLE tasks_archive')
+
+    report = app_module.verify_snapshot(write_snapshot(app, tmp_path, 'broken', prepare))
+
+    assert report['problems'] == [f'Tabel tasks_archive tidak ada di snapshot versi skema {len(app_module.MIGRATIONS)}.']
+    assert 'tasks_archive' not in report['counts']